@@ -0,0 +1,82 @@
+"""
+Compare the availability matrix against the previous per-record set loop
+of calculate_capacity, for 10k employees over a 90 days range.
+
+    PYTHONPATH=. python benchmarks/bench_availability.py
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from capacity.availability import AvailabilityMatrix
+
+EMPLOYEES = 10_000
+DAYS = 90
+RECORDS_PER_EMPLOYEE = 2
+
+
+def synthetic_data(seed=42):
+    rnd = random.Random(seed)
+    start = date(2025, 1, 6)
+    working_dates = [
+        start + timedelta(days=i) for i in range(DAYS) if (start + timedelta(days=i)).weekday() < 5
+    ]
+    employee_ids = list(range(1, EMPLOYEES + 1))
+    records = []
+    for emp_id in employee_ids:
+        for _ in range(rnd.randint(0, RECORDS_PER_EMPLOYEE * 2)):
+            out_start = start + timedelta(days=rnd.randint(-5, DAYS))
+            out_end = out_start + timedelta(days=rnd.randint(0, 10))
+            records.append({
+                "employeeId": emp_id,
+                "type": "timeOff",
+                "start": out_start.isoformat(),
+                "end": out_end.isoformat(),
+            })
+    return working_dates, employee_ids, records
+
+
+def legacy_capacity(working_dates, employee_ids, records, hours_per_day=8):
+    unavailable_days = {}
+    for record in records:
+        emp_id = record.get('employeeId')
+        if not emp_id:
+            continue
+        out_start = date.fromisoformat(record['start'])
+        out_end = date.fromisoformat(record['end'])
+        if emp_id not in unavailable_days:
+            unavailable_days[emp_id] = set()
+        unavailable_days[emp_id].update(
+            working_date for working_date in working_dates if out_start <= working_date <= out_end
+        )
+    total_raw_capacity = 0
+    for emp_id in employee_ids:
+        available_days = len(working_dates) - len(unavailable_days.get(emp_id, set()))
+        total_raw_capacity += available_days * hours_per_day
+    return total_raw_capacity
+
+
+def matrix_capacity(working_dates, employee_ids, records, hours_per_day=8):
+    availability = AvailabilityMatrix.from_records(working_dates, employee_ids, records)
+    return availability.capacity(hours_per_day)
+
+
+def timed(func, *args):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, round(time.perf_counter() - start_time, 3)
+
+
+if __name__ == "__main__":
+    data = synthetic_data()
+    print(f"{EMPLOYEES} employees, {len(data[0])} working days, {len(data[2])} time-off records")
+
+    legacy, legacy_time = timed(legacy_capacity, *data)
+    print(f"[i] legacy set loop     | capacity: {legacy} | Execution time: {legacy_time}s")
+
+    matrix, matrix_time = timed(matrix_capacity, *data)
+    print(f"[i] availability matrix | capacity: {matrix} | Execution time: {matrix_time}s")
+
+    assert legacy == matrix
+    if matrix_time:
+        print(f"Speedup: {round(legacy_time / matrix_time, 1)}x")
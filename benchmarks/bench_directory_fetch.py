@@ -0,0 +1,36 @@
+"""
+Payload size and parse time of the employees fetch from '/employees/directory'
+vs the field-projected custom report, against the local fake BambooHR server.
+
+    PYTHONPATH=. python benchmarks/bench_directory_fetch.py [employees]
+"""
+import sys
+import time
+
+from benchmarks.fake_bamboo import FakeBambooServer, generate_tenant
+from client import BambooTimeOff
+
+
+def fetch(bamboo, server, source, path, rounds=5):
+    before = server.bytes_sent.get(path, 0)
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        employees = bamboo.get_employees_from_bamboo(source)
+    execution_time = round((time.perf_counter() - start_time) / rounds, 4)
+    payload = (server.bytes_sent[path] - before) // rounds
+    return employees, payload, execution_time
+
+
+if __name__ == "__main__":
+    employees_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with FakeBambooServer(generate_tenant(employees=employees_count, time_off_records=0)) as server:
+        bamboo = BambooTimeOff(base_url=server.base_url, local_store=True)
+        print(f"{employees_count} employees")
+
+        directory, payload, execution_time = fetch(bamboo, server, "directory", "/employees/directory")
+        print(f"[i] directory     | Payload: {payload // 1024} KB | Execution time: {execution_time}s")
+
+        report, payload, execution_time = fetch(bamboo, server, "report", "/reports/custom")
+        print(f"[i] custom report | Payload: {payload // 1024} KB | Execution time: {execution_time}s")
+
+        assert len(directory) == len(report)
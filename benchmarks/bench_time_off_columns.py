@@ -0,0 +1,72 @@
+"""
+Parsing cost and memory of 50k '/time_off/whos_out/' records, as the list of
+dicts re-parsed by every method vs the shared TimeOffColumns.
+
+    PYTHONPATH=. python benchmarks/bench_time_off_columns.py
+"""
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from time_off.columns import TimeOffColumns
+
+RECORDS = 50_000
+# get_company_holidays, calculate_capacity and the availability helpers
+# each walked the records and parsed the dates again
+CONSUMERS = 3
+
+
+def synthetic_payload(seed=42):
+    rnd = random.Random(seed)
+    start = date(2025, 1, 1)
+    records = []
+    for record_id in range(1, RECORDS + 1):
+        out_start = start + timedelta(days=rnd.randint(0, 365))
+        is_holiday = rnd.random() < 0.01
+        records.append({
+            "id": record_id,
+            "type": "holiday" if is_holiday else "timeOff",
+            "employeeId": None if is_holiday else rnd.randint(1, 10_000),
+            "name": f"Employee {record_id}",
+            "start": out_start.isoformat(),
+            "end": (out_start + timedelta(days=rnd.randint(0, 10))).isoformat(),
+        })
+    return json.dumps(records)
+
+
+def parse_dicts(payload):
+    records = json.loads(payload)
+    for _ in range(CONSUMERS):
+        for record in records:
+            date.fromisoformat(record["start"])
+            date.fromisoformat(record["end"])
+    return records
+
+
+def parse_columns(payload):
+    return TimeOffColumns.from_records(json.loads(payload))
+
+
+def measure(func, payload):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func(payload)
+    execution_time = round(time.perf_counter() - start_time, 3)
+    # Memory kept by the result, the json payload is freed
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, execution_time, retained
+
+
+if __name__ == "__main__":
+    payload = synthetic_payload()
+    print(f"{RECORDS} records, {round(len(payload) / 1024 / 1024, 1)} MB payload")
+
+    _, dicts_time, dicts_memory = measure(parse_dicts, payload)
+    print(f"[i] list of dicts x{CONSUMERS} parses | Memory: {dicts_memory // 1024} KB | Execution time: {dicts_time}s")
+
+    columns, columns_time, columns_memory = measure(parse_columns, payload)
+    print(f"[i] TimeOffColumns, parsed once | Memory: {columns_memory // 1024} KB | Execution time: {columns_time}s")
+    print(f"Column data: {columns.nbytes() // 1024} KB")
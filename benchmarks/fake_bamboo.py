@@ -0,0 +1,195 @@
+"""
+Local fake BambooHR API with seeded synthetic tenants, for benchmarks and
+integration tests. It serves the endpoints the client uses:
+'/employees/directory', '/reports/custom', '/time_off/whos_out/' and
+'/time_off/requests'.
+
+    with FakeBambooServer(generate_tenant(employees=1000)) as server:
+        bamboo = BambooTimeOff(base_url=server.base_url, local_store=True)
+"""
+import json
+import random
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+JOB_TITLES = (
+    "Backend Developer", "Senior Backend Engineer", "Frontend Developer", "QA Engineer",
+    "QA Automation Engineer", "DevOps Engineer", "Java Developer", "SMG Analyst",
+    "Product Manager", "Designer", "Engineering Manager",
+)
+DEPARTMENTS = ("Server", "Web", "QA", "Infrastructure", "Product")
+DIVISIONS = ("Athens", "Thessaloniki", "Remote")
+TIME_OFF_TYPES = ("Vacation", "Sick", "Parental", "Training")
+STATUSES = ("approved", "approved", "approved", "requested", "denied")
+MAX_TIME_OFF_DAYS = 14
+
+
+def generate_tenant(employees=100, time_off_records=1000, start=date(2025, 1, 1), days=365, seed=42) -> dict:
+    """
+    A synthetic tenant: directory entries with all the fields BambooHR returns,
+    time-off requests spread over the days and the public holidays.
+    """
+    rnd = random.Random(seed)
+    directory = []
+    for emp_id in range(1, employees + 1):
+        first_name = f"First{emp_id}"
+        last_name = f"Last{emp_id}"
+        manager_id = rnd.randint(1, emp_id - 1) if emp_id > 1 else None
+        directory.append({
+            "id": str(emp_id),
+            "displayName": f"{first_name} {last_name}",
+            "firstName": first_name,
+            "lastName": last_name,
+            "preferredName": None,
+            "jobTitle": rnd.choice(JOB_TITLES),
+            "workPhone": f"+30210{emp_id:07d}",
+            "mobilePhone": f"+30690{emp_id:07d}",
+            "workEmail": f"{first_name.lower()}@example.com",
+            "skypeUsername": None,
+            "facebook": None,
+            "linkedIn": f"https://www.linkedin.com/in/{first_name.lower()}-{last_name.lower()}",
+            "department": rnd.choice(DEPARTMENTS),
+            "location": "Athens, Greece",
+            "division": rnd.choice(DIVISIONS),
+            "supervisor": f"First{manager_id} Last{manager_id}" if manager_id else None,
+            "photoUploaded": False,
+            "photoUrl": "https://resources.bamboohr.com/images/photo_person_160x160.png",
+            "canUploadPhoto": 0,
+            "pronouns": None,
+        })
+
+    time_off = []
+    for record_id in range(1, time_off_records + 1):
+        out_start = start + timedelta(days=rnd.randint(0, days - 1))
+        out_end = out_start + timedelta(days=rnd.randint(0, MAX_TIME_OFF_DAYS - 1))
+        emp_id = rnd.randint(1, employees)
+        status = rnd.choice(STATUSES)
+        time_off.append({
+            "id": str(record_id),
+            "employeeId": str(emp_id),
+            "name": f"First{emp_id} Last{emp_id}",
+            "status": {"lastChanged": start.isoformat(), "lastChangedByUserId": "1",
+                       "status": status, "id": status},
+            "start": out_start.isoformat(),
+            "end": out_end.isoformat(),
+            "created": start.isoformat(),
+            "type": {"id": "1", "name": rnd.choice(TIME_OFF_TYPES), "icon": "palm-trees"},
+            "amount": {"unit": "days", "amount": str((out_end - out_start).days + 1)},
+            "notes": {},
+        })
+    time_off.sort(key=lambda record: record["start"])
+
+    holidays = []
+    for year in range(start.year, (start + timedelta(days=days)).year + 1):
+        for holiday_id, (month, day, name) in enumerate(
+                ((1, 1, "New Year's Day"), (3, 25, "Independence Day"), (12, 25, "Christmas Day")), start=1
+        ):
+            holidays.append({
+                "id": year * 10 + holiday_id, "type": "holiday", "name": name,
+                "start": date(year, month, day).isoformat(), "end": date(year, month, day).isoformat(),
+            })
+    return {"employees": directory, "time_off": time_off, "holidays": holidays}
+
+
+class FakeBambooServer:
+    """
+    Threaded HTTP server with the tenant data, bound to a free local port.
+    bytes_sent counts the response bytes per path.
+    """
+
+    def __init__(self, tenant: dict):
+        self.tenant = tenant
+        self.starts = [record["start"] for record in tenant["time_off"]]
+        self.bytes_sent = {}
+        self.requests = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}/api/gateway.php/fake/v1"
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def overlapping_time_off(self, start: str, end: str) -> list[dict]:
+        # Requests are sorted by start and last at most MAX_TIME_OFF_DAYS
+        earliest = (date.fromisoformat(start) - timedelta(days=MAX_TIME_OFF_DAYS)).isoformat()
+        records = self.tenant["time_off"][bisect_left(self.starts, earliest):bisect_right(self.starts, end)]
+        return [record for record in records if record["end"] >= start]
+
+    def whos_out(self, start: str, end: str) -> list[dict]:
+        items = [
+            {"id": int(record["id"]), "type": "timeOff", "employeeId": int(record["employeeId"]),
+             "name": record["name"], "start": record["start"], "end": record["end"]}
+            for record in self.overlapping_time_off(start, end) if record["status"]["id"] == "approved"
+        ]
+        items.extend(
+            holiday for holiday in self.tenant["holidays"] if holiday["start"] <= end and holiday["end"] >= start
+        )
+        return sorted(items, key=lambda item: item["start"])
+
+    def custom_report(self, fields: list) -> dict:
+        return {
+            "title": "Employees",
+            "fields": [{"id": field, "type": "text", "name": field} for field in fields],
+            "employees": [
+                {"id": emp["id"], **{field: emp.get(field) for field in fields}}
+                for emp in self.tenant["employees"]
+            ],
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, path, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent[path] = server.bytes_sent.get(path, 0) + len(body)
+                    server.requests[path] = server.requests.get(path, 0) + 1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path.split("/v1", 1)[-1]
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if path == "/employees/directory":
+                    self._send(path, {"fields": [], "employees": server.tenant["employees"]})
+                elif path in ("/time_off/whos_out", "/time_off/whos_out/"):
+                    self._send(path, server.whos_out(query["start"], query["end"]))
+                elif path == "/time_off/requests":
+                    self._send(path, server.overlapping_time_off(query["start"], query["end"]))
+                else:
+                    self._send(path, {"error": "Not found"}, status=404)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                path = url.path.split("/v1", 1)[-1]
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if path == "/reports/custom":
+                    self._send(path, server.custom_report(body.get("fields", [])))
+                else:
+                    self._send(path, {"error": "Not found"}, status=404)
+
+        return Handler
@@ -0,0 +1,251 @@
+"""
+Benchmark suite of the client against the local fake BambooHR server with
+seeded synthetic tenants. Every benchmark runs a number of rounds and the
+min/median/mean times are recorded to benchmarks/results/<commit>.json,
+so the results of two commits can be compared.
+
+    PYTHONPATH=. python benchmarks/suite.py run --sizes small,medium
+    PYTHONPATH=. python benchmarks/suite.py run --sizes large --filter capacity
+    PYTHONPATH=. python benchmarks/suite.py compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlmodel import SQLModel, create_engine
+
+from benchmarks.fake_bamboo import FakeBambooServer, generate_tenant
+from client import BambooTimeOff
+from employees.load_employees_to_db import parse_employees_and_save_to_db
+
+# (employees, time-off records)
+SIZES = {
+    "tiny": (20, 200),
+    "small": (100, 1_000),
+    "medium": (1_000, 10_000),
+    "large": (10_000, 100_000),
+    "xlarge": (50_000, 500_000),
+}
+RESULTS_DIR = pathlib.Path(__file__).parent / "results"
+TENANT_START = date(2025, 1, 1)
+# A two weeks sprint and a quarter in the middle of the synthetic year
+SPRINT = ("2025-06-02", "2025-06-15")
+QUARTER = ("2025-04-01", "2025-06-30")
+
+
+class Context:
+    """
+    A synthetic tenant served by the fake server, with a client and its own
+    database file, shared by the benchmarks of one size.
+    """
+
+    def __init__(self, employees: int, time_off_records: int):
+        self.tenant = generate_tenant(employees=employees, time_off_records=time_off_records, start=TENANT_START)
+        self.server = FakeBambooServer(self.tenant)
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.db_dir.name}/bench.db")
+        SQLModel.metadata.create_all(self.engine)
+
+    def __enter__(self):
+        self.server.start()
+        # The network client loads the directory of the tenant into the empty database
+        self.client = BambooTimeOff(base_url=self.server.base_url, engine=self.engine)
+        # Answers from the same database, after a sync_time_off() of the network client
+        self.local_client = BambooTimeOff(base_url=self.server.base_url, engine=self.engine, local_store=True)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.stop()
+        self.engine.dispose()
+        self.db_dir.cleanup()
+
+
+def bench_directory_load(ctx: Context):
+    engine = create_engine(f"sqlite:///{ctx.db_dir.name}/directory.db")
+    SQLModel.metadata.create_all(engine)
+
+    def run():
+        parse_employees_and_save_to_db(ctx.client.get_employees_from_bamboo(), engine=engine, update_existing=True)
+    return run
+
+
+def bench_employee_queries(ctx: Context):
+    actions = ctx.client.emp_qs
+    excluded = [int(emp["id"]) for emp in ctx.tenant["employees"][::10]]
+
+    def run():
+        actions.get_all_employees()
+        actions.get_employees_excluding_ids(excluded)
+        actions.get_employees_by_sector("BE")
+        actions.count_employees_by_attribute("department", excluded)
+    return run
+
+
+def bench_calculate_capacity(ctx: Context):
+    def run():
+        ctx.client.calculate_capacity(*SPRINT, sector=("BE", "FE", "QA"))
+    return run
+
+
+def bench_calculate_capacity_local_store(ctx: Context):
+    ctx.client.sync_time_off(*QUARTER)
+
+    def run():
+        ctx.local_client.calculate_capacity(*SPRINT)
+    return run
+
+
+def bench_get_working_days(ctx: Context):
+    def run():
+        # The holidays of the range are fetched every round
+        ctx.client.get_working_days(*QUARTER)
+    return run
+
+
+def bench_get_available_employees(ctx: Context):
+    def run():
+        ctx.client.get_available_employees(*SPRINT, only_ids=True)
+    return run
+
+
+def bench_get_available_employees_no_perms(ctx: Context):
+    def run():
+        ctx.client.get_available_employees_no_perms(*SPRINT)
+    return run
+
+
+def bench_search_employees(ctx: Context):
+    # Exact, short prefixes, several words and typos of the synthetic names and job titles
+    queries = ("last12", "l", "fir", "first1 last", "lsat12", "frist7", "develper", "qa autom")
+    ctx.client.search_employees(queries[0])
+
+    def run():
+        for query in queries:
+            ctx.client.search_employees(query)
+    return run
+
+
+BENCHMARKS = {
+    "directory_load": bench_directory_load,
+    "employee_queries": bench_employee_queries,
+    "calculate_capacity": bench_calculate_capacity,
+    "calculate_capacity_local_store": bench_calculate_capacity_local_store,
+    "get_working_days": bench_get_working_days,
+    "get_available_employees": bench_get_available_employees,
+    "get_available_employees_no_perms": bench_get_available_employees_no_perms,
+    "search_employees": bench_search_employees,
+}
+
+
+def measure(func, rounds: int) -> dict:
+    times = []
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start_time)
+    return {
+        "rounds": rounds,
+        "min": round(min(times), 6),
+        "median": round(statistics.median(times), 6),
+        "mean": round(statistics.fmean(times), 6),
+    }
+
+
+def run_suite(sizes=("small",), names=None, rounds=5, report=print) -> dict:
+    """
+    Run the benchmarks (all or the ones containing one of names) for every size.
+    Returns {"<size>/<benchmark>": timings}.
+    """
+    results = {}
+    for size in sizes:
+        employees, time_off_records = SIZES[size]
+        report(f"{size}: {employees} employees, {time_off_records} time-off records")
+        for name, setup in BENCHMARKS.items():
+            if names and not any(part in name for part in names):
+                continue
+            # Fresh tenant and client per benchmark, no cache warmed by another benchmark
+            with Context(employees, time_off_records) as ctx:
+                timings = measure(setup(ctx), rounds)
+            results[f"{size}/{name}"] = timings
+            report(f"[i] {name:<34} | median: {timings['median']:.4f}s | min: {timings['min']:.4f}s")
+    return results
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: dict, path=None) -> pathlib.Path:
+    commit = current_commit()
+    path = pathlib.Path(path) if path else RESULTS_DIR / f"{commit}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    # Merge with the results of other sizes recorded for the same commit
+    if path.exists():
+        previous = json.loads(path.read_text())
+        payload["results"] = {**previous.get("results", {}), **results}
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def compare(base: dict, new: dict, threshold=0.1) -> list[dict]:
+    """
+    The median ratio new/base of every benchmark of both result sets.
+    Ratios above 1 + threshold are regressions, below 1 - threshold improvements.
+    """
+    rows = []
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        ratio = new["results"][key]["median"] / base["results"][key]["median"]
+        status = "slower" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "same"
+        rows.append({"benchmark": key, "base": base["results"][key]["median"],
+                     "new": new["results"][key]["median"], "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Client benchmarks against the fake BambooHR server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run")
+    run.add_argument("--sizes", default="small", help=f"Comma separated, of {', '.join(SIZES)}")
+    run.add_argument("--filter", help="Comma separated parts of the benchmark names to run")
+    run.add_argument("--rounds", type=int, default=5)
+    run.add_argument("-o", "--output", help="Results file, defaults to benchmarks/results/<commit>.json")
+    compare_cmd = commands.add_parser("compare")
+    compare_cmd.add_argument("base")
+    compare_cmd.add_argument("new")
+    compare_cmd.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        names = args.filter.split(",") if args.filter else None
+        results = run_suite(args.sizes.split(","), names, args.rounds)
+        print(f"Results saved to {save_results(results, args.output)}")
+        return 0
+
+    with open(args.base) as base_file, open(args.new) as new_file:
+        rows = compare(json.load(base_file), json.load(new_file), args.threshold)
+    for row in rows:
+        print(f"{row['benchmark']:<50} | {row['base']:.4f}s -> {row['new']:.4f}s | x{row['ratio']} {row['status']}")
+    return 1 if any(row["status"] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+from datetime import date
+from typing import Iterable, Optional
+
+from time_off.columns import as_columns
+
+# int.bit_count() is available on python >= 3.10
+_popcount = getattr(int, "bit_count", None) or (lambda mask: bin(mask).count("1"))
+
+
+def working_day_prefix(working_dates: list[date]) -> tuple[int, int, list[int]]:
+    """
+    Prefix sums of the working days over the calendar days of the range.
+    prefix[k] is the number of working days before the k-th calendar day,
+    so it converts a day ordinal to a working day index in O(1).
+    Returns the first and last ordinals of the range and the prefix list.
+    """
+    first_ordinal = working_dates[0].toordinal() if working_dates else 0
+    last_ordinal = working_dates[-1].toordinal() if working_dates else -1
+    prefix = [0] * (last_ordinal - first_ordinal + 2)
+    for working_date in working_dates:
+        prefix[working_date.toordinal() - first_ordinal + 1] = 1
+    for k in range(1, len(prefix)):
+        prefix[k] += prefix[k - 1]
+    return first_ordinal, last_ordinal, prefix
+
+
+class AvailabilityMatrix:
+    """
+    Employees x working days availability matrix.
+    Every employee row is an int bitmask where the bit i is set when the
+    employee is out of office on the i-th working date of the range, so
+    marking an absence is one shift/or and the reductions are popcounts.
+    """
+
+    def __init__(self, working_dates: Iterable[date], employee_ids: Iterable):
+        self.working_dates = list(working_dates)
+        self.days = len(self.working_dates)
+        self.full_mask = (1 << self.days) - 1
+
+        self.employee_ids = []
+        self.index = {}
+        for emp_id in employee_ids:
+            emp_id = int(emp_id)
+            if emp_id not in self.index:
+                self.index[emp_id] = len(self.employee_ids)
+                self.employee_ids.append(emp_id)
+        self.rows = [0] * len(self.employee_ids)
+
+        self.first_ordinal, self.last_ordinal, self.prefix = working_day_prefix(self.working_dates)
+
+    @classmethod
+    def from_records(cls, working_dates, employee_ids, records) -> "AvailabilityMatrix":
+        """
+        Build the matrix from '/time_off/whos_out/' records or their parsed TimeOffColumns.
+        Records without an employee (e.g. holidays) are ignored.
+        """
+        matrix = cls(working_dates, employee_ids)
+        for _, emp_id, start_ordinal, end_ordinal in as_columns(records).absences():
+            matrix.mark_out(emp_id, start_ordinal, end_ordinal)
+        return matrix
+
+    def range_mask(self, start_ordinal: int, end_ordinal: int) -> int:
+        """
+        Bitmask of the working days between two day ordinals (inclusive).
+        """
+        lo = max(start_ordinal, self.first_ordinal)
+        hi = min(end_ordinal, self.last_ordinal)
+        if lo > hi:
+            return 0
+        lo_bit = self.prefix[lo - self.first_ordinal]
+        hi_bit = self.prefix[hi - self.first_ordinal + 1]
+        if hi_bit <= lo_bit:
+            return 0
+        return ((1 << (hi_bit - lo_bit)) - 1) << lo_bit
+
+    def mark_out(self, emp_id, start_ordinal: int, end_ordinal: int) -> None:
+        row = self.index.get(int(emp_id))
+        if row is None:
+            return
+        self.rows[row] |= self.range_mask(start_ordinal, end_ordinal)
+
+    def _selected_rows(self, employee_ids=None) -> list[int]:
+        if employee_ids is None:
+            return self.rows
+        rows = []
+        for emp_id in employee_ids:
+            row = self.index.get(int(emp_id))
+            if row is not None:
+                rows.append(self.rows[row])
+        return rows
+
+    def available_days_per_employee(self) -> dict:
+        return {
+            emp_id: self.days - _popcount(mask)
+            for emp_id, mask in zip(self.employee_ids, self.rows)
+        }
+
+    def total_available_days(self, employee_ids=None, window_mask=None) -> int:
+        """
+        Sum of the available working days of the employees, optionally only
+        inside a window of working days (see range_mask).
+        """
+        rows = self._selected_rows(employee_ids)
+        if window_mask is None:
+            return len(rows) * self.days - sum(_popcount(mask) for mask in rows if mask)
+        return len(rows) * _popcount(window_mask) - sum(
+            _popcount(mask & window_mask) for mask in rows if mask
+        )
+
+    def available_days_by_group(self, groups: dict) -> dict:
+        """
+        Sum of the available working days per group, in one pass over the rows.
+
+        Args:
+            groups (dict): Employee ID to group name, employees not in it are skipped.
+        """
+        totals = {}
+        for emp_id, mask in zip(self.employee_ids, self.rows):
+            if emp_id not in groups:
+                continue
+            group = groups[emp_id]
+            totals[group] = totals.get(group, 0) + self.days - _popcount(mask)
+        return totals
+
+    def capacity(self, hours_per_day=8, focus_factor=1.0, employee_ids=None, window_mask=None) -> float:
+        return self.total_available_days(employee_ids, window_mask) * hours_per_day * focus_factor
+
+    def out_count_per_day(self, employee_ids=None) -> list[int]:
+        """
+        Number of employees out of office on every working date.
+        Only the set bits are visited, so the cost follows the absences, not the matrix size.
+        """
+        counts = [0] * self.days
+        for mask in self._selected_rows(employee_ids):
+            while mask:
+                low_bit = mask & -mask
+                counts[low_bit.bit_length() - 1] += 1
+                mask ^= low_bit
+        return counts
+
+    def headcount_per_day(self, employee_ids: Optional[Iterable] = None) -> list[int]:
+        """
+        Number of available employees on every working date.
+        """
+        if employee_ids is not None:
+            employee_ids = list(employee_ids)
+            total = len(self._selected_rows(employee_ids))
+        else:
+            total = len(self.rows)
+        return [total - out for out in self.out_count_per_day(employee_ids)]
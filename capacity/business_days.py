@@ -0,0 +1,143 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Callable, Iterable, Optional, Union
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def parse_weekend(weekend: Union[str, Iterable]) -> frozenset:
+    """
+    Accepts the weekend as weekday numbers (0 is Monday), weekday names
+    or a 7 characters mask starting from Monday, e.g. "0000011" or "0000110".
+    """
+    if isinstance(weekend, str):
+        if len(weekend) != 7 or set(weekend) - {"0", "1"}:
+            raise ValueError(f"Invalid weekend mask: {weekend}")
+        return frozenset(day for day, flag in enumerate(weekend) if flag == "1")
+
+    days = set()
+    for day in weekend:
+        if isinstance(day, str):
+            day = WEEKDAYS.index(day.capitalize())
+        if not 0 <= day <= 6:
+            raise ValueError(f"Invalid weekday: {day}")
+        days.add(day)
+    return frozenset(days)
+
+
+class BusinessCalendar:
+    """
+    Working days calendar with the company holidays cached per year.
+    For every loaded year it keeps the sorted working day ordinals and the
+    prefix sums of working days, so counting the working days of a range is
+    O(1) per year and listing them is a slice. Safe to share between threads.
+    """
+
+    def __init__(self, holidays_loader: Optional[Callable[[int], Iterable[date]]] = None,
+                 weekend: Union[str, Iterable] = (5, 6)):
+        # holidays_loader(year) returns the holiday dates of the year
+        self.holidays_loader = holidays_loader
+        self.weekend = parse_weekend(weekend)
+        self._years = {}
+        # A year is loaded once even when many threads ask for it
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """
+        Forget the cached years, e.g. after the holidays have changed.
+        """
+        with self._lock:
+            self._years.clear()
+
+    def _year(self, year: int) -> dict:
+        cached = self._years.get(year)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._years.get(year)
+            if cached is None:
+                cached = self._years[year] = self._load_year(year)
+            return cached
+
+    def _load_year(self, year: int) -> dict:
+        holidays = set()
+        if self.holidays_loader is not None:
+            holidays = {day for day in self.holidays_loader(year) if day.year == year}
+
+        first = date(year, 1, 1).toordinal()
+        last = date(year, 12, 31).toordinal()
+        working_ordinals = self._working_ordinals(first, last, {day.toordinal() for day in holidays})
+        # prefix[k]: working days before the k-th day of the year
+        prefix = [0] * (last - first + 2)
+        for ordinal in working_ordinals:
+            prefix[ordinal - first + 1] = 1
+        for k in range(1, len(prefix)):
+            prefix[k] += prefix[k - 1]
+
+        return {
+            "first": first,
+            "holidays": frozenset(holidays),
+            "working_ordinals": working_ordinals,
+            "prefix": prefix,
+        }
+
+    def _working_ordinals(self, first: int, last: int, holiday_ordinals) -> list[int]:
+        """
+        The working day ordinals of [first, last], the weekdays follow from the ordinals.
+        """
+        # date.fromordinal(1) is a Monday
+        working_weekdays = [day for day in range(7) if day not in self.weekend]
+        ordinals = []
+        for weekday in working_weekdays:
+            offset = (weekday - (first - 1)) % 7
+            ordinals.extend(range(first + offset, last + 1, 7))
+        ordinals.sort()
+        if holiday_ordinals:
+            ordinals = [ordinal for ordinal in ordinals if ordinal not in holiday_ordinals]
+        return ordinals
+
+    def holidays(self, year: int) -> frozenset:
+        return self._year(year)["holidays"]
+
+    def is_working_day(self, day: date) -> bool:
+        cached = self._year(day.year)
+        prefix = cached["prefix"]
+        k = day.toordinal() - cached["first"]
+        return prefix[k + 1] > prefix[k]
+
+    def working_days_between(self, start: date, end: date, holidays: Optional[Iterable[date]] = None) -> int:
+        """
+        Number of working days between two dates, both inclusive.
+        Given the holidays of the range, only the range is computed and nothing is cached.
+        """
+        if holidays is not None:
+            return len(self._range_ordinals(start, end, holidays))
+        total = 0
+        for year in range(start.year, end.year + 1):
+            cached = self._year(year)
+            prefix = cached["prefix"]
+            lo = (max(start, date(year, 1, 1))).toordinal() - cached["first"]
+            hi = (min(end, date(year, 12, 31))).toordinal() - cached["first"]
+            total += prefix[hi + 1] - prefix[lo]
+        return max(total, 0)
+
+    def _range_ordinals(self, start: date, end: date, holidays: Iterable[date]) -> list[int]:
+        return self._working_ordinals(start.toordinal(), end.toordinal(), {day.toordinal() for day in holidays})
+
+    def working_dates(self, start: date, end: date, holidays: Optional[Iterable[date]] = None) -> list[date]:
+        """
+        The working dates between two dates, both inclusive.
+        Given the holidays of the range, only the range is computed and nothing is cached.
+        """
+        if holidays is not None:
+            return [date.fromordinal(ordinal) for ordinal in self._range_ordinals(start, end, holidays)]
+        dates = []
+        start_ordinal = start.toordinal()
+        end_ordinal = end.toordinal()
+        for year in range(start.year, end.year + 1):
+            ordinals = self._year(year)["working_ordinals"]
+            lo = bisect_left(ordinals, start_ordinal)
+            hi = bisect_right(ordinals, end_ordinal)
+            dates.extend(date.fromordinal(ordinal) for ordinal in ordinals[lo:hi])
+        return dates
@@ -0,0 +1,148 @@
+from bisect import bisect_right
+from datetime import date
+from typing import Iterable, Union
+
+from capacity.availability import working_day_prefix
+from capacity.timeline import merge_absences
+
+
+def _ordinal(day: Union[date, str]) -> int:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.toordinal()
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, intervals):
+        self.center = center
+        self.by_start = sorted(intervals)
+        self.by_end = sorted(intervals, key=lambda interval: interval[1], reverse=True)
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over (start, end, value) day ordinal intervals.
+    Stabbing and overlap queries cost O(log n + k) for k results.
+    """
+
+    def __init__(self, intervals: Iterable[tuple]):
+        self.root = self._build(list(intervals))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+        center = endpoints[len(endpoints) // 2]
+        left = [interval for interval in intervals if interval[1] < center]
+        right = [interval for interval in intervals if interval[0] > center]
+        node = _Node(center, [interval for interval in intervals if interval[0] <= center <= interval[1]])
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def overlapping(self, start: int, end: int) -> list:
+        """
+        Values of the intervals overlapping [start, end]. A stabbing query is start == end.
+        """
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                # Every interval here ends at or after the center, past "end"
+                for interval in node.by_start:
+                    if interval[0] > end:
+                        break
+                    found.append(interval[2])
+                stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] < start:
+                        break
+                    found.append(interval[2])
+                stack.append(node.right)
+            else:
+                found.extend(interval[2] for interval in node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
+
+
+class AbsenceIndex:
+    """
+    Index over the absences of a date range, loaded once, that answers
+    "who is out on day X", "who is out during a range" and "who is available
+    on every / any working day of a range" without further HTTP or DB work.
+    """
+
+    def __init__(self, working_dates: Iterable[date], employee_ids: Iterable, records):
+        self.working_dates = list(working_dates)
+        self.employees = {int(emp_id) for emp_id in employee_ids}
+        self.first_ordinal, self.last_ordinal, self.prefix = working_day_prefix(self.working_dates)
+
+        # Disjoint absences per employee, to count the covered working days with a bisect
+        self.absences = merge_absences(records, self.employees)
+        self.absence_starts = {
+            emp_id: [start for start, _ in intervals] for emp_id, intervals in self.absences.items()
+        }
+        self.tree = IntervalTree(
+            (start, end, emp_id) for emp_id, intervals in self.absences.items() for start, end in intervals
+        )
+
+    def _working_days_between(self, start: int, end: int) -> int:
+        lo = max(start, self.first_ordinal)
+        hi = min(end, self.last_ordinal)
+        if lo > hi:
+            return 0
+        return self.prefix[hi - self.first_ordinal + 1] - self.prefix[lo - self.first_ordinal]
+
+    def out_on(self, day: Union[date, str]) -> set:
+        ordinal = _ordinal(day)
+        return set(self.tree.overlapping(ordinal, ordinal))
+
+    def out_between(self, start: Union[date, str], end: Union[date, str]) -> set:
+        """
+        Employees out of office at least one day of the range.
+        """
+        return set(self.tree.overlapping(_ordinal(start), _ordinal(end)))
+
+    def available_on(self, day: Union[date, str]) -> set:
+        return self.employees - self.out_on(day)
+
+    def available_every_day(self, start: Union[date, str], end: Union[date, str]) -> set:
+        """
+        Employees without any absence in the range.
+        """
+        return self.employees - self.out_between(start, end)
+
+    def out_working_days(self, emp_id, start: Union[date, str], end: Union[date, str]) -> int:
+        """
+        Number of working days of the range the employee is out of office.
+        """
+        start, end = _ordinal(start), _ordinal(end)
+        intervals = self.absences.get(int(emp_id), [])
+        i = max(bisect_right(self.absence_starts.get(int(emp_id), []), start) - 1, 0)
+        total = 0
+        while i < len(intervals) and intervals[i][0] <= end:
+            total += self._working_days_between(max(intervals[i][0], start), min(intervals[i][1], end))
+            i += 1
+        return total
+
+    def available_any_day(self, start: Union[date, str], end: Union[date, str]) -> set:
+        """
+        Employees available at least one working day of the range.
+        """
+        working_days = self._working_days_between(_ordinal(start), _ordinal(end))
+        if not working_days:
+            return set()
+        fully_out = {
+            emp_id for emp_id in self.out_between(start, end)
+            if self.out_working_days(emp_id, start, end) >= working_days
+        }
+        return self.employees - fully_out
@@ -0,0 +1,143 @@
+from datetime import date
+from typing import Iterable
+
+from capacity.availability import working_day_prefix
+from time_off.columns import as_columns
+
+
+class LiveCapacity:
+    """
+    Stateful capacity of a date range that follows time-off and employee
+    events. Every event updates the per-day counters in O(affected days),
+    so a long-running service keeps the numbers current without refetching.
+    """
+
+    def __init__(self, working_dates: Iterable[date], employee_ids: Iterable, hours_per_day=8,
+                 focus_factor=0.75):
+        self.working_dates = list(working_dates)
+        self.days = len(self.working_dates)
+        self.hours_per_day = hours_per_day
+        self.focus_factor = focus_factor
+        self.first_ordinal, self.last_ordinal, self.prefix = working_day_prefix(self.working_dates)
+
+        self.employees = {int(emp_id) for emp_id in employee_ids}
+        # Out of office records by key and, per employee, how many records cover each working day
+        self.records = {}
+        self.coverage = {}
+        # Tracked employees out of office per working day and in total
+        self.out_per_day = [0] * self.days
+        self.out_total = 0
+
+    @classmethod
+    def from_records(cls, working_dates, employee_ids, records, **kwargs) -> "LiveCapacity":
+        """
+        Baseline from '/time_off/whos_out/' records or their parsed TimeOffColumns.
+        """
+        live = cls(working_dates, employee_ids, **kwargs)
+        for record_id, emp_id, start_ordinal, end_ordinal in as_columns(records).absences():
+            key = record_id or (emp_id, date.fromordinal(start_ordinal).isoformat(),
+                                date.fromordinal(end_ordinal).isoformat())
+            if key not in live.records:
+                live._apply(key, emp_id, start_ordinal, end_ordinal)
+        return live
+
+    @staticmethod
+    def _record_key(record: dict):
+        if record.get("id") is not None:
+            return int(record["id"])
+        return int(record["employeeId"]), record["start"], record["end"]
+
+    def _day_indexes(self, start_ordinal: int, end_ordinal: int) -> range:
+        lo = max(start_ordinal, self.first_ordinal)
+        hi = min(end_ordinal, self.last_ordinal)
+        if lo > hi:
+            return range(0)
+        return range(self.prefix[lo - self.first_ordinal], self.prefix[hi - self.first_ordinal + 1])
+
+    def _cover(self, emp_id: int, day_indexes: range, step: int) -> None:
+        coverage = self.coverage.setdefault(emp_id, {})
+        tracked = emp_id in self.employees
+        for i in day_indexes:
+            before = coverage.get(i, 0)
+            after = before + step
+            if after:
+                coverage[i] = after
+            else:
+                coverage.pop(i, None)
+            # Only the first record covering a day makes the employee out of office
+            if tracked and (before == 0) != (after == 0):
+                change = 1 if after else -1
+                self.out_per_day[i] += change
+                self.out_total += change
+        if not coverage:
+            del self.coverage[emp_id]
+
+    def add_time_off(self, record: dict) -> bool:
+        """
+        Apply a new '/time_off/whos_out/' record. Returns False for records
+        without an employee (e.g. holidays) or already applied ones.
+        """
+        if not record.get("employeeId"):
+            return False
+        key = self._record_key(record)
+        if key in self.records:
+            return False
+
+        self._apply(
+            key,
+            int(record["employeeId"]),
+            date.fromisoformat(record["start"]).toordinal(),
+            date.fromisoformat(record["end"]).toordinal(),
+        )
+        return True
+
+    def _apply(self, key, emp_id: int, start_ordinal: int, end_ordinal: int) -> None:
+        days = self._day_indexes(start_ordinal, end_ordinal)
+        self.records[key] = (emp_id, days)
+        self._cover(emp_id, days, 1)
+
+    def remove_time_off(self, record: dict) -> bool:
+        """
+        Revert a record applied with add_time_off, e.g. a cancelled request.
+        Only its "id" is needed when the record has one.
+        """
+        if record.get("id") is None and not record.get("employeeId"):
+            return False
+        applied = self.records.pop(self._record_key(record), None)
+        if applied is None:
+            return False
+        emp_id, days = applied
+        self._cover(emp_id, days, -1)
+        return True
+
+    def add_employee(self, emp_id) -> bool:
+        emp_id = int(emp_id)
+        if emp_id in self.employees:
+            return False
+        self.employees.add(emp_id)
+        for i in self.coverage.get(emp_id, {}):
+            self.out_per_day[i] += 1
+            self.out_total += 1
+        return True
+
+    def remove_employee(self, emp_id) -> bool:
+        emp_id = int(emp_id)
+        if emp_id not in self.employees:
+            return False
+        self.employees.discard(emp_id)
+        for i in self.coverage.get(emp_id, {}):
+            self.out_per_day[i] -= 1
+            self.out_total -= 1
+        return True
+
+    @property
+    def total_available_days(self) -> int:
+        return len(self.employees) * self.days - self.out_total
+
+    @property
+    def capacity(self) -> float:
+        return self.total_available_days * self.hours_per_day * self.focus_factor
+
+    def headcount_per_day(self) -> list[int]:
+        total = len(self.employees)
+        return [total - out for out in self.out_per_day]
@@ -0,0 +1,157 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+from capacity.availability import AvailabilityMatrix, _popcount
+
+# Trials per task, fixed so the results of a seed do not depend on the number of processes
+CHUNK_TRIALS = 500
+TOTAL_GROUP = "total"
+
+
+def _poisson(rnd: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam < 30:
+        # Knuth's multiplication method
+        limit = math.exp(-lam)
+        count, product = 0, rnd.random()
+        while product > limit:
+            count += 1
+            product *= rnd.random()
+        return count
+    # Normal approximation, accurate enough for the large rates
+    return max(0, round(rnd.gauss(lam, math.sqrt(lam))))
+
+
+def _draw_focus(rnd: random.Random, focus_factor) -> float:
+    if isinstance(focus_factor, (tuple, list)):
+        low, mode, high = focus_factor
+        return rnd.triangular(low, high, mode)
+    return focus_factor
+
+
+def _run_chunk(task: tuple) -> list[list[list[float]]]:
+    """
+    Run a chunk of trials. Returns the capacities per window, per group, per trial.
+    """
+    (rows, member_groups, windows, base_days, days, absence_rate, mean_absence_days,
+     focus_factor, hours_per_day, seed, trials) = task
+    rnd = random.Random(seed)
+    employees = len(rows)
+    group_count = len(base_days[0]) if base_days else 0
+    # Expected unplanned absence days per trial spread in spells of mean_absence_days
+    spells_rate = absence_rate * days * employees / mean_absence_days
+    log_continue = math.log(1 - 1 / mean_absence_days) if mean_absence_days > 1 else None
+
+    results = [[[] for _ in range(group_count)] for _ in windows]
+    for _ in range(trials):
+        # Only the employees hit by a spell are visited, the cost follows the absences
+        lost = {}
+        if employees and days:
+            for _ in range(_poisson(rnd, spells_rate)):
+                emp = rnd.randrange(employees)
+                length = 1
+                if log_continue is not None:
+                    length += int(math.log(1.0 - rnd.random()) / log_continue)
+                lost[emp] = lost.get(emp, 0) | (((1 << length) - 1) << rnd.randrange(days))
+        focus = _draw_focus(rnd, focus_factor)
+
+        for window_index, window in enumerate(windows):
+            lost_days = [0] * group_count
+            for emp, mask in lost.items():
+                # Days already out of office (or outside the window) are not lost again
+                days_lost = _popcount(mask & window & ~rows[emp])
+                if days_lost:
+                    for group in member_groups[emp]:
+                        lost_days[group] += days_lost
+            window_results = results[window_index]
+            for group in range(group_count):
+                window_results[group].append(
+                    (base_days[window_index][group] - lost_days[group]) * hours_per_day * focus
+                )
+    return results
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Linear interpolation between the closest ranks of sorted values.
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def simulate_capacity(availability: AvailabilityMatrix, groups: dict, windows: list[int], trials=10_000,
+                      absence_rate=0.02, mean_absence_days=2.0,
+                      focus_factor: Union[float, tuple] = (0.6, 0.75, 0.9), hours_per_day=8,
+                      percentiles=(10, 50, 90), processes: Optional[int] = None, seed=None) -> list[list[dict]]:
+    """
+    Monte Carlo capacity of groups of employees over windows of working days.
+    Every trial adds unplanned absence spells on top of the known absences of
+    the availability matrix and draws the focus factor of the team.
+
+    Args:
+        availability (AvailabilityMatrix): The known absences over the working days.
+        groups (dict): Group name to the employee IDs, a "total" group of all of them is added.
+        windows (list): Working day bitmasks (see AvailabilityMatrix.range_mask), e.g. one per sprint.
+        absence_rate (float): Probability of an unplanned absence per employee and working day.
+        mean_absence_days (float): Mean length in working days of an unplanned absence (geometric).
+        focus_factor (float or tuple): A fixed focus factor or the (low, mode, high) of a triangular one.
+        processes (int, optional): Worker processes, defaults to the number of CPUs, 1 runs in-process.
+        seed (optional): Seed for reproducible results, the same for any number of processes.
+
+    Returns:
+        list: Per window, one row per group with the mean and the percentile capacities in hours.
+    """
+    index = {emp_id: position for position, emp_id in enumerate(availability.employee_ids)}
+    names = list(groups) + [TOTAL_GROUP]
+    members = [[index[int(emp_id)] for emp_id in ids if int(emp_id) in index] for ids in groups.values()]
+    members.append(sorted({position for group in members for position in group}))
+
+    rows = list(availability.rows)
+    member_groups = [[] for _ in rows]
+    for group, positions in enumerate(members):
+        for position in positions:
+            member_groups[position].append(group)
+    base_days = [
+        [availability.total_available_days([availability.employee_ids[p] for p in positions], window)
+         for positions in members]
+        for window in windows
+    ]
+
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    tasks = []
+    for chunk, chunk_start in enumerate(range(0, trials, CHUNK_TRIALS)):
+        tasks.append((rows, member_groups, windows, base_days, availability.days, absence_rate,
+                      mean_absence_days, focus_factor, hours_per_day, f"{seed}:{chunk}",
+                      min(CHUNK_TRIALS, trials - chunk_start)))
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        chunks = list(map(_run_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as executor:
+            chunks = list(executor.map(_run_chunk, tasks))
+
+    results = []
+    for window_index, window in enumerate(windows):
+        rows_of_window = []
+        for group, name in enumerate(names):
+            samples = sorted(value for chunk in chunks for value in chunk[window_index][group])
+            row = {
+                "group": name,
+                "employees": len(members[group]),
+                "working_days": _popcount(window),
+                "mean": sum(samples) / len(samples) if samples else 0.0,
+            }
+            for percent in percentiles:
+                row[f"p{percent:g}"] = percentile(samples, percent)
+            rows_of_window.append(row)
+        results.append(rows_of_window)
+    return results
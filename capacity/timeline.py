@@ -0,0 +1,76 @@
+from datetime import date
+
+from time_off.columns import as_columns
+
+
+def merge_absences(records, employee_ids=None) -> dict:
+    """
+    Merge the overlapping or adjacent '/time_off/whos_out/' records (or their
+    parsed TimeOffColumns) of every employee into disjoint (start, end) day
+    ordinal intervals.
+    Only the given employees are kept, all of them when employee_ids is None.
+    """
+    intervals = {}
+    for _, emp_id, start_ordinal, end_ordinal in as_columns(records).absences():
+        if employee_ids is not None and emp_id not in employee_ids:
+            continue
+        intervals.setdefault(emp_id, []).append((start_ordinal, end_ordinal))
+
+    merged = {}
+    for emp_id, emp_intervals in intervals.items():
+        emp_intervals.sort()
+        current_start, current_end = emp_intervals[0]
+        merged[emp_id] = []
+        for start, end in emp_intervals[1:]:
+            if start <= current_end + 1:
+                current_end = max(current_end, end)
+            else:
+                merged[emp_id].append((current_start, current_end))
+                current_start, current_end = start, end
+        merged[emp_id].append((current_start, current_end))
+    return merged
+
+
+def out_count_timeline(working_dates: list[date], employee_groups: dict, records) -> dict:
+    """
+    Number of employees out of office on every working date, per group.
+    One pass over the merged absence intervals adds +1/-1 to a difference
+    array over the day ordinals of the range, a prefix sum gives the counts.
+
+    Args:
+        working_dates (list): The sorted working dates of the range.
+        employee_groups (dict): Employee ID to group name (e.g. the sector).
+        records (list): The '/time_off/whos_out/' records of the range, or their TimeOffColumns.
+
+    Returns:
+        dict: Group name to a list with the out of office count of every working date.
+    """
+    groups = set(employee_groups.values())
+    if not working_dates:
+        return {group: [] for group in groups}
+
+    first = working_dates[0].toordinal()
+    last = working_dates[-1].toordinal()
+    span = last - first + 1
+    diffs = {group: [0] * (span + 1) for group in groups}
+
+    for emp_id, intervals in merge_absences(records, employee_groups).items():
+        diff = diffs[employee_groups[emp_id]]
+        for start, end in intervals:
+            lo = max(start, first)
+            hi = min(end, last)
+            if lo > hi:
+                continue
+            diff[lo - first] += 1
+            diff[hi - first + 1] -= 1
+
+    offsets = [working_date.toordinal() - first for working_date in working_dates]
+    timeline = {}
+    for group, diff in diffs.items():
+        running = 0
+        counts = []
+        for k in range(span):
+            running += diff[k]
+            counts.append(running)
+        timeline[group] = [counts[offset] for offset in offsets]
+    return timeline
@@ -0,0 +1,182 @@
+"""
+Non-interactive command line interface, e.g.
+
+    python cli.py capacity --start 2024-12-23 --end 2024-12-29 --sector BE,QA
+    python cli.py available --start 2024-12-23 --end 2024-12-29 --format csv -o available.csv
+    python cli.py out --format ndjson
+    python cli.py working-days --start 2024-12-01 --end 2024-12-31 --total
+    python cli.py sync time-off --start 2024-12-01 --end 2025-03-31
+    python cli.py export store.snapshot
+
+The results are streamed row by row as JSON (default), NDJSON or CSV.
+The client and the output writers are imported after the arguments are
+parsed, and the client imports its optional features (simulation, snapshots,
+profiling, search, prefetch) only when they are used.
+"""
+import argparse
+import sys
+from datetime import date
+from typing import Iterator
+
+OUTPUT_BUFFER_SIZE = 64 * 1024
+EMPLOYEE_FIELDS = ["bamboo_id", "f_name", "l_name", "display_name", "job_title", "sector",
+                   "department", "division", "location", "supervisor", "mobile_phone", "photo_url"]
+OUT_FIELDS = ["id", "type", "employeeId", "name", "start", "end"]
+
+
+def _date(value: str) -> str:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date: {value}, expected YYYY-MM-DD")
+    return value
+
+
+def _sector(value: str) -> tuple:
+    return tuple(sector.strip() for sector in value.split(",") if sector.strip())
+
+
+def _ids(value: str) -> list:
+    try:
+        return [int(id) for id in value.split(",") if id.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid IDs: {value}, expected numbers separated by commas")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    today = date.today().isoformat()
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=("json", "ndjson", "csv"), default="json", help="Output format")
+    common.add_argument("-o", "--output", help="Write to this file instead of the standard output")
+    common.add_argument("--local-store", action="store_true", help="Answer from the local database")
+    common.add_argument("--token", help="BambooHR API key, defaults to the settings")
+    common.add_argument("--domain", help="BambooHR company domain, defaults to the settings")
+    common.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="Write cProfile stats and collapsed stacks of the run to DIR (default: profiles)")
+    common.add_argument("--profile-memory", action="store_true", help="Also write tracemalloc snapshots")
+
+    ranged = argparse.ArgumentParser(add_help=False)
+    ranged.add_argument("--start", type=_date, default=today, help="YYYY-MM-DD, defaults to today")
+    ranged.add_argument("--end", type=_date, default=today, help="YYYY-MM-DD, defaults to today")
+
+    parser = argparse.ArgumentParser(prog="cli.py", description="BambooHR capacity and availability")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capacity = commands.add_parser("capacity", parents=[common, ranged], help="Sprint capacity in hours")
+    capacity.add_argument("--focus-factor", type=float, default=0.75)
+    group = capacity.add_mutually_exclusive_group()
+    group.add_argument("--sector", type=_sector, help="Sectors separated by commas, e.g. BE,QA")
+    group.add_argument("--ids", type=_ids, help="Employee IDs separated by commas")
+    capacity.set_defaults(handler=capacity_rows)
+
+    available = commands.add_parser("available", parents=[common, ranged], help="Available employees")
+    available.add_argument("--sector", type=_sector, help="Sectors separated by commas, e.g. BE,QA")
+    available.set_defaults(handler=available_rows)
+
+    out = commands.add_parser("out", parents=[common, ranged], help="Who is out of office")
+    out.set_defaults(handler=out_rows)
+
+    working_days = commands.add_parser("working-days", parents=[common, ranged], help="Working days")
+    working_days.add_argument("--total", action="store_true", help="Only the number of working days")
+    working_days.set_defaults(handler=working_days_rows)
+
+    sync = commands.add_parser("sync", parents=[common], help="Refresh the local database")
+    sync.add_argument("target", choices=("employees", "time-off"))
+    sync.add_argument("--start", type=_date, default=today, help="Time-off range start, defaults to today")
+    sync.add_argument("--end", type=_date, help="Time-off range end, defaults to 90 days after the start")
+    sync.add_argument("--requests", action="store_true",
+                      help="Sync '/time_off/requests' with the status of every request (needs permissions)")
+    sync.add_argument("--source", choices=("directory", "report"), help="Where the employees are fetched from")
+    sync.set_defaults(handler=sync_rows)
+
+    export = commands.add_parser("export", parents=[common], help="Write the local database to a snapshot file")
+    export.add_argument("path", help="The snapshot file, loaded with BambooTimeOff.from_snapshot()")
+    export.set_defaults(handler=export_rows, local_store=True)
+
+    return parser
+
+
+def make_client(args):
+    # Imported here, parsing the arguments and printing the help stay fast
+    from client import BambooTimeOff
+
+    return BambooTimeOff(args.token, args.domain, local_store=args.local_store)
+
+
+def capacity_rows(client, args) -> Iterator[dict]:
+    selection = args.ids if args.ids is not None else args.sector
+    capacity = client.calculate_capacity(args.start, args.end, args.focus_factor, sector=selection)
+    yield {"start": args.start, "end": args.end, "focus_factor": args.focus_factor, "capacity": capacity}
+
+
+def available_rows(client, args) -> Iterator[dict]:
+    for emp in client.get_available_employees_no_perms(args.start, args.end, sector=args.sector):
+        yield {field: getattr(emp, field) for field in EMPLOYEE_FIELDS}
+
+
+def out_rows(client, args) -> Iterator[dict]:
+    for record in client.get_who_is_out_employees(args.start, args.end):
+        yield {field: record.get(field) for field in OUT_FIELDS}
+
+
+def working_days_rows(client, args) -> Iterator[dict]:
+    if args.total:
+        yield {"start": args.start, "end": args.end,
+               "total": client.get_working_days(args.start, args.end, return_total=True)}
+        return
+    for day in client.get_working_days(args.start, args.end):
+        yield {"date": day.isoformat(), "weekday": day.strftime("%A")}
+
+
+def sync_rows(client, args) -> Iterator[dict]:
+    if args.target == "employees":
+        yield {"target": args.target, "synced": client.sync_employees(args.source)}
+        return
+
+    end = args.end or date.fromordinal(date.fromisoformat(args.start).toordinal() + 90).isoformat()
+    if args.requests:
+        synced = client.sync_time_off_requests(args.start, end)
+    else:
+        synced = client.sync_time_off(args.start, end)
+    yield {"target": args.target, "start": args.start, "end": end, "synced": synced}
+
+
+def export_rows(client, args) -> Iterator[dict]:
+    yield {"path": args.path, **client.export_snapshot(args.path)}
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from helpers.profiling import Profiler, env_settings
+    from helpers.writers import write_rows
+
+    directory, memory = env_settings()
+    directory = args.profile or directory
+    profiler = Profiler(args.command, directory, memory or args.profile_memory) if directory else None
+
+    client = make_client(args)
+    if args.output:
+        stream = open(args.output, "w", newline="", buffering=OUTPUT_BUFFER_SIZE)
+    else:
+        # Buffered, the rows are not flushed one by one on a terminal
+        sys.stdout.flush()
+        stream = open(sys.stdout.fileno(), "w", newline="", buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+    try:
+        if profiler is None:
+            write_rows(args.handler(client, args), args.format, stream)
+        else:
+            with profiler:
+                write_rows(args.handler(client, args), args.format, stream)
+            print(f"Profile written to {', '.join(str(path) for path in profiler.paths)}", file=sys.stderr)
+    except Exception as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    finally:
+        stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,36 @@
 import base64
+import contextlib
 import logging
-from typing import Union
+import threading
+from typing import TYPE_CHECKING, Iterator, Optional, Union
 
 import requests
 import time
 from datetime import date, timedelta
 
+from capacity.availability import AvailabilityMatrix, _popcount
+from capacity.business_days import BusinessCalendar
+from capacity.interval_index import AbsenceIndex
+from capacity.live import LiveCapacity
+from capacity.timeline import out_count_timeline
 from employees.load_employees_to_db import parse_employees_and_save_to_db
-from employees.models import EmployeeActions
+from employees.models import Employee, EmployeeActions
+from employees.sectors import NO_SECTOR, SectorClassifier
+from helpers.cache import MemoCache, memoize
 from helpers.helpers import add_params_to_url
+from helpers.stream import iter_json_array
 from settings.vars import debug, api_key, bamboo_domain
+from time_off.columns import TimeOffColumns
+from time_off.load_time_off_to_db import parse_time_off_and_save_to_db
+from time_off.models import TimeOffActions
+
+if TYPE_CHECKING:
+    from helpers.prefetch import PrefetchScheduler
+    from helpers.profiling import Profiler
+
+# The modules of the optional features (simulation, snapshots, profiling, search,
+# org tree, prefetch) are imported by the methods using them, so a CLI run or a
+# script does not pay for multiprocessing, mmap or cProfile it never uses.
 
 # Set up logging
 logging.basicConfig(
@@ -19,30 +40,75 @@ logging.basicConfig(
     format='%(name)s - %(levelname)s - %(message)s'
 )
 
+# The directory fields stored by the Employee model
+REPORT_FIELDS = (
+    "firstName", "lastName", "displayName", "jobTitle", "mobilePhone", "photoUrl",
+    "department", "division", "location", "supervisor",
+)
+
+
 class BambooTimeOff:
-    def __init__(self, token=None, company_domain=None):
+    def __init__(self, token=None, company_domain=None, local_store=False, weekend=(5, 6), cache_size=0,
+                 directory_source="directory", base_url=None, session=None, engine=None):
         _token = token or api_key
-        _company_domain = bamboo_domain or company_domain
+        _company_domain = company_domain or bamboo_domain
+        self.company_domain = _company_domain
 
-        self.base_url = f"https://api.bamboohr.com/api/gateway.php/{_company_domain}/v1"
+        # base_url overrides the API root, e.g. for a local fake server
+        self.base_url = base_url or f"https://api.bamboohr.com/api/gateway.php/{_company_domain}/v1"
         self.token = f"{_token}:random"
         self.token = base64.b64encode(self.token.encode('utf-8')).decode('utf-8')
         self.headers = {
             "Accept": "application/json",
             "authorization": "Basic {}".format(self.token)
         }
-        # Use session for connection reuse
-        self.session = requests.Session()
-        self.emp_qs = EmployeeActions()
-
-        if self.emp_qs.count_all_available_employees() == 0:
+        # Use session for connection reuse, a given one may share its connection pool with other clients
+        self.session = session or requests.Session()
+        # The session of a worker thread, see use_session()
+        self._thread_state = threading.local()
+        # The employees and time-off stores, defaults to the settings db_name database
+        self.emp_qs = EmployeeActions(engine)
+        self.time_off_qs = TimeOffActions(engine)
+        # Answer time-off and directory questions from the local db, without network access
+        self.local_store = local_store
+        # Holidays cached per year, weekend given as weekday numbers or a "0000011" mask
+        self.calendar = BusinessCalendar(self._get_year_holidays, weekend=weekend)
+        # Memoized capacity and availability results, bumping the data version invalidates them
+        self.cache = MemoCache(cache_size) if cache_size else None
+        self.data_version = 0
+        # Background threads (prefetch, snapshot sync) bump the version too
+        self._version_lock = threading.Lock()
+        # Where the employees are fetched from: "directory" or the field-projected "report"
+        self.directory_source = directory_source
+        # Background refresh of the upcoming days, see start_prefetch()
+        self.prefetch = None
+        # Built on the first search_employees() call, then follows the employees table
+        self.search_index = None
+
+        if not self.local_store and self.emp_qs.count_all_available_employees() == 0:
             try:
                 emps = self.get_employees_from_bamboo()
-                parse_employees_and_save_to_db(emps)
+                parse_employees_and_save_to_db(emps, engine=self.emp_qs.engine)
             except Exception as e:
                 logging.error(f"Error: {e}")
 
-    def send_request(self, method: str, url: str, extra_headers=None) -> Union[None, requests.Response]:
+    @contextlib.contextmanager
+    def use_session(self, session: requests.Session):
+        """
+        Send the requests of the current thread with the given session inside the with block.
+        requests.Session is not thread-safe, so worker threads use their own.
+        """
+        previous = getattr(self._thread_state, "session", None)
+        self._thread_state.session = session
+        try:
+            yield session
+        finally:
+            self._thread_state.session = previous
+
+    def send_request(self, method: str, url: str, extra_headers=None, stream=False,
+                     json_body=None, session=None) -> Union[None, requests.Response]:
+        # session overrides the client's one, e.g. for the calls of a background thread
+        session = session or getattr(self._thread_state, "session", None) or self.session
         headers = self.headers.copy()
         if extra_headers:
             headers.update(extra_headers)
@@ -50,7 +116,9 @@ class BambooTimeOff:
         start_time = time.time()
         try:
             if method == "GET":
-                response = self.session.get(url, headers=headers, timeout=10)
+                response = session.get(url, headers=headers, timeout=10, stream=stream)
+            elif method == "POST":
+                response = session.post(url, headers=headers, timeout=10, stream=stream, json=json_body)
             else:
                 raise NotImplementedError(f"Method {method} is not implemented.")
         except requests.exceptions.RequestException as e:
@@ -65,15 +133,43 @@ class BambooTimeOff:
         response.raise_for_status()
         return response
 
-    def get_employees_from_bamboo(self) -> list[dict]:
+    def get_employees_from_bamboo(self, source=None) -> list[dict]:
         """
         Fetch all employees from BambooHR.
+        source (str, optional): "directory" for '/employees/directory' or "report"
+            for a custom report with only the fields the Employee model stores.
+            Defaults to the client's directory_source.
         """
+        source = source or self.directory_source
+        if self.prefetch is not None and source == self.directory_source:
+            employees = self.prefetch.get_employees()
+            if employees is not None:
+                return employees
+        return self._fetch_employees(source)
+
+    def _fetch_employees(self, source: str, session=None) -> list[dict]:
+        if source == "report":
+            return self.get_employees_from_report(session=session)
+        if source != "directory":
+            raise ValueError(f"Unknown employees source: {source}")
+
         url = f"{self.base_url}/employees/directory"
-        response = self.send_request("GET", url)
+        response = self.send_request("GET", url, session=session)
         employees = response.json().get("employees")
         return employees
 
+    def get_employees_from_report(self, fields=REPORT_FIELDS, session=None) -> list[dict]:
+        """
+        Fetch the employees with a custom report of only the given fields.
+        The items use the same keys as '/employees/directory', so they share
+        the same parsing and loading pipeline with a much smaller payload.
+        """
+        url = add_params_to_url(f"{self.base_url}/reports/custom", {"format": "JSON", "onlyCurrent": "true"})
+        body = {"title": "Employees", "fields": list(fields)}
+        response = self.send_request("POST", url, extra_headers={"Content-Type": "application/json"},
+                                     json_body=body, session=session)
+        return response.json().get("employees")
+
     def get_time_off(self, start_date: str, end_date: str) -> list[dict]:
         """
         Fetch time-off data for the specified date range.
@@ -89,36 +185,245 @@ class BambooTimeOff:
         time_off_data = response.json()
         return time_off_data
 
+    def iter_time_off(self, start_date: str, end_date: str) -> Iterator[tuple]:
+        """
+        Stream the time-off requests of the date range and yield only the
+        (employeeId, status id) of every request, while the response downloads.
+        Attention: Restrictions are applied for Time-Off Data Access.
+        """
+        url = f"{self.base_url}/time_off/requests"
+        url = add_params_to_url(url, {"start": start_date, "end": end_date})
+        response = self.send_request("GET", url, stream=True)
+        try:
+            for request in iter_json_array(response.iter_content(chunk_size=64 * 1024)):
+                yield request.get("employeeId"), (request.get("status") or {}).get("id")
+        finally:
+            response.close()
+
     def get_who_is_out_employees(self, start: str, end: str, only_ids=False) -> (list)[dict]:
         """
         Get the employees that are out of office for specific date range
         # start - a date in the form YYYY-MM-DD - defaults to the current date.
         # end - a date in the form YYYY-MM-DD - defaults to 14 days from the start date.
         """
-        url = f"{self.base_url}/time_off/whos_out/"
-        url = add_params_to_url(url, {"start": start, "end": end})
-        rsp = self.send_request("GET", url)
-        employees = rsp.json()
+        employees = None
+        if self.local_store:
+            employees = self._get_who_is_out_from_store(start, end)
+        elif self.prefetch is not None:
+            employees = self.prefetch.get_who_is_out(start, end)
+        if employees is None:
+            employees = self._fetch_who_is_out(start, end)
         if only_ids:
             employees = [emp.get("employeeId") for emp in employees]
         return employees
 
+    def _fetch_who_is_out(self, start: str, end: str, session=None) -> list[dict]:
+        url = f"{self.base_url}/time_off/whos_out/"
+        url = add_params_to_url(url, {"start": start, "end": end})
+        return self.send_request("GET", url, session=session).json()
+
+    @memoize
+    def get_who_is_out_columns(self, start: str, end: str) -> TimeOffColumns:
+        """
+        The out of office records of the date range parsed once into compact
+        columns (employee IDs, start/end day ordinals, type codes), which every
+        capacity and availability method consumes. With the cache enabled the
+        parsed columns are shared between the methods asking for the same range.
+        """
+        return TimeOffColumns.from_records(self.get_who_is_out_employees(start, end))
+
+    def _get_who_is_out_from_store(self, start: str, end: str) -> list[dict]:
+        """
+        Read the out of office records from the local time-off store,
+        in the same form as the '/time_off/whos_out/' response.
+        """
+        start_date = date.fromisoformat(start)
+        end_date = date.fromisoformat(end)
+        if not self.time_off_qs.is_range_synced(start_date, end_date):
+            logging.warning(f"Time-off store is not synced for {start} - {end}")
+
+        records = self.time_off_qs.get_records(start_date, end_date)
+        return [
+            {
+                "id": record.bamboo_id,
+                "type": record.kind,
+                "employeeId": record.employee_id,
+                "name": record.name,
+                "start": record.start_date.isoformat(),
+                "end": record.end_date.isoformat(),
+            }
+            for record in records
+        ]
+
+    def bump_data_version(self) -> int:
+        """
+        Mark the employees or time-off data as changed. Memoized results of
+        older versions are not returned anymore and age out of the cache.
+        """
+        with self._version_lock:
+            self.data_version += 1
+            self.calendar.clear()
+            return self.data_version
+
+    def start_prefetch(self, window_days=30, interval=900, jitter=0.1, max_workers=2) -> "PrefetchScheduler":
+        """
+        Refresh the who's out records and the directory of today and the next
+        days in the background, every interval seconds (with +/- jitter ratio).
+        get_who_is_out_employees(), calculate_capacity() and the other methods
+        reading them answer from the prefetched data when the range is in the window.
+        """
+        from helpers.prefetch import PrefetchScheduler
+
+        if self.prefetch is None:
+            self.prefetch = PrefetchScheduler(
+                self, window_days=window_days, interval=interval, jitter=jitter, max_workers=max_workers
+            )
+        self.prefetch.start()
+        return self.prefetch
+
+    def stop_prefetch(self):
+        if self.prefetch is not None:
+            self.prefetch.stop()
+            self.prefetch = None
+
+    @classmethod
+    def from_snapshot(cls, path, sync_days=90, **kwargs) -> "BambooTimeOff":
+        """
+        A local store client answering from the snapshot file right away,
+        without fetching the directory first. Check load_snapshot().
+        """
+        client = cls(local_store=True, **kwargs)
+        client.load_snapshot(path, sync_days=sync_days)
+        return client
+
+    def export_snapshot(self, path) -> dict:
+        """
+        Write the employees and the time-off store to a snapshot file (check db/snapshot.py).
+        Returns the number of exported rows per table.
+        """
+        from db.snapshot import export_snapshot
+
+        return export_snapshot(path, self.emp_qs.engine)
+
+    def load_snapshot(self, path, sync_days=90, background=True) -> Optional[threading.Thread]:
+        """
+        Answer the local store questions from a memory-mapped snapshot file right away.
+        Then the snapshot is restored into the database (the tables that are still
+        empty, stored rows may be newer), the file is unmapped, and the employees and the
+        time off of today and the next sync_days are synced from BambooHR
+        (sync_days=0 skips the sync), in a background thread unless background is False.
+        """
+        from db.snapshot import Snapshot, SnapshotEmployeeActions, SnapshotTimeOffActions
+
+        snapshot = Snapshot(path)
+        db_emp_qs, db_time_off_qs = self.emp_qs, self.time_off_qs
+        self.emp_qs = SnapshotEmployeeActions(snapshot, db_emp_qs.engine)
+        self.time_off_qs = SnapshotTimeOffActions(snapshot, db_time_off_qs.engine)
+        self.local_store = True
+        self.bump_data_version()
+
+        def restore_and_sync():
+            try:
+                snapshot.restore(db_emp_qs.engine)
+                self.emp_qs, self.time_off_qs = db_emp_qs, db_time_off_qs
+                self.bump_data_version()
+                # Waits for the readers in progress, the later ones go to the database
+                snapshot.close()
+                if sync_days:
+                    start = date.today()
+                    self.sync_employees()
+                    self.sync_time_off(start.isoformat(), (start + timedelta(days=sync_days)).isoformat())
+            except Exception as e:
+                logging.error(f"Error restoring or syncing the snapshot {path}: {e}")
+
+        if not background:
+            restore_and_sync()
+            return None
+        thread = threading.Thread(target=restore_and_sync, name="bamboo-snapshot-sync", daemon=True)
+        thread.start()
+        return thread
+
+    def profile(self, name="bamboo", directory=None, memory=None) -> "Profiler":
+        """
+        Profile the client calls of a with block:
+
+            with bamboo.profile("capacity", memory=True):
+                bamboo.calculate_capacity("2024-12-23", "2024-12-29")
+
+        The directory and memory flag default to the BAMBOO_PROFILE and
+        BAMBOO_PROFILE_MEMORY env vars (check helpers/profiling.py).
+        """
+        from helpers.profiling import Profiler, env_settings
+
+        env_directory, env_memory = env_settings()
+        return Profiler(name, directory=directory or env_directory,
+                        memory=env_memory if memory is None else memory)
+
+    def cache_stats(self) -> dict:
+        """
+        Hit/miss counters and size of the memoization cache.
+        """
+        if self.cache is None:
+            return {"hits": 0, "misses": 0, "size": 0, "maxsize": 0}
+        return self.cache.stats()
+
+    def sync_employees(self, source=None) -> int:
+        """
+        Refresh the local employees table from '/employees/directory' (or the
+        custom report when source is "report").
+        Existing employees are updated and the ones no longer listed are removed.
+        An empty or missing directory is never applied, it would remove everyone.
+        Returns the number of employees in the directory.
+        """
+        emps = self.get_employees_from_bamboo(source)
+        if not emps:
+            logging.error("The employees directory is empty, the local employees are kept")
+            return 0
+        parse_employees_and_save_to_db(emps, engine=self.emp_qs.engine, update_existing=True)
+        self.emp_qs.delete_employees_excluding_ids([emp.get("id") for emp in emps])
+        self.bump_data_version()
+        return len(emps)
+
+    def sync_time_off(self, start: str, end: str) -> int:
+        """
+        Refresh the local time-off store for the date range from '/time_off/whos_out/'.
+        Returns the number of stored records.
+        """
+        url = f"{self.base_url}/time_off/whos_out/"
+        url = add_params_to_url(url, {"start": start, "end": end})
+        records = self.send_request("GET", url).json()
+        parse_time_off_and_save_to_db(records, start, end, engine=self.time_off_qs.engine)
+        # Also drops the cached holidays of the calendar
+        self.bump_data_version()
+        return len(records)
+
+    def sync_time_off_requests(self, start: str, end: str) -> int:
+        """
+        Refresh the local time-off store for the date range from '/time_off/requests',
+        keeping the status of every request.
+        Attention: Restrictions are applied for Time-Off Data Access.
+        """
+        records = self.get_time_off(start, end)
+        parse_time_off_and_save_to_db(
+            records, start, end, engine=self.time_off_qs.engine, kinds=("timeOff",)
+        )
+        self.bump_data_version()
+        return len(records)
+
     def get_available_employees(self, start_date:str, end_date:str,  only_ids=False) -> list[dict]:
         """
         Calculate available employees with the use of '/employees/directory'
         The logic here is:
         1. Get all the employees from bamboo
-        2. Get the time_off requests
-        3. Filter the approved time off requests
+        2. Stream the time_off requests
+        3. Filter the approved time off requests while streaming
         4. Get the employees who are available
         """
         employees = self.get_employees_from_bamboo()
-        time_off = self.get_time_off(start_date, end_date)
 
-        unavailable_employee_ids = set()
-        for request in time_off:
-            if request.get("status", {}).get("id") == "approved":
-                unavailable_employee_ids.add(request["employeeId"])
+        unavailable_employee_ids = {
+            emp_id for emp_id, status in self.iter_time_off(start_date, end_date) if status == "approved"
+        }
 
         if only_ids:
             available_employees = [
@@ -131,6 +436,7 @@ class BambooTimeOff:
 
         return available_employees
 
+    @memoize
     def get_available_employees_no_perms(self, start:str, end:str, sector=None) -> list:
         """
         Get available employees with the use of '/time_off/whos_out/' endpoint.
@@ -142,13 +448,13 @@ class BambooTimeOff:
         2. Get all the employees that are available by excluding unavailable
         """
 
-        out_employees_ids = self.get_who_is_out_employees(start, end, only_ids=True)
+        out_employees_ids = self.get_who_is_out_columns(start, end).out_employee_ids()
 
-        if self.emp_qs.count_all_available_employees() == 0:
+        if not self.local_store and self.emp_qs.count_all_available_employees() == 0:
             # The database is empty try loading employees from bamboo
             try:
                 emps = self.get_employees_from_bamboo()
-                parse_employees_and_save_to_db(emps)
+                parse_employees_and_save_to_db(emps, engine=self.emp_qs.engine)
             except Exception as e:
                 print(f"Error: {e}")
 
@@ -163,27 +469,35 @@ class BambooTimeOff:
 
         return employees_objs
 
+    def search_employees(self, query: str, limit=10, ids=None) -> list[Employee]:
+        """
+        The employees best matching the words of the query by name or job title,
+        tolerating typos, e.g. search_employees("stef tsak") or search_employees("qa auto").
+        ids limits the results to these employee IDs, e.g. the available ones.
+        """
+        from employees.search import EmployeeSearchIndex
+
+        if self.search_index is None or self.search_index.engine is not self.emp_qs.engine:
+            self.search_index = EmployeeSearchIndex(self.emp_qs.get_all_employees(), engine=self.emp_qs.engine)
+        return [emp for emp, _ in self.search_index.search(query, limit=limit, ids=ids)]
+
     def get_company_holidays(self, start:str, end:str) -> list:
         """
         This function retrieves company holidays within a specified date range.
         The logic is:
-        1.Getting a list of employees who are out of office (get_who_is_out_employees)
-        2.Filtering this list to only include items where the type is "holiday"
-        3.Extracting the start date of each holiday and converting it to a date object
-        4.Returning a list of these holiday dates
-        """
-        items = self.get_who_is_out_employees(start, end)
-        holidays_dates = []
-        for item in items:
-            if item.get("type") == "holiday":
-                tmp_date = date.fromisoformat(item.get("start"))
-                holidays_dates.append(tmp_date)
-        return holidays_dates
+        1.Getting the parsed records of who is out of office (get_who_is_out_columns)
+        2.Filtering them to only include items where the type is "holiday"
+        3.Returning the start date of each holiday
+        """
+        return self.get_who_is_out_columns(start, end).holiday_dates()
 
     def get_working_days(self, start:str, end:str, return_total=False) -> Union[int, list[date]]:
         """
         Calculate the number of working days between two dates.
-        Working days are considered to be Monday through Friday, excluding weekends and holidays.
+        Working days are considered to be Monday through Friday (or the configured
+        weekend mask), excluding weekends and holidays.
+        With the local store the holidays are read once per year and cached in the
+        business calendar, otherwise the holidays of the range are fetched.
         Args:
             start (str): The start date.
             end (str): The end date.
@@ -193,23 +507,21 @@ class BambooTimeOff:
             int: The number of working days between the start and end dates.
 
         """
-
-        working_week_days = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
         start_date = date.fromisoformat(start)
         end_date = date.fromisoformat(end)
-        company_holidays = self.get_company_holidays(start, end)
-
-        working_dates = []
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.strftime("%A") in working_week_days and current_date not in company_holidays:
-                working_dates.append(current_date)
-            current_date += timedelta(days=1)
 
+        # Who's out of a whole year holds every time-off record of the company,
+        # without the local store only the range and its holidays are fetched and computed
+        holidays = None if self.local_store else self.get_company_holidays(start, end)
         if return_total:
-            return len(working_dates)
-        return working_dates
+            return self.calendar.working_days_between(start_date, end_date, holidays)
+        return self.calendar.working_dates(start_date, end_date, holidays)
+
+    def _get_year_holidays(self, year: int) -> list[date]:
+        # Only the holidays of the local store, not every time-off record of the year
+        return self.time_off_qs.get_holiday_dates(date(year, 1, 1), date(year, 12, 31))
 
+    @memoize
     def calculate_capacity(self, sprint_start, sprint_end, focus_factor=0.75, sector=None) -> float:
         """
         Calculates the sprint capacity of a team.
@@ -231,37 +543,22 @@ class BambooTimeOff:
             # Avoid unnecessary calculations if there are no working days
             return 0.0
 
-        working_days_in_sprint = len(working_dates)
-
         # Step 2: Fetch employees who are out during the sprint period
-        out_employees = self.get_who_is_out_employees(sprint_start, sprint_end)
-
-        # Step 3: Track unavailable days for each employee
-        unavailable_days = {}
-        for record in out_employees:
-            emp_id = record.get('employeeId')
-            if not emp_id:
-                continue
-
-            out_start = date.fromisoformat(record['start'])
-            out_end = date.fromisoformat(record['end'])
-            if emp_id not in unavailable_days:
-                unavailable_days[emp_id] = set()
+        out_employees = self.get_who_is_out_columns(sprint_start, sprint_end)
 
-            # Calculate the intersection of unavailable days and working days
-            unavailable_days[emp_id].update(
-                working_date for working_date in working_dates if out_start <= working_date <= out_end
-            )
-
-        # Step 4: Fetch all employees from BambooHR and filter by sector if needed
+        # Step 3: Fetch all employees from BambooHR and filter by sector if needed
         employees = []
-        for emp in self.get_employees_from_bamboo():
-            emp_id = emp.get('id')
+        if self.local_store:
+            directory = self.emp_qs.get_all_employees()
+        else:
+            directory = self.get_employees_from_bamboo()
+        for emp in directory:
+            emp_id = emp.bamboo_id if isinstance(emp, Employee) else emp.get('id')
             if not emp_id:
                 continue
 
             if sector and isinstance(sector, tuple):
-                _emp = self.emp_qs.get_employee_by_id(emp_id)
+                _emp = emp if isinstance(emp, Employee) else self.emp_qs.get_employee_by_id(emp_id)
                 if _emp and _emp.sector in sector:
                     employees.append(_emp)
             else:
@@ -271,15 +568,303 @@ class BambooTimeOff:
             # Specific employees IDs provided, get them only.
             employees = self.emp_qs.get_employees_by_ids(sector)
 
-        # Step 5: Calculate total raw capacity
-        total_raw_capacity = 0
-        for emp in employees:
-            emp_id = emp.bamboo_id if sector else emp['id']
-            # Calculate the number of available days for each employee
-            available_days = working_days_in_sprint - len(unavailable_days.get(emp_id, set()))
-            total_raw_capacity += available_days * hours_per_day
+        # Step 4: Mark the unavailable working days of each employee and
+        # calculate total raw capacity from the availability matrix
+        employee_ids = [emp.bamboo_id if isinstance(emp, Employee) else emp['id'] for emp in employees]
+        availability = AvailabilityMatrix.from_records(working_dates, employee_ids, out_employees)
+        total_raw_capacity = availability.capacity(hours_per_day)
 
-        # Step 6: Apply the focus factor
+        # Step 5: Apply the focus factor
         total_capacity = total_raw_capacity * focus_factor
 
-        return total_capacity
\ No newline at end of file
+        return total_capacity
+
+    def _get_employee_sectors(self, attribute="sector") -> dict:
+        """
+        Map every employee of the directory to the sector (or another attribute)
+        stored in the database, with one directory fetch and one database query.
+        """
+        stored = {emp.bamboo_id: getattr(emp, attribute) for emp in self.emp_qs.get_all_employees()}
+        if self.local_store:
+            return stored
+
+        sectors = {}
+        for emp in self.get_employees_from_bamboo():
+            emp_id = emp.get('id')
+            if emp_id:
+                sectors[int(emp_id)] = stored.get(int(emp_id))
+        return sectors
+
+    def _resolve_group_ids(self, group, sectors: dict) -> list[int]:
+        """
+        Employees of a group, with the same meaning as the "sector" argument
+        of calculate_capacity: a tuple of sectors, a list of IDs or None for everyone.
+        """
+        if isinstance(group, tuple):
+            return [emp_id for emp_id, emp_sector in sectors.items() if emp_sector in group]
+        if isinstance(group, list):
+            return [emp.bamboo_id for emp in self.emp_qs.get_employees_by_ids(group)]
+        return list(sectors)
+
+    @memoize
+    def calculate_capacity_batch(self, sprints, groups=None, focus_factor=0.75) -> list[dict]:
+        """
+        Calculates the capacity of many sprints for many groups of employees.
+        The directory and the out of office records are fetched once for the
+        union of the sprint ranges and every (sprint, group) capacity is
+        computed from one availability matrix.
+
+        Args:
+            sprints (list): The (start, end) dates of the sprints in YYYY-MM-DD format.
+            groups (dict, optional): Group name to a tuple of sectors, a list of IDs or None.
+                Defaults to all the employees.
+            focus_factor (float, optional): The focus factor to apply to the capacity. Defaults to 0.75.
+
+        Returns:
+            list: One row per (sprint, group) with the sprint dates, group name,
+            working days, number of employees and capacity in hours.
+        """
+        hours_per_day = 8
+        if not sprints:
+            return []
+        if groups is None:
+            groups = {"all": None}
+
+        union_start = min(start for start, _ in sprints)
+        union_end = max(end for _, end in sprints)
+        working_dates = self.get_working_days(union_start, union_end)
+        out_employees = self.get_who_is_out_columns(union_start, union_end) if working_dates else []
+
+        sectors = self._get_employee_sectors()
+        group_ids = {name: self._resolve_group_ids(group, sectors) for name, group in groups.items()}
+        all_ids = {emp_id for ids in group_ids.values() for emp_id in ids}
+        availability = AvailabilityMatrix.from_records(working_dates, all_ids, out_employees)
+
+        results = []
+        for sprint_start, sprint_end in sprints:
+            window = availability.range_mask(
+                date.fromisoformat(sprint_start).toordinal(), date.fromisoformat(sprint_end).toordinal()
+            )
+            for name, ids in group_ids.items():
+                capacity = availability.capacity(hours_per_day, focus_factor, ids, window)
+                results.append({
+                    "sprint_start": sprint_start,
+                    "sprint_end": sprint_end,
+                    "group": name,
+                    "working_days": _popcount(window),
+                    "employees": len(ids),
+                    "capacity": capacity,
+                })
+        return results
+
+    def simulate_capacity(self, sprints, groups=None, trials=10_000, absence_rate=0.02, mean_absence_days=2.0,
+                          focus_factor=(0.6, 0.75, 0.9), percentiles=(10, 50, 90), processes=None,
+                          seed=None) -> list[dict]:
+        """
+        What-if capacity of many sprints with Monte Carlo trials: on top of the
+        known time off, every trial adds random unplanned absences and draws the
+        focus factor, and the percentiles of the trial capacities give the risk range.
+        The trials run in a process pool (check capacity/simulation.py).
+
+        Args:
+            sprints (list): The (start, end) dates of the sprints in YYYY-MM-DD format.
+            groups (dict, optional): Group name to a tuple of sectors, a list of IDs or None,
+                as in calculate_capacity_batch. Defaults to one group per sector.
+            absence_rate (float): Probability of an unplanned absence per employee and working day.
+            mean_absence_days (float): Mean length of an unplanned absence in working days.
+            focus_factor (float or tuple): A fixed focus factor or the (low, mode, high) of a triangular one.
+            processes (int, optional): Worker processes, defaults to the number of CPUs.
+            seed (optional): Seed for reproducible results.
+
+        Returns:
+            list: One row per (sprint, group), plus a "total" group per sprint, with the
+            sprint dates, group, employees, working days, mean and percentile capacities
+            (e.g. "p10", "p50", "p90") in hours.
+        """
+        from capacity.simulation import simulate_capacity
+
+        if not sprints:
+            return []
+
+        union_start = min(start for start, _ in sprints)
+        union_end = max(end for _, end in sprints)
+        working_dates = self.get_working_days(union_start, union_end)
+        out_employees = self.get_who_is_out_columns(union_start, union_end) if working_dates else []
+
+        sectors = self._get_employee_sectors()
+        if groups is None:
+            # The employees without a sector (None) and the unclassified ones ("-") are one group
+            groups = {}
+            for sector in sorted(set(sectors.values()), key=str):
+                groups[sector or NO_SECTOR] = groups.get(sector or NO_SECTOR, ()) + (sector,)
+        group_ids = {name: self._resolve_group_ids(group, sectors) for name, group in groups.items()}
+        all_ids = {emp_id for ids in group_ids.values() for emp_id in ids}
+        availability = AvailabilityMatrix.from_records(working_dates, all_ids, out_employees)
+
+        windows = [
+            availability.range_mask(date.fromisoformat(start).toordinal(), date.fromisoformat(end).toordinal())
+            for start, end in sprints
+        ]
+        simulated = simulate_capacity(
+            availability, group_ids, windows, trials=trials, absence_rate=absence_rate,
+            mean_absence_days=mean_absence_days, focus_factor=focus_factor, percentiles=percentiles,
+            processes=processes, seed=seed,
+        )
+        return [
+            {"sprint_start": start, "sprint_end": end, **row}
+            for (start, end), rows in zip(sprints, simulated) for row in rows
+        ]
+
+    @memoize
+    def calculate_capacity_timeline(self, start, end, focus_factor=0.75, sector=None) -> list[dict]:
+        """
+        Calculates the available headcount and hours of every working day,
+        broken down by sector, in one pass over the out of office records.
+        Useful to draw daily availability or burndown charts.
+
+        Args:
+            start (str): The start date in YYYY-MM-DD format.
+            end (str): The end date in YYYY-MM-DD format.
+            focus_factor (float, optional): The focus factor to apply to the hours. Defaults to 0.75.
+            sector (tuple|list, optional): The sectors or the employees IDs to include.
+
+        Returns:
+            list: One item per working day, e.g.
+            {"date": date(2024, 12, 23), "available": 12, "hours": 72.0,
+             "sectors": {"BE": {"available": 5, "hours": 30.0}, ...}}
+        """
+        hours_per_day = 8
+        working_dates = self.get_working_days(start, end)
+        if not working_dates:
+            return []
+
+        out_employees = self.get_who_is_out_columns(start, end)
+        sectors = self._get_employee_sectors()
+        employee_groups = {
+            emp_id: sectors.get(emp_id) or "-" for emp_id in self._resolve_group_ids(sector, sectors)
+        }
+        headcount = {}
+        for group in employee_groups.values():
+            headcount[group] = headcount.get(group, 0) + 1
+
+        out_counts = out_count_timeline(working_dates, employee_groups, out_employees)
+
+        timeline = []
+        for i, working_date in enumerate(working_dates):
+            day = {"date": working_date, "available": 0, "hours": 0.0, "sectors": {}}
+            for group in sorted(headcount):
+                available = headcount[group] - out_counts[group][i]
+                hours = available * hours_per_day * focus_factor
+                day["sectors"][group] = {"available": available, "hours": hours}
+                day["available"] += available
+                day["hours"] += hours
+            timeline.append(day)
+        return timeline
+
+    def build_live_capacity(self, start, end, focus_factor=0.75, sector=None) -> LiveCapacity:
+        """
+        Baseline capacity of the range that can be kept current with
+        add_time_off/remove_time_off and add_employee/remove_employee events,
+        instead of recalculating the whole range on every change.
+
+        Args:
+            start (str): The start date in YYYY-MM-DD format.
+            end (str): The end date in YYYY-MM-DD format.
+            focus_factor (float, optional): The focus factor to apply to the capacity. Defaults to 0.75.
+            sector (tuple|list, optional): The sectors or the employees IDs to include.
+        """
+        working_dates = self.get_working_days(start, end)
+        out_employees = self.get_who_is_out_columns(start, end) if working_dates else []
+        sectors = self._get_employee_sectors()
+        return LiveCapacity.from_records(
+            working_dates, self._resolve_group_ids(sector, sectors), out_employees, focus_factor=focus_factor
+        )
+
+    def build_absence_index(self, start, end, sector=None) -> AbsenceIndex:
+        """
+        Load the absences of the range once into an interval index, to answer
+        per-day availability questions without more requests, e.g.
+        index.out_on("2024-12-23"), index.available_every_day(start, end)
+        or index.available_any_day(start, end).
+
+        Args:
+            start (str): The start date in YYYY-MM-DD format.
+            end (str): The end date in YYYY-MM-DD format.
+            sector (tuple|list, optional): The sectors or the employees IDs to include.
+        """
+        working_dates = self.get_working_days(start, end)
+        out_employees = self.get_who_is_out_columns(start, end)
+        sectors = self._get_employee_sectors()
+        return AbsenceIndex(working_dates, self._resolve_group_ids(sector, sectors), out_employees)
+
+    @memoize
+    def calculate_capacity_by_group(self, start, end, focus_factor=0.75, attribute="sector") -> dict:
+        """
+        Calculates the capacity of every sector, or of every value of another
+        employee attribute (e.g. "job_title"), with one fetch and one pass.
+        Gives the same numbers as calling calculate_capacity(sector=(value,))
+        for every value.
+
+        Args:
+            start (str): The start date in YYYY-MM-DD format.
+            end (str): The end date in YYYY-MM-DD format.
+            focus_factor (float, optional): The focus factor to apply to the capacity. Defaults to 0.75.
+            attribute (str, optional): The Employee attribute to group by. Defaults to "sector".
+
+        Returns:
+            dict: The capacity in hours of every group. For "sector" every sector of
+            the sector rules is included, even without employees.
+        """
+        hours_per_day = 8
+        groups = self._get_employee_sectors(attribute)
+        capacities = {}
+        if attribute == "sector":
+            capacities = {sector: 0.0 for sector in SectorClassifier.from_db(self.emp_qs.engine).sectors}
+
+        working_dates = self.get_working_days(start, end)
+        if not working_dates:
+            return {**capacities, **{group: 0.0 for group in groups.values()}}
+
+        out_employees = self.get_who_is_out_columns(start, end)
+        availability = AvailabilityMatrix.from_records(working_dates, groups, out_employees)
+        for group, days in availability.available_days_by_group(groups).items():
+            capacities[group] = days * hours_per_day * focus_factor
+        return capacities
+
+    def get_available_counts_by_group(self, start, end, attribute="department") -> dict:
+        """
+        Number of employees available for the whole date range per department,
+        division, location or any other Employee attribute, with one whos_out
+        fetch and one grouped query.
+        """
+        out_employees_ids = self.get_who_is_out_columns(start, end).out_employee_ids()
+        return self.emp_qs.count_employees_by_attribute(attribute, excluded_ids=out_employees_ids)
+
+    @memoize
+    def calculate_capacity_by_manager(self, start, end, focus_factor=0.75) -> dict:
+        """
+        Calculates the capacity of every manager's tree (the manager and everyone
+        reporting to them, directly or not), from the stored supervisors.
+
+        Returns:
+            dict: Manager ID to {"name": ..., "employees": ..., "capacity": ...}.
+        """
+        hours_per_day = 8
+        directory_ids = self._get_employee_sectors()
+        from employees.org_tree import OrgTree
+
+        org_tree = OrgTree(emp for emp in self.emp_qs.get_all_employees() if emp.bamboo_id in directory_ids)
+
+        working_dates = self.get_working_days(start, end)
+        out_employees = self.get_who_is_out_columns(start, end) if working_dates else []
+        availability = AvailabilityMatrix.from_records(working_dates, org_tree.order, out_employees)
+        available_days = org_tree.rollup(availability.available_days_per_employee())
+
+        return {
+            manager_id: {
+                "name": org_tree.names[manager_id],
+                "employees": len(org_tree.subtree(manager_id)),
+                "capacity": available_days[manager_id] * hours_per_day * focus_factor,
+            }
+            for manager_id in org_tree.managers()
+        }
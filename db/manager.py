@@ -1,7 +1,40 @@
 import pathlib
 from settings.vars import db_name
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, create_engine, Session
 
+
+def upgrade_schema(engine):
+    """
+    Add the nullable columns and the indexes of the models that are missing
+    from the tables of an existing database file.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def create_db_engine(db_path):
+    """
+    Engine of the sqlite database file with the tables of the models.
+    """
+    engine = create_engine(f'sqlite:///{db_path}')
+    # Creates only the missing tables and columns, e.g. the ones added after the db file
+    SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
+    return engine
+
+
 class DatabaseManager:
     _db_instance = None
 
@@ -16,11 +49,8 @@ class DatabaseManager:
         root_dir = pathlib.Path(__file__).parent.parent
         db_path = root_dir / db_name
         if not db_path.exists():
-            engine = create_engine(f'sqlite:///{db_name}')
-            SQLModel.metadata.create_all(engine)
-        else:
-            engine = create_engine(f'sqlite:///{db_path}')
-        return engine
+            return create_db_engine(db_name)
+        return create_db_engine(db_path)
 
     @classmethod
     def get_session(self):
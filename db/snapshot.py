@@ -0,0 +1,375 @@
+"""
+Compact, versioned binary snapshot of the local store: the employees, the
+time-off records and the synced time-off ranges. Every column is a packed
+little-endian array, texts are indexes into one de-duplicated string table,
+so the loader memory-maps the file and reads the columns without parsing.
+
+Layout:
+    header    "<8sHHI": magic, version, reserved, number of sections
+    sections  "<16sQQ" per section: name, offset, length in bytes
+    data      the sections, aligned to 8 bytes
+"""
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from employees.models import Employee, EmployeeActions
+from time_off.models import TimeOff, TimeOffActions, TimeOffSync
+
+MAGIC = b"BAMBOOSN"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+SECTION = struct.Struct("<16sQQ")
+ALIGNMENT = 8
+NO_STRING = -1
+
+EMPLOYEE_TEXT_FIELDS = ("f_name", "l_name", "display_name", "job_title", "mobile_phone", "photo_url",
+                        "sector", "department", "division", "location", "supervisor")
+TIME_OFF_TEXT_FIELDS = ("kind", "name", "status")
+
+
+class StringTable:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+    def sections(self) -> dict:
+        offsets = array("q", [0])
+        data = bytearray()
+        for value in self.strings:
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        return {"strings.offsets": offsets, "strings.data": bytes(data)}
+
+
+def _to_bytes(column) -> bytes:
+    if isinstance(column, array) and sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes() if isinstance(column, array) else column
+
+
+def export_snapshot(path, engine=None) -> dict:
+    """
+    Write the employees and time-off store of the database to a snapshot file.
+    Returns the number of exported rows per table.
+    """
+    engine = engine or EmployeeActions().engine
+    strings = StringTable()
+    with Session(engine) as session:
+        employees = session.exec(select(Employee).order_by(Employee.bamboo_id)).all()
+        time_off = session.exec(select(TimeOff).order_by(TimeOff.start_date, TimeOff.bamboo_id)).all()
+        syncs = session.exec(select(TimeOffSync).order_by(TimeOffSync.start_date)).all()
+
+    sections = {
+        "emp.bamboo_id": array("q", (emp.bamboo_id for emp in employees)),
+        "off.bamboo_id": array("q", (record.bamboo_id for record in time_off)),
+        "off.employee_id": array("q", (record.employee_id or 0 for record in time_off)),
+        "off.start": array("i", (record.start_date.toordinal() for record in time_off)),
+        "off.end": array("i", (record.end_date.toordinal() for record in time_off)),
+        "sync.start": array("i", (sync.start_date.toordinal() for sync in syncs)),
+        "sync.end": array("i", (sync.end_date.toordinal() for sync in syncs)),
+        "sync.at": array("d", (sync.synced_at.timestamp() for sync in syncs)),
+    }
+    for field in EMPLOYEE_TEXT_FIELDS:
+        sections[f"emp.{field}"] = array("i", (strings.add(getattr(emp, field)) for emp in employees))
+    for field in TIME_OFF_TEXT_FIELDS:
+        sections[f"off.{field}"] = array("i", (strings.add(getattr(record, field)) for record in time_off))
+    sections.update(strings.sections())
+
+    table_size = HEADER.size + SECTION.size * len(sections)
+    offset = -(-table_size // ALIGNMENT) * ALIGNMENT
+    entries = []
+    payloads = []
+    for name, column in sections.items():
+        payload = _to_bytes(column)
+        entries.append(SECTION.pack(name.encode("ascii"), offset, len(payload)))
+        payloads.append((offset, payload))
+        offset += -(-len(payload) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(sections)))
+        file.write(b"".join(entries))
+        for offset, payload in payloads:
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(payload)
+    return {"employees": len(employees), "time_off": len(time_off), "time_off_sync": len(syncs)}
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot, the columns are views of the mapped file.
+    """
+
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise ValueError("Snapshots are memory-mapped on little-endian machines only")
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            magic, version, _, section_count = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a snapshot file: {path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported snapshot version {version}, expected {VERSION}")
+            self.sections = {}
+            for position in range(section_count):
+                name, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + position * SECTION.size)
+                self.sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        except (ValueError, struct.error):
+            self._view.release()
+            self._mmap.close()
+            raise
+        self._strings = {}
+        # Held by the readers, so close() never unmaps a column in use
+        self._lock = threading.RLock()
+        self.closed = False
+
+    @contextmanager
+    def reading(self):
+        """
+        Hold the snapshot open while reading, yields False once it is closed.
+        """
+        with self._lock:
+            yield not self.closed
+
+    def column(self, name: str, typecode: str) -> memoryview:
+        offset, length = self.sections[name]
+        return self._view[offset:offset + length].cast(typecode)
+
+    def string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        value = self._strings.get(index)
+        if value is None:
+            offsets = self.column("strings.offsets", "q")
+            data_offset = self.sections["strings.data"][0]
+            value = bytes(self._view[data_offset + offsets[index]:data_offset + offsets[index + 1]]).decode("utf-8")
+            self._strings[index] = value
+        return value
+
+    def employee_rows(self) -> list[dict]:
+        columns = {field: self.column(f"emp.{field}", "i") for field in EMPLOYEE_TEXT_FIELDS}
+        return [
+            {"bamboo_id": bamboo_id, **{field: self.string(column[position]) for field, column in columns.items()}}
+            for position, bamboo_id in enumerate(self.column("emp.bamboo_id", "q"))
+        ]
+
+    def employees(self) -> list[Employee]:
+        # The snapshot rows were validated when stored, model_construct skips the validation
+        return [Employee.model_construct(**row) for row in self.employee_rows()]
+
+    def time_off_rows(self, positions=None, kind=None, status=None) -> list[dict]:
+        """
+        The time-off rows at the given positions (all by default), optionally
+        only of a kind and with a status (or without one).
+        """
+        ids = self.column("off.bamboo_id", "q")
+        employee_ids = self.column("off.employee_id", "q")
+        starts = self.column("off.start", "i")
+        ends = self.column("off.end", "i")
+        kinds = self.column("off.kind", "i")
+        names = self.column("off.name", "i")
+        statuses = self.column("off.status", "i")
+        rows = []
+        for position in (range(len(ids)) if positions is None else positions):
+            row_kind = self.string(kinds[position])
+            row_status = self.string(statuses[position])
+            if kind is not None and row_kind != kind:
+                continue
+            if status is not None and row_status not in (status, None):
+                continue
+            rows.append({
+                "bamboo_id": ids[position], "kind": row_kind, "employee_id": employee_ids[position] or None,
+                "name": self.string(names[position]), "status": row_status,
+                "start_date": date.fromordinal(starts[position]), "end_date": date.fromordinal(ends[position]),
+            })
+        return rows
+
+    def time_off(self, positions=None, kind=None, status=None) -> list[TimeOff]:
+        return [TimeOff.model_construct(**row) for row in self.time_off_rows(positions, kind, status)]
+
+    def overlapping_positions(self, start: date, end: date) -> list[int]:
+        # Records are sorted by start, the ones starting after the range end are skipped
+        starts = self.column("off.start", "i")
+        ends = self.column("off.end", "i")
+        start_ordinal = start.toordinal()
+        last = bisect_right(starts, end.toordinal())
+        return [position for position in range(last) if ends[position] >= start_ordinal]
+
+    def synced_ranges(self) -> list[tuple[date, date, datetime]]:
+        return [
+            (date.fromordinal(start), date.fromordinal(end), datetime.fromtimestamp(synced_at))
+            for start, end, synced_at in zip(
+                self.column("sync.start", "i"), self.column("sync.end", "i"), self.column("sync.at", "d")
+            )
+        ]
+
+    def restore(self, engine) -> dict:
+        """
+        Insert the snapshot rows into the empty tables of the database in one transaction.
+        Stored rows may be newer than the snapshot, so a table with rows is kept as is;
+        the time-off records and their synced ranges are restored or kept together.
+        Returns the number of restored rows per table.
+        """
+        restored = {"employees": 0, "time_off": 0, "time_off_sync": 0}
+        with Session(engine) as session:
+            if session.exec(select(Employee.bamboo_id).limit(1)).first() is None:
+                employees = self.employee_rows()
+                if employees:
+                    session.execute(insert(Employee), employees)
+                restored["employees"] = len(employees)
+            if (session.exec(select(TimeOff.bamboo_id).limit(1)).first() is None
+                    and session.exec(select(TimeOffSync.id).limit(1)).first() is None):
+                time_off = self.time_off_rows()
+                syncs = [
+                    {"start_date": start, "end_date": end, "synced_at": synced_at}
+                    for start, end, synced_at in self.synced_ranges()
+                ]
+                if time_off:
+                    session.execute(insert(TimeOff), time_off)
+                if syncs:
+                    session.execute(insert(TimeOffSync), syncs)
+                restored.update(time_off=len(time_off), time_off_sync=len(syncs))
+            session.commit()
+        return restored
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._strings = {}
+            self._view.release()
+            self._mmap.close()
+
+
+class SnapshotEmployeeActions:
+    """
+    The EmployeeActions reads answered from a snapshot, anything else
+    (e.g. the writes of a sync) goes to the database.
+    """
+
+    def __init__(self, snapshot: Snapshot, engine=None):
+        self.db = EmployeeActions(engine)
+        self.engine = self.db.engine
+        self._employees = snapshot.employees()
+        self._by_id = {emp.bamboo_id: emp for emp in self._employees}
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def get_employee(self, bamboo_id):
+        return self._by_id.get(bamboo_id)
+
+    def get_employee_by_id(self, id):
+        return self._by_id.get(int(id)) if id is not None else None
+
+    def get_all_employees(self):
+        return list(self._employees)
+
+    def get_employees_excluding_ids(self, excluded_ids, only_id=False):
+        excluded_ids = {int(id) for id in excluded_ids if id is not None}
+        employees = [emp for emp in self._employees if emp.bamboo_id not in excluded_ids]
+        if excluded_ids:
+            # Same order as the database query, employees without a sector first
+            employees.sort(key=lambda emp: (emp.sector is not None, emp.sector or ""))
+        return [emp.bamboo_id for emp in employees] if only_id else employees
+
+    def get_employees_by_ids(self, ids):
+        return [self._by_id[int(id)] for id in ids if id is not None and int(id) in self._by_id]
+
+    def get_employees_by_sector(self, sector):
+        return [emp for emp in self._employees if emp.sector == sector]
+
+    def count_all_available_employees(self):
+        return len(self._employees)
+
+    def count_employees_by_attribute(self, attribute, excluded_ids=None):
+        excluded_ids = {int(id) for id in excluded_ids or [] if id is not None}
+        counts = {}
+        for emp in self._employees:
+            if emp.bamboo_id not in excluded_ids:
+                value = getattr(emp, attribute)
+                counts[value] = counts.get(value, 0) + 1
+        return counts
+
+
+class SnapshotTimeOffActions:
+    """
+    The TimeOffActions reads answered from a snapshot, anything else goes to the database.
+    """
+
+    def __init__(self, snapshot: Snapshot, engine=None):
+        self.db = TimeOffActions(engine)
+        self.engine = self.db.engine
+        self.snapshot = snapshot
+        self._synced = [(start, end) for start, end, _ in snapshot.synced_ranges()]
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    # Once the snapshot is closed (restored into the database) the reads go to the database
+
+    def get_records(self, start, end, kind=None, status="approved"):
+        with self.snapshot.reading() as is_open:
+            if is_open:
+                return self.snapshot.time_off(self.snapshot.overlapping_positions(start, end), kind, status)
+        return self.db.get_records(start, end, kind, status)
+
+    def get_out_employee_ids(self, start, end):
+        with self.snapshot.reading() as is_open:
+            if is_open:
+                rows = self.snapshot.time_off_rows(
+                    self.snapshot.overlapping_positions(start, end), "timeOff", "approved"
+                )
+                return list(dict.fromkeys(row["employee_id"] for row in rows if row["status"] == "approved"))
+        return self.db.get_out_employee_ids(start, end)
+
+    def get_holiday_dates(self, start, end):
+        with self.snapshot.reading() as is_open:
+            if is_open:
+                rows = self.snapshot.time_off_rows(self.snapshot.overlapping_positions(start, end), "holiday")
+                return sorted(row["start_date"] for row in rows)
+        return self.db.get_holiday_dates(start, end)
+
+    def is_range_synced(self, start, end):
+        if self.snapshot.closed:
+            return self.db.is_range_synced(start, end)
+        covered_until = None
+        for sync_start, sync_end in sorted(self._synced):
+            if sync_end < start or sync_start > end:
+                continue
+            if covered_until is None:
+                if sync_start > start:
+                    return False
+            elif sync_start.toordinal() > covered_until.toordinal() + 1:
+                return False
+            covered_until = sync_end if covered_until is None else max(covered_until, sync_end)
+            if covered_until >= end:
+                return True
+        return False
+
+    def count_all_records(self):
+        with self.snapshot.reading() as is_open:
+            if is_open:
+                return len(self.snapshot.column("off.bamboo_id", "q"))
+        return self.db.count_all_records()
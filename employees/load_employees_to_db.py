@@ -1,7 +1,9 @@
 import pathlib
 
 from sqlmodel import Session, SQLModel, create_engine
+from db.manager import upgrade_schema
 from employees.models import Employee
+from employees.sectors import SectorClassifier
 from settings.vars import db_name
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import logging
@@ -10,41 +12,46 @@ root_dir = pathlib.Path(__file__).parent.parent
 db_path = root_dir / db_name
 if not db_path.exists():
     default_engine = create_engine(f'sqlite:///{db_name}')
-    SQLModel.metadata.create_all(default_engine)
 else:
     default_engine = create_engine(f'sqlite:///{db_path}')
+SQLModel.metadata.create_all(default_engine)
+upgrade_schema(default_engine)
 
+# The sectors assigned from the job titles by the default rules, "-" when none matches
+SECTORS = SectorClassifier().sectors
 
-def parse_employees_and_save_to_db(all_employees, engine=default_engine):
+# '/employees/directory' keys to Employee attributes
+DIRECTORY_FIELDS = {
+    "firstName": "f_name",
+    "lastName": "l_name",
+    "jobTitle": "job_title",
+    "mobilePhone": "mobile_phone",
+    "photoUrl": "photo_url",
+    "displayName": "display_name",
+    "department": "department",
+    "division": "division",
+    "location": "location",
+    "supervisor": "supervisor",
+}
+
+
+def parse_employees_and_save_to_db(all_employees, engine=default_engine, update_existing=False):
+    classifier = SectorClassifier.from_db(engine)
     for emp in all_employees:
-        sector = "-"
-        job_title = emp.get("jobTitle", "")
-        if job_title:
-            if "Frontend" in job_title:
-                sector = "FE"
-            if "Backend" in job_title:
-                sector = "BE"
-            if "QA" in job_title:
-                sector = "QA"
-            if "SMG" in job_title or "Java" in job_title:
-                sector = "SMG"
-            if "DevOps" in job_title or "Ops" in job_title:
-                sector = "DVPS"
+        sector = classifier.classify(emp.get("jobTitle", ""))
 
         tmp_emp = Employee(
             bamboo_id=emp.get('id'),
-            f_name=emp.get('firstName'),
-            l_name=emp.get('lastName'),
-            job_title=emp.get('jobTitle'),
-            mobile_phone=emp.get('mobilePhone'),
-            photo_url=emp.get('photoUrl'),
-            display_name=emp.get('displayName'),
-            sector=sector
+            sector=sector,
+            **{attribute: emp.get(key) for key, attribute in DIRECTORY_FIELDS.items()}
         )
 
         try:
             with Session(engine) as session:
-                session.add(tmp_emp)
+                if update_existing:
+                    session.merge(tmp_emp)
+                else:
+                    session.add(tmp_emp)
                 session.commit()
         except IntegrityError as e:
             logging.error(f"Integrity error: {e.orig}")
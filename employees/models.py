@@ -1,6 +1,6 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field, Session, select
-from sqlalchemy import not_, func
+from sqlalchemy import delete, not_, func
 
 from db.manager import DatabaseManager
 
@@ -15,6 +15,11 @@ class Employee(SQLModel, table=True):
     mobile_phone: Optional[str] = Field(default=None)
     photo_url: Optional[str] = Field(default=None)
     sector: Optional[str] = Field(default=None)
+    department: Optional[str] = Field(default=None, index=True)
+    division: Optional[str] = Field(default=None, index=True)
+    location: Optional[str] = Field(default=None, index=True)
+    # The display name of the supervisor, as returned by '/employees/directory'
+    supervisor: Optional[str] = Field(default=None, index=True)
 
     # Set default ordering by 'sector' column
     __table_args__ = (
@@ -23,6 +28,16 @@ class Employee(SQLModel, table=True):
     )
 
 
+class SectorRule(SQLModel, table=True):
+    __tablename__ = "sector_rules"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Substring of the job title, case sensitive
+    pattern: str
+    sector: str
+    # The matching rule with the lowest priority number wins
+    priority: int = Field(default=0, index=True)
+
+
 class EmployeeActions:
     def __init__(self, engine=None):
         # Get the database instance
@@ -77,6 +92,14 @@ class EmployeeActions:
 
         return [emp.bamboo_id for emp in employees] if only_id else employees
 
+    def delete_employees_excluding_ids(self, kept_ids):
+        kept_ids = self._clean_ids(kept_ids)
+        with Session(self.engine) as session:
+            statement = delete(Employee).where(not_(Employee.bamboo_id.in_(kept_ids)))
+            result = session.execute(statement)
+            session.commit()
+            return result.rowcount
+
     def get_all_employees(self):
         # Get all employees
         with Session(self.engine) as session:
@@ -119,6 +142,19 @@ class EmployeeActions:
             # Use .one() to fetch a single result
             return session.exec(select(func.count(Employee.bamboo_id))).one()
 
+    def count_employees_by_attribute(self, attribute, excluded_ids=None):
+        """
+        Number of employees per value of an attribute (e.g. "department"),
+        optionally excluding some IDs, with one grouped query.
+        """
+        column = getattr(Employee, attribute)
+        excluded_ids = self._clean_ids(excluded_ids or [])
+        with Session(self.engine) as session:
+            statement = select(column, func.count(Employee.bamboo_id)).group_by(column)
+            if excluded_ids:
+                statement = statement.where(not_(Employee.bamboo_id.in_(excluded_ids)))
+            return dict(session.exec(statement).all())
+
     def count_employees_by_sector_and_id(self, sector, ids):
         ids = self._clean_ids(ids)
         with Session(self.engine) as session:
@@ -0,0 +1,73 @@
+from typing import Iterable
+
+
+class OrgTree:
+    """
+    Reporting lines of the employees, from the "supervisor" display names.
+    The employees are numbered in DFS order (Euler tour), so the reports of a
+    manager, direct or not, are one contiguous slice and rollups are a
+    single bottom-up pass.
+    """
+
+    def __init__(self, employees: Iterable):
+        employees = list(employees)
+        self.names = {emp.bamboo_id: emp.display_name for emp in employees}
+        by_name = {}
+        for emp in employees:
+            by_name.setdefault(emp.display_name, emp.bamboo_id)
+
+        self.manager = {}
+        self.reports = {emp.bamboo_id: [] for emp in employees}
+        for emp in employees:
+            manager_id = by_name.get(emp.supervisor)
+            if manager_id is not None and manager_id != emp.bamboo_id:
+                self.manager[emp.bamboo_id] = manager_id
+                self.reports[manager_id].append(emp.bamboo_id)
+
+        # order: employees in DFS order, span[emp] = (first, last) position of the subtree
+        self.order = []
+        self.span = {}
+        roots = [emp.bamboo_id for emp in employees if emp.bamboo_id not in self.manager]
+        # Supervisor cycles have no root, start them from any member
+        for emp_id in roots + [emp.bamboo_id for emp in employees]:
+            if emp_id not in self.span:
+                self._visit(emp_id)
+
+    def _visit(self, root):
+        stack = [(root, False)]
+        while stack:
+            emp_id, done = stack.pop()
+            if done:
+                self.span[emp_id] = (self.span[emp_id][0], len(self.order) - 1)
+                continue
+            if emp_id in self.span:
+                continue
+            self.span[emp_id] = (len(self.order), None)
+            self.order.append(emp_id)
+            stack.append((emp_id, True))
+            for report in reversed(self.reports[emp_id]):
+                if report not in self.span:
+                    stack.append((report, False))
+
+    def managers(self) -> list:
+        return [emp_id for emp_id, reports in self.reports.items() if reports]
+
+    def subtree(self, emp_id) -> list:
+        """
+        The employee and everyone reporting to them, directly or not.
+        """
+        first, last = self.span[emp_id]
+        return self.order[first:last + 1]
+
+    def rollup(self, values: dict) -> dict:
+        """
+        Sum the values (employee ID to number) over every subtree, in one pass.
+        """
+        totals = {}
+        for emp_id in reversed(self.order):
+            total = values.get(emp_id, 0)
+            for report in self.reports[emp_id]:
+                if self.manager.get(report) == emp_id:
+                    total += totals.get(report, 0)
+            totals[emp_id] = total
+        return totals
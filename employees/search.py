@@ -0,0 +1,263 @@
+import heapq
+import re
+import threading
+import unicodedata
+import weakref
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from employees.models import Employee, EmployeeActions
+
+# Weight of a match per field, the names weigh more than the job title
+FIELD_WEIGHTS = {"display_name": 1.0, "f_name": 1.0, "l_name": 1.0, "job_title": 0.6}
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+# Minimum trigram similarity (Dice coefficient) of a fuzzy match
+MIN_SIMILARITY = 0.4
+# A short prefix (e.g. "s") expands to the first words only, enough to fill the results
+MAX_PREFIX_WORDS = 50
+MAX_PREFIX_EMPLOYEES = 500
+# Trigrams of more words (e.g. "sur" of every "surname") do not find fuzzy candidates
+MAX_TRIGRAM_WORDS = 256
+
+_PENDING_KEY = "employee_search_changes"
+_indexes = weakref.WeakSet()
+_listeners_lock = threading.Lock()
+_listeners_installed = False
+
+
+def normalize(text: Optional[str]) -> list[str]:
+    """
+    Lowercase words of a text without accents, e.g. "Στέφανος Τσακλίδης" -> ["στεφανος", "τσακλιδης"].
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r"\w+", text)
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EmployeeSearchIndex:
+    """
+    In-memory search over the names and job titles of the employees.
+    The distinct words are kept sorted, so the words starting with a query
+    word are one bisect away (a flattened prefix trie), and a trigram index
+    over the words finds the misspelled ones. The matches are ranked by the
+    best score of every query word, weighted by the matched field.
+
+    An index built with an engine follows the commits to the employees table
+    of that engine: the ORM inserts, updates and deletes are applied when
+    committed, a bulk statement (e.g. a sync) rebuilds the index on the next search.
+    """
+
+    def __init__(self, employees: Iterable[Employee] = (), engine=None):
+        self.engine = engine
+        self._lock = threading.RLock()
+        self._stale = False
+        self._load(employees)
+        if engine is not None:
+            _install_listeners()
+            _indexes.add(self)
+
+    @classmethod
+    def from_db(cls, engine=None) -> "EmployeeSearchIndex":
+        actions = EmployeeActions(engine)
+        return cls(actions.get_all_employees(), engine=actions.engine)
+
+    def _load(self, employees: Iterable[Employee]):
+        with self._lock:
+            self.employees = {}
+            # word -> {employee ID: field weight}
+            self._postings = {}
+            self._words = []
+            self._trigrams = {}
+            self._employee_words = {}
+            for emp in employees:
+                self._add(emp)
+            self._stale = False
+
+    def __len__(self):
+        return len(self.employees)
+
+    def _add(self, emp: Employee):
+        self.employees[emp.bamboo_id] = emp
+        words = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for word in normalize(getattr(emp, field)):
+                words[word] = max(words.get(word, 0.0), weight)
+        self._employee_words[emp.bamboo_id] = list(words)
+        for word, weight in words.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                self._words.insert(bisect_left(self._words, word), word)
+                for trigram in trigrams(word):
+                    self._trigrams.setdefault(trigram, set()).add(word)
+            postings[emp.bamboo_id] = weight
+
+    def _remove(self, bamboo_id: int):
+        self.employees.pop(bamboo_id, None)
+        for word in self._employee_words.pop(bamboo_id, []):
+            postings = self._postings[word]
+            postings.pop(bamboo_id, None)
+            if not postings:
+                del self._postings[word]
+                del self._words[bisect_left(self._words, word)]
+                for trigram in trigrams(word):
+                    self._trigrams[trigram].discard(word)
+
+    def upsert(self, emp: Employee):
+        with self._lock:
+            self._remove(emp.bamboo_id)
+            self._add(emp)
+
+    def remove(self, bamboo_id: int):
+        with self._lock:
+            self._remove(bamboo_id)
+
+    def mark_stale(self):
+        self._stale = True
+
+    def _word_matches(self, query_word: str) -> dict[str, float]:
+        """
+        Indexed words matching a query word, with the match score.
+        """
+        matches = {}
+        employees = 0
+        position = bisect_left(self._words, query_word)
+        # The exact word sorts first, then the longer words starting with it
+        while position < len(self._words) and self._words[position].startswith(query_word):
+            if len(matches) >= MAX_PREFIX_WORDS or employees >= MAX_PREFIX_EMPLOYEES:
+                break
+            word = self._words[position]
+            matches[word] = EXACT_SCORE if word == query_word else PREFIX_SCORE
+            employees += len(self._postings[word])
+            position += 1
+        if matches or len(query_word) < 3:
+            return matches
+        return self._fuzzy_matches(query_word)
+
+    def _fuzzy_matches(self, query_word: str) -> dict[str, float]:
+        query_trigrams = trigrams(query_word)
+        # The candidates share at least two of the selective trigrams, the rarest first
+        postings = sorted((self._trigrams.get(trigram, ()) for trigram in query_trigrams), key=len)
+        shared = {}
+        for words in postings:
+            if len(words) > MAX_TRIGRAM_WORDS:
+                break
+            for word in words:
+                shared[word] = shared.get(word, 0) + 1
+
+        matches = {}
+        for word, count in shared.items():
+            if count < 2:
+                continue
+            similarity = 2 * len(query_trigrams & trigrams(word)) / (len(query_trigrams) + len(trigrams(word)))
+            if similarity >= MIN_SIMILARITY:
+                matches[word] = FUZZY_SCORE * similarity
+        return matches
+
+    def search(self, query: str, limit=10, ids: Optional[Iterable[int]] = None) -> list[tuple[Employee, float]]:
+        """
+        The employees best matching the query words, as (employee, score) sorted
+        by score. Every query word adds its best match score, so the employees
+        matching all the words rank first. ids limits the results to these employees.
+        """
+        if self._stale and self.engine is not None:
+            self._load(EmployeeActions(self.engine).get_all_employees())
+        query_words = normalize(query)
+        allowed = set(ids) if ids is not None else None
+
+        with self._lock:
+            scores = {}
+            for query_word in query_words:
+                best = {}
+                for word, match_score in self._word_matches(query_word).items():
+                    postings = self._postings[word]
+                    if not best:
+                        best = {bamboo_id: match_score * weight for bamboo_id, weight in postings.items()}
+                        continue
+                    for bamboo_id, weight in postings.items():
+                        score = match_score * weight
+                        if score > best.get(bamboo_id, 0.0):
+                            best[bamboo_id] = score
+                if not scores:
+                    scores = best
+                    continue
+                for bamboo_id, score in best.items():
+                    scores[bamboo_id] = scores.get(bamboo_id, 0.0) + score
+            if allowed is not None:
+                scores = {bamboo_id: score for bamboo_id, score in scores.items() if bamboo_id in allowed}
+            top = heapq.nlargest(limit, scores, key=scores.__getitem__)
+            return [(self.employees[bamboo_id], scores[bamboo_id]) for bamboo_id in top]
+
+
+def _detached_copy(emp: Employee) -> Employee:
+    # The committed instance gets expired, the index keeps the flushed values
+    return Employee.model_construct(**{field: getattr(emp, field) for field in Employee.model_fields})
+
+
+def _on_flush_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append(("upsert", _detached_copy(target)))
+
+
+def _on_flush_delete(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append(("remove", target.bamboo_id))
+
+
+def _indexes_of(session) -> list[EmployeeSearchIndex]:
+    bind = session.bind
+    return [index for index in list(_indexes) if bind is None or index.engine is bind]
+
+
+def _on_commit(session):
+    changes = session.info.pop(_PENDING_KEY, [])
+    if not changes:
+        return
+    for index in _indexes_of(session):
+        for action, value in changes:
+            if action == "upsert":
+                index.upsert(value)
+            else:
+                index.remove(value)
+
+
+def _on_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_orm_execute(orm_execute_state):
+    # Bulk insert/update/delete statements do not say which employees changed
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Employee:
+        for index in _indexes_of(orm_execute_state.session):
+            index.mark_stale()
+
+
+def _install_listeners():
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Employee, "after_insert", _on_flush_write)
+        event.listen(Employee, "after_update", _on_flush_write)
+        event.listen(Employee, "after_delete", _on_flush_delete)
+        event.listen(OrmSession, "after_commit", _on_commit)
+        event.listen(OrmSession, "after_rollback", _on_rollback)
+        event.listen(OrmSession, "do_orm_execute", _on_orm_execute)
+        _listeners_installed = True
@@ -0,0 +1,105 @@
+import logging
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from employees.models import Employee, SectorRule
+
+# (pattern, sector) in priority order, the first matching rule wins.
+# QA comes first, so "QA DevOps" is a QA title and not a DevOps one.
+DEFAULT_SECTOR_RULES = (
+    ("QA", "QA"),
+    ("DevOps", "DVPS"),
+    ("Ops", "DVPS"),
+    ("SMG", "SMG"),
+    ("Java", "SMG"),
+    ("Backend", "BE"),
+    ("Frontend", "FE"),
+)
+NO_SECTOR = "-"
+
+
+class SectorClassifier:
+    """
+    The sector rules compiled into one regular expression. Every rule is a
+    named group inside a lookahead, so one scan of the job title finds all
+    the matching rules, even overlapping ones, and the highest priority wins.
+    """
+
+    def __init__(self, rules: Iterable[tuple] = DEFAULT_SECTOR_RULES):
+        self.rules = [(pattern, sector) for pattern, sector in rules if pattern]
+        self.sectors = tuple(dict.fromkeys(sector for _, sector in self.rules)) + (NO_SECTOR,)
+        alternatives = "|".join(
+            f"(?P<r{i}>{re.escape(pattern)})" for i, (pattern, _) in enumerate(self.rules)
+        )
+        self._matcher = re.compile(f"(?=(?:{alternatives}))") if self.rules else None
+
+    @classmethod
+    def from_db(cls, engine) -> "SectorClassifier":
+        """
+        The rules stored in the "sector_rules" table, or the default ones when it is empty.
+        """
+        with Session(engine) as session:
+            rules = session.exec(select(SectorRule).order_by(SectorRule.priority, SectorRule.id)).all()
+        if not rules:
+            return cls()
+        return cls((rule.pattern, rule.sector) for rule in rules)
+
+    def classify(self, job_title: Optional[str]) -> str:
+        if not job_title or self._matcher is None:
+            return NO_SECTOR
+        best = None
+        for match in self._matcher.finditer(job_title):
+            rule = int(match.lastgroup[1:])
+            if best is None or rule < best:
+                best = rule
+                if best == 0:
+                    break
+        return NO_SECTOR if best is None else self.rules[best][1]
+
+
+def save_sector_rules(engine, rules: Iterable[tuple]) -> None:
+    """
+    Replace the stored rules, their order is their priority.
+    """
+    with Session(engine) as session:
+        for rule in session.exec(select(SectorRule)).all():
+            session.delete(rule)
+        for priority, (pattern, sector) in enumerate(rules):
+            session.add(SectorRule(pattern=pattern, sector=sector, priority=priority))
+        session.commit()
+
+
+def reclassify_employees(engine, classifier: Optional[SectorClassifier] = None) -> int:
+    """
+    Re-assign the sector of every stored employee from the current rules,
+    in one transaction and without contacting BambooHR.
+    Returns the number of employees whose sector changed.
+    """
+    classifier = classifier or SectorClassifier.from_db(engine)
+    with Session(engine) as session:
+        try:
+            rows = session.exec(select(Employee.bamboo_id, Employee.job_title, Employee.sector)).all()
+            changes = []
+            for bamboo_id, job_title, sector in rows:
+                new_sector = classifier.classify(job_title)
+                if new_sector != sector:
+                    changes.append({"bamboo_id": bamboo_id, "sector": new_sector})
+            if changes:
+                session.execute(update(Employee), changes)
+            session.commit()
+        except SQLAlchemyError as e:
+            logging.error(f"Database error: {e}")
+            session.rollback()
+            raise
+    return len(changes)
+
+
+if __name__ == "__main__":
+    from db.manager import DatabaseManager
+
+    changed = reclassify_employees(DatabaseManager.get_db_instance())
+    print(f"Reclassified {changed} employees")
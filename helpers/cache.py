@@ -0,0 +1,97 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+
+def freeze(value):
+    """
+    Convert a value to a hashable cache key part.
+    Lists and tuples are kept apart because they mean different things
+    for the "sector" arguments (IDs vs sectors).
+    """
+    if isinstance(value, dict):
+        return ("__dict__", tuple(sorted((key, freeze(item)) for key, item in value.items())))
+    if isinstance(value, list):
+        return ("__list__", tuple(freeze(item) for item in value))
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ("__set__", tuple(sorted(freeze(item) for item in value)))
+    return value
+
+
+class MemoCache:
+    """
+    Bounded LRU cache with hit/miss counters, safe to share between threads.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, func):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = func()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+def memoize(method):
+    """
+    Memoize a client method in "self.cache", keyed by the method name,
+    the bound arguments and "self.data_version". Syncs bump the data version,
+    so the entries computed from older data are never returned again.
+    Results are shared between callers and must not be modified.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "cache", None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple((name, freeze(value)) for name, value in bound.arguments.items() if name != "self")
+        key = (method.__name__, self.data_version, arguments)
+        return cache.get_or_compute(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,217 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Optional
+
+import requests
+
+
+def thread_session(local: threading.local, base: requests.Session) -> requests.Session:
+    """
+    The session of the current thread, requests.Session is not thread-safe.
+    It mounts the adapters of the base session, so the threads share its connection pools.
+    """
+    session = getattr(local, "session", None)
+    if session is None:
+        session = requests.Session()
+        for prefix, adapter in base.adapters.items():
+            session.mount(prefix, adapter)
+        local.session = session
+    return session
+
+
+class PrefetchScheduler:
+    """
+    Refreshes the '/time_off/whos_out/' records and the employees directory of a
+    rolling window (today and the next window_days - 1 days) in a background thread,
+    so the client answers the questions about the upcoming days without a request.
+
+    The window is fetched in chunk_days long ranges, with at most max_workers
+    requests in flight. The refreshes run every interval seconds, shifted by a
+    random jitter so that many clients do not hit BambooHR at the same moment.
+    Prefetched data older than max_age seconds is not served.
+    """
+
+    def __init__(self, client, window_days=30, interval=900, jitter=0.1, max_workers=2, chunk_days=7,
+                 max_age=None, clock=time.time):
+        self.client = client
+        self.window_days = window_days
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.chunk_days = chunk_days
+        self.max_age = max_age if max_age is not None else 2 * interval
+        self.clock = clock
+        self.fetched_at = None
+        self.hits = 0
+        self.misses = 0
+        # (first, last) day ordinals of the prefetched window
+        self._window = None
+        # (start ordinal, end ordinal, record) of every out of office record of the window
+        self._records = None
+        self._employees = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        return thread_session(self._local, self.client.session)
+
+    def _chunks(self, start: date, end: date) -> list[tuple[str, str]]:
+        chunks = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=self.chunk_days - 1), end)
+            chunks.append((chunk_start.isoformat(), chunk_end.isoformat()))
+            chunk_start = chunk_end + timedelta(days=1)
+        return chunks
+
+    def refresh(self, today: Optional[date] = None) -> bool:
+        """
+        Fetch the window starting today. Returns True if the data changed,
+        in which case the memoized results of the client are invalidated.
+        """
+        start = today or date.today()
+        end = start + timedelta(days=self.window_days - 1)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            employees_future = executor.submit(
+                lambda: self.client._fetch_employees(self.client.directory_source, session=self._session())
+            )
+            chunk_records = list(executor.map(
+                lambda chunk: self.client._fetch_who_is_out(*chunk, session=self._session()),
+                self._chunks(start, end),
+            ))
+            employees = employees_future.result()
+
+        # Records overlapping two chunks are returned for both
+        seen = set()
+        records = []
+        for record in (record for chunk in chunk_records for record in chunk):
+            key = (record.get("type"), record.get("id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            record_start = date.fromisoformat(record["start"]).toordinal()
+            record_end = date.fromisoformat(record.get("end") or record["start"]).toordinal()
+            records.append((record_start, record_end, record))
+
+        with self._lock:
+            changed = records != self._records or employees != self._employees
+            self._window = (start.toordinal(), end.toordinal())
+            self._records = records
+            self._employees = employees
+            self.fetched_at = self.clock()
+
+        if changed:
+            self.client.bump_data_version()
+        return changed
+
+    def _is_fresh(self) -> bool:
+        return self.fetched_at is not None and self.clock() - self.fetched_at <= self.max_age
+
+    def get_who_is_out(self, start: str, end: str) -> Optional[list[dict]]:
+        """
+        The prefetched records overlapping [start, end], or None when the
+        range is outside the window or the data is stale.
+        """
+        start_ordinal = date.fromisoformat(start).toordinal()
+        end_ordinal = date.fromisoformat(end).toordinal()
+        with self._lock:
+            if (not self._is_fresh() or start_ordinal < self._window[0] or end_ordinal > self._window[1]):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [
+                record for record_start, record_end, record in self._records
+                if record_start <= end_ordinal and record_end >= start_ordinal
+            ]
+
+    def get_employees(self) -> Optional[list[dict]]:
+        with self._lock:
+            if not self._is_fresh():
+                return None
+            return list(self._employees)
+
+    def next_delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous data until it gets stale
+                logging.error(f"Prefetch failed: {e}")
+            self._stop.wait(self.next_delay())
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bamboo-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class SpeculativeFetcher:
+    """
+    Runs the calls the user will probably ask for next in background threads,
+    e.g. while an interactive prompt waits for input. get() returns the result
+    of the matching speculative call, or makes the call when none was started.
+    Results older than max_age seconds are fetched again.
+    With a client, the workers send its requests with their own sessions.
+    """
+
+    def __init__(self, client=None, max_workers=2, max_age=300, clock=time.monotonic):
+        self.client = client
+        self.max_age = max_age
+        self.clock = clock
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-fetch")
+        # call key -> (started at, future)
+        self._futures: dict[tuple, tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(func, args, kwargs) -> tuple:
+        return (getattr(func, "__qualname__", func), args, tuple(sorted(kwargs.items())))
+
+    def start(self, func, *args, **kwargs):
+        key = self._key(func, args, kwargs)
+        now = self.clock()
+        with self._lock:
+            # Drop the stale results, e.g. yesterday's "today"
+            for stale in [k for k, (started_at, _) in self._futures.items() if now - started_at > self.max_age]:
+                del self._futures[stale]
+            if key not in self._futures:
+                self._futures[key] = (now, self._executor.submit(self._call, func, args, kwargs))
+
+    def _call(self, func, args, kwargs):
+        if self.client is None:
+            return func(*args, **kwargs)
+        with self.client.use_session(thread_session(self._local, self.client.session)):
+            return func(*args, **kwargs)
+
+    def get(self, func, *args, **kwargs):
+        with self._lock:
+            started_at, future = self._futures.pop(self._key(func, args, kwargs), (None, None))
+        if future is not None and self.clock() - started_at <= self.max_age:
+            try:
+                return future.result()
+            except Exception as e:
+                # Retried in the foreground, where the error reaches the caller
+                logging.debug(f"Speculative call {func} failed: {e}")
+        return func(*args, **kwargs)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,158 @@
+"""
+Opt-in profiling of client operations. Every profiled operation writes to the
+profiles directory:
+    <name>.pstats     cProfile stats, e.g. for "python -m pstats" or snakeviz
+    <name>.collapsed  collapsed stacks, e.g. for flamegraph.pl or speedscope
+    <name>.tracemalloc and <name>.alloc.txt with memory profiling, the snapshot
+                      and the top allocation sites
+
+Enabled with the BAMBOO_PROFILE env var (set to the directory, or to 1 for
+"profiles"), BAMBOO_PROFILE_MEMORY=1 adds the tracemalloc snapshots.
+"""
+import contextlib
+import os
+import pathlib
+import re
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pstats
+
+# cProfile, pstats and tracemalloc are imported when profiling starts, the
+# env checks of every run stay cheap
+
+PROFILE_ENV = "BAMBOO_PROFILE"
+PROFILE_MEMORY_ENV = "BAMBOO_PROFILE_MEMORY"
+DEFAULT_DIRECTORY = "profiles"
+# Stacks deeper than this are cut, cProfile does not record them anyway
+MAX_STACK_DEPTH = 64
+
+
+def _frame_name(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # Built-in functions, e.g. "<built-in method time.sleep>"
+        return name.strip("<>")
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: "pstats.Stats") -> dict[str, int]:
+    """
+    Convert the profile to collapsed stacks ("root;caller;func" -> microseconds).
+    cProfile records caller-callee pairs and not full stacks, so the time of a
+    function called from many places is split between its callers
+    proportionally to the time of each call edge.
+    """
+    callees = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = {}
+
+    def walk(func, stack, scale):
+        _, _, own_time, total_time, _ = stats.stats[func]
+        stack = stack + [_frame_name(func)]
+        key = ";".join(stack)
+        stacks[key] = stacks.get(key, 0) + own_time * scale
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = stats.stats[callee][3]
+            if callee_total <= 0 or edge_time * scale < 1e-6 or _frame_name(callee) in stack:
+                continue
+            walk(callee, stack, scale * edge_time / callee_total)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return {stack: round(seconds * 1_000_000) for stack, seconds in stacks.items() if seconds * 1_000_000 >= 1}
+
+
+class Profiler:
+    """
+    Context manager profiling the enclosed operation:
+
+        with Profiler("capacity", directory="profiles", memory=True) as profiler:
+            bamboo.calculate_capacity("2024-12-23", "2024-12-29")
+        print(profiler.paths)
+    """
+
+    def __init__(self, name: str, directory: Optional[str] = None, memory=False, top=25):
+        self.name = name
+        self.directory = pathlib.Path(directory or DEFAULT_DIRECTORY)
+        self.memory = memory
+        # Number of allocation sites written to the report
+        self.top = top
+        self.paths = []
+        self._profile = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        import cProfile
+        import tracemalloc
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        import tracemalloc
+
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot() if self.memory and tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.write(snapshot)
+        return False
+
+    def write(self, snapshot=None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", self.name)
+        prefix = str(self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_name}")
+
+        import pstats
+
+        stats = pstats.Stats(self._profile)
+        self._write_path(pathlib.Path(f"{prefix}.pstats"), stats.dump_stats)
+
+        lines = [f"{stack} {micros}\n" for stack, micros in collapsed_stacks(stats).items()]
+        self._write_path(pathlib.Path(f"{prefix}.collapsed"), lambda path: pathlib.Path(path).write_text("".join(lines)))
+
+        if snapshot is not None:
+            self._write_path(pathlib.Path(f"{prefix}.tracemalloc"), snapshot.dump)
+            top_sites = snapshot.statistics("lineno")[:self.top]
+            report = "".join(f"{stat}\n" for stat in top_sites)
+            self._write_path(pathlib.Path(f"{prefix}.alloc.txt"), lambda path: pathlib.Path(path).write_text(report))
+
+    def _write_path(self, path: pathlib.Path, writer):
+        writer(str(path))
+        self.paths.append(path)
+
+
+def env_settings() -> tuple[Optional[str], bool]:
+    """
+    The (directory, memory) of the env vars, the directory is None when profiling is off.
+    """
+    directory = os.environ.get(PROFILE_ENV)
+    if not directory or directory == "0":
+        directory = None
+    elif directory == "1":
+        directory = DEFAULT_DIRECTORY
+    return directory, os.environ.get(PROFILE_MEMORY_ENV, "0") not in ("", "0")
+
+
+def profile_from_env(name: str):
+    """
+    A Profiler when the BAMBOO_PROFILE env var is set, otherwise a no-op context.
+    """
+    directory, memory = env_settings()
+    if directory is None:
+        return contextlib.nullcontext()
+    return Profiler(name, directory=directory, memory=memory)
@@ -0,0 +1,63 @@
+import codecs
+import json
+from typing import Iterable, Iterator, Union
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]]) -> Iterator:
+    """
+    Parse a JSON array incrementally from chunks of text or UTF-8 bytes and
+    yield its items one by one. Only the current item is kept in memory,
+    never the whole payload.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+
+    def chunks_then_end():
+        for chunk in chunks:
+            yield chunk, False
+        yield "", True
+
+    for chunk, finished in chunks_then_end():
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk, final=finished)
+        buffer = buffer[position:] + chunk
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ",":
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if finished:
+                    raise
+                # The item continues in the next chunk
+                break
+            if not finished and (end >= len(buffer) or buffer[end] not in _DELIMITERS):
+                # e.g. a number that may continue in the next chunk
+                break
+            yield item
+            position = end
+
+    if not started:
+        raise ValueError("Expected a JSON array")
+    raise ValueError("Unterminated JSON array")
@@ -0,0 +1,75 @@
+import csv
+import json
+from typing import Iterable, Optional, TextIO
+
+FORMATS = ("json", "ndjson", "csv")
+
+
+class RowWriter:
+    """
+    Writes rows (dicts) one by one to a text stream, so large listings are
+    emitted while they are produced instead of being collected first.
+    """
+
+    def __init__(self, stream: TextIO, fields: Optional[list[str]] = None):
+        self.stream = stream
+        # Column order, by default the keys of the first row
+        self.fields = fields
+        self.count = 0
+
+    def write(self, row: dict):
+        if self.fields is None:
+            self.fields = list(row)
+        self._write(row)
+        self.count += 1
+
+    def _write(self, row: dict):
+        raise NotImplementedError
+
+    def close(self):
+        self.stream.flush()
+
+
+class NdjsonWriter(RowWriter):
+    def _write(self, row: dict):
+        self.stream.write(json.dumps(row, default=str))
+        self.stream.write("\n")
+
+
+class JsonWriter(RowWriter):
+    """
+    A JSON array, streamed element by element.
+    """
+
+    def _write(self, row: dict):
+        self.stream.write(",\n  " if self.count else "[\n  ")
+        self.stream.write(json.dumps(row, default=str))
+
+    def close(self):
+        self.stream.write("\n]\n" if self.count else "[]\n")
+        super().close()
+
+
+class CsvWriter(RowWriter):
+    def _write(self, row: dict):
+        if not self.count:
+            self._csv = csv.DictWriter(self.stream, fieldnames=self.fields, extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow(row)
+
+
+WRITERS = {"json": JsonWriter, "ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+def write_rows(rows: Iterable[dict], fmt: str, stream: TextIO, fields: Optional[list[str]] = None) -> int:
+    """
+    Stream the rows in the given format ("json", "ndjson" or "csv").
+    Returns the number of written rows.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    writer = WRITERS[fmt](stream, fields)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return writer.count
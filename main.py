@@ -1,11 +1,10 @@
+import argparse
 import logging
 import os
 import json
+import sys
 from datetime import datetime
 
-from settings.vars import bamboo_domain, api_key
-from client import BambooTimeOff
-
 # Set up logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -58,21 +57,26 @@ def print_emps(employees):
     sector_width = 13
     id_width = 5
 
-    # Print header
-    header = f"{'ID':<{id_width}} | {'Name':<{name_width}} | {'Job Title':<{title_width}} | {'Sector':<{sector_width}}"
-    print(header)
-    print("=" * (name_width + title_width + sector_width + 6))
+    separator = "-" * (name_width + title_width + sector_width + 6)
+
+    # Header
+    lines = [
+        f"{'ID':<{id_width}} | {'Name':<{name_width}} | {'Job Title':<{title_width}} | {'Sector':<{sector_width}}",
+        "=" * (name_width + title_width + sector_width + 6),
+    ]
 
-    # Print employee data
+    # Employee data, written at once instead of a print per line
     for emp in employees:
         bamboo_id = emp.bamboo_id or "-"
         display_name = emp.display_name or "-"
         job_title = emp.job_title or "-"
         sector = emp.sector or "-"
 
-        row = f"{bamboo_id:<{id_width}} | {display_name:<{name_width}} | {job_title:<{title_width}} | {sector:<{sector_width}}"
-        print(row)
-        print("-" * (name_width + title_width + sector_width + 6))
+        lines.append(
+            f"{bamboo_id:<{id_width}} | {display_name:<{name_width}} | {job_title:<{title_width}} | {sector:<{sector_width}}"
+        )
+        lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main_menu():
     print("1. Calculate capacity")
@@ -83,8 +87,29 @@ def main_menu():
     print("-" * 53)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("--profile"):
+        # Non-interactive mode, e.g. "python main.py capacity --start 2024-12-23 --end 2024-12-29"
+        from cli import main
+
+        sys.exit(main())
+
+    from client import BambooTimeOff
+    from helpers.prefetch import SpeculativeFetcher
+    from helpers.profiling import DEFAULT_DIRECTORY, PROFILE_ENV, PROFILE_MEMORY_ENV, env_settings, profile_from_env
+
+    parser = argparse.ArgumentParser(description="BambooHR client menu, check cli.py -h for the subcommands")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_DIRECTORY, metavar="DIR",
+                        help="Profile every picked option to DIR (default: profiles)")
+    parser.add_argument("--profile-memory", action="store_true", help="Also write tracemalloc snapshots")
+    options = parser.parse_args()
+    if options.profile:
+        os.environ[PROFILE_ENV] = options.profile
+    if options.profile_memory:
+        os.environ[PROFILE_MEMORY_ENV] = "1"
+
     logging.info("Application started")
     welcome_screen()
+    speculative = None
     try:
         # Read API key and domain from config file
         api_key, bamboo_domain = read_config()
@@ -100,38 +125,65 @@ if __name__ == "__main__":
 
         bamboo = BambooTimeOff(api_key, bamboo_domain)
         logging.info("BambooTimeOff client initialized")
+        # Fetch what the picked option needs while the user is at its next prompts.
+        # Not while profiling, cProfile only sees the calls of the main thread.
+        if env_settings()[0] is None:
+            speculative = SpeculativeFetcher(bamboo)
+
+        def prefetch(func, *args, **kwargs):
+            if speculative is not None:
+                speculative.start(func, *args, **kwargs)
+
+        def fetch(name, func, *args, **kwargs):
+            # Profiled with "--profile" or the BAMBOO_PROFILE env var, after the input is collected
+            with profile_from_env(name):
+                if speculative is not None:
+                    return speculative.get(func, *args, **kwargs)
+                return func(*args, **kwargs)
 
         while True:
-            main_menu()
             today = datetime.now().strftime("%Y-%m-%d")
+            main_menu()
             option = input("Pick one option: ").strip()
 
             if option == "1":
                 start = input("Enter start date (YYYY-MM-DD): ").strip()
                 end = input("Enter end date (YYYY-MM-DD): ").strip()
+                mode = input("Select employees by: IDs or SECTOR?: ").strip()
+                if mode.lower() == "ids":
+                    # Listed after the focus factor prompt
+                    prefetch(bamboo.get_available_employees_no_perms, start, end, sector=("BE", "FE", "QA"))
                 focus_factor = input("Enter focus factor (0.75-1.00): ").strip()
 
-                mode = input("Select employees by: IDs or SECTOR?: ").strip()
                 if mode.lower() == "ids":
-                    available_emps = bamboo.get_available_employees_no_perms(
+                    available_emps = fetch(
+                        "menu-option-1-available", bamboo.get_available_employees_no_perms,
                         start, end, sector=("BE", "FE", "QA")
                     )
+                    query = input("Search by name or job title (empty lists everyone): ").strip()
+                    if query:
+                        with profile_from_env("menu-option-1-search"):
+                            available_emps = bamboo.search_employees(
+                                query, limit=20, ids=[emp.bamboo_id for emp in available_emps]
+                            )
                     print_emps(available_emps)
                     print("=========================================================")
                     print("|   Capacity calculation by selecting employees mode    |")
                     print("=========================================================")
                     ids = input("Enter IDs, separated by commas: ").strip().replace(" ", "")
                     ids = ids.split(",")
-                    capacity = calculate_capacity(
-                        bamboo, start, end, ids, float(focus_factor)
-                    )
+                    with profile_from_env("menu-option-1-capacity"):
+                        capacity = calculate_capacity(
+                            bamboo, start, end, ids, float(focus_factor)
+                        )
                 else:
                     print("=========================================================")
                     print("| Capacity calculation by selecting employees by sector |")
                     print("=========================================================")
                     sector = input("Enter sector(s) (BE, FE, QA, separated by commas): ").strip()
                     sector = tuple(sector.split(","))
-                    capacity = calculate_capacity(bamboo, start, end, sector, float(focus_factor))
+                    with profile_from_env("menu-option-1-capacity"):
+                        capacity = calculate_capacity(bamboo, start, end, sector, float(focus_factor))
 
                 print("=================")
                 print("|    Results    |")
@@ -140,17 +192,17 @@ if __name__ == "__main__":
                 print("-" * 53)
 
             elif option == "2":
-                employees = bamboo.get_available_employees_no_perms(today, today)
+                employees = fetch("menu-option-2", bamboo.get_available_employees_no_perms, today, today)
                 print_emps(employees)
 
             elif option == "3":
-                employees = bamboo.get_who_is_out_employees(today, today)
+                employees = fetch("menu-option-3", bamboo.get_who_is_out_employees, today, today)
                 print_emps(employees)
 
             elif option == "4":
                 start = input("Enter start date (YYYY-MM-DD): ").strip()
                 end = input("Enter end date (YYYY-MM-DD): ").strip()
-                employees = bamboo.get_available_employees_no_perms(start, end)
+                employees = fetch("menu-option-4", bamboo.get_available_employees_no_perms, start, end)
                 print_emps(employees)
 
             elif option == "5":
@@ -165,4 +217,7 @@ if __name__ == "__main__":
         print(f"An error occurred: {e}")
     except KeyboardInterrupt as e:
         logging.info("User interrupted the program")
-        print("Exiting by keyboard. Goodbye!")
\ No newline at end of file
+        print("Exiting by keyboard. Goodbye!")
+    finally:
+        if speculative is not None:
+            speculative.shutdown()
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Long-running local service keeping a BambooTimeOff client, its connection pool
+and DB engine in memory, answering over HTTP/JSON:
+
+    GET  /capacity?start=2024-12-23&end=2024-12-29&focus_factor=0.75&sector=BE,QA
+    GET  /available?start=...&end=...&sector=BE,QA
+    GET  /out?start=...&end=...
+    GET  /working-days?start=...&end=...
+    GET  /health
+    POST /refresh      (bump the data version, e.g. after a sync)
+
+    PYTHONPATH=. python service/server.py --port 8086 --local-store
+
+The answers are computed per request. --cache-size N memoizes them, the
+entries are dropped by the --prefetch-days refreshes and POST /refresh only,
+so in network mode a cached answer may miss the changes made in BambooHR since.
+"""
+import json
+import logging
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from helpers.prefetch import thread_session
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _param(query: dict, name: str, default=None) -> str:
+    values = query.get(name)
+    if not values:
+        if default is None:
+            raise ServiceError(400, f"Missing parameter: {name}")
+        return default
+    return values[0]
+
+
+def _date_param(query: dict, name: str) -> str:
+    value = _param(query, name)
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ServiceError(400, f"Invalid date for {name}: {value}")
+    return value
+
+
+def _sector_param(query: dict):
+    # Comma separated, the client methods take the sectors as a tuple
+    value = query.get("sector")
+    if not value:
+        return None
+    return tuple(sector for sector in value[0].split(",") if sector)
+
+
+class CapacityService:
+    def __init__(self, client):
+        self.client = client
+        # requests.Session is not thread-safe, every handler thread uses its own session
+        # over the connection pools of the client's. The DB engine, the cache and the
+        # data version are safe to share, so the requests are answered concurrently.
+        self._local = threading.local()
+        self.routes = {
+            ("GET", "/capacity"): self.capacity,
+            ("GET", "/available"): self.available,
+            ("GET", "/out"): self.out,
+            ("GET", "/working-days"): self.working_days,
+            ("GET", "/health"): self.health,
+            ("POST", "/refresh"): self.refresh,
+        }
+
+    def capacity(self, query: dict) -> dict:
+        start, end = _date_param(query, "start"), _date_param(query, "end")
+        try:
+            focus_factor = float(_param(query, "focus_factor", "0.75"))
+        except ValueError:
+            raise ServiceError(400, "Invalid focus_factor")
+        capacity = self.client.calculate_capacity(start, end, focus_factor, sector=_sector_param(query))
+        return {"start": start, "end": end, "capacity": capacity}
+
+    def available(self, query: dict) -> dict:
+        start, end = _date_param(query, "start"), _date_param(query, "end")
+        employees = self.client.get_available_employees_no_perms(start, end, sector=_sector_param(query))
+        return {"employees": [emp.model_dump() for emp in employees]}
+
+    def out(self, query: dict) -> dict:
+        start, end = _date_param(query, "start"), _date_param(query, "end")
+        return {"records": self.client.get_who_is_out_employees(start, end)}
+
+    def working_days(self, query: dict) -> dict:
+        start, end = _date_param(query, "start"), _date_param(query, "end")
+        working_dates = self.client.get_working_days(start, end)
+        return {"total": len(working_dates), "dates": [day.isoformat() for day in working_dates]}
+
+    def health(self, query: dict) -> dict:
+        return {"data_version": self.client.data_version, "cache": self.client.cache_stats()}
+
+    def refresh(self, query: dict) -> dict:
+        return {"data_version": self.client.bump_data_version()}
+
+    def handle(self, method: str, target: str) -> tuple[int, dict]:
+        """
+        Answer one request. Returns the HTTP status and response payload.
+        """
+        url = urlsplit(target)
+        route = self.routes.get((method, url.path.rstrip("/") or "/"))
+        if route is None:
+            return 404, {"error": f"Not found: {method} {url.path}"}
+        try:
+            with self.client.use_session(thread_session(self._local, self.client.session)):
+                return 200, route(parse_qs(url.query))
+        except ServiceError as e:
+            return e.status, {"error": str(e)}
+        except requests.RequestException as e:
+            logging.error(f"Error fetching the data of {target}: {e}")
+            return 502, {"error": "Error fetching the data"}
+        except Exception:
+            logging.exception(f"Error answering {target}")
+            return 500, {"error": "Internal error"}
+
+    def serve(self, host="127.0.0.1", port=8086) -> ThreadingHTTPServer:
+        """
+        Create the HTTP server, call serve_forever() on it to start answering.
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logging.info(f"Service {self.address_string()} - {format % args}")
+
+            def _respond(self, method):
+                status, payload = service.handle(method, self.path)
+                response = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from client import BambooTimeOff
+
+    parser = argparse.ArgumentParser(description="Serve capacity and availability over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Memoize the answers, they are dropped by the prefetch refreshes and POST /refresh")
+    parser.add_argument("--local-store", action="store_true", help="Answer from the local time-off store")
+    parser.add_argument("--prefetch-days", type=int, default=0,
+                        help="Refresh the next days in the background (network mode)")
+    args = parser.parse_args()
+
+    client = BambooTimeOff(local_store=args.local_store, cache_size=args.cache_size)
+    if args.prefetch_days and not args.local_store:
+        client.start_prefetch(window_days=args.prefetch_days)
+    server = CapacityService(client).serve(args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    server.serve_forever()
@@ -0,0 +1,105 @@
+"""
+Clients for many BambooHR company domains, sharing one bounded connection
+pool, each with its own employees and time-off database file.
+
+    manager = TenantManager(db_dir="tenants")
+    manager.add_tenant("acme", "acme_api_key")
+    manager.add_tenant("globex", "globex_api_key")
+    results, errors = manager.calculate_capacity("2024-12-23", "2024-12-29")
+"""
+import logging
+import pathlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from client import BambooTimeOff
+from db.manager import create_db_engine
+
+
+class TenantManager:
+    def __init__(self, db_dir=".", pool_size=10, max_workers=4):
+        self.db_dir = pathlib.Path(db_dir)
+        # At most max_workers tenants are queried at the same time
+        self.max_workers = max_workers
+        # One adapter for all the tenant sessions: at most pool_size connections are
+        # open per host, requests over the limit wait for a free connection.
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.clients: dict[str, BambooTimeOff] = {}
+
+    @property
+    def domains(self) -> list[str]:
+        return list(self.clients)
+
+    def db_path(self, domain: str) -> pathlib.Path:
+        safe_name = re.sub(r"[^\w.-]+", "_", domain)
+        return self.db_dir / f"{safe_name}.db"
+
+    def _session(self) -> requests.Session:
+        # A session per tenant keeps the cookies apart, the adapter shares the connections
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def add_tenant(self, domain: str, token: str, **client_kwargs) -> BambooTimeOff:
+        """
+        Create the client of a company domain with its own database file
+        under db_dir. The client_kwargs are passed to BambooTimeOff.
+        """
+        if domain in self.clients:
+            raise ValueError(f"Tenant already added: {domain}")
+        self.db_dir.mkdir(parents=True, exist_ok=True)
+        client = BambooTimeOff(token, domain, session=self._session(),
+                               engine=create_db_engine(self.db_path(domain)), **client_kwargs)
+        self.clients[domain] = client
+        return client
+
+    def get(self, domain: str) -> BambooTimeOff:
+        return self.clients[domain]
+
+    def remove_tenant(self, domain: str):
+        client = self.clients.pop(domain)
+        client.stop_prefetch()
+        client.session.close()
+        client.emp_qs.engine.dispose()
+
+    def run(self, operation: Callable[[BambooTimeOff], object]) -> tuple[dict, dict]:
+        """
+        Call operation(client) for every tenant concurrently.
+        Returns the results and the errors of the failed tenants, keyed by domain.
+        """
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {domain: executor.submit(operation, client) for domain, client in self.clients.items()}
+            for domain, future in futures.items():
+                try:
+                    results[domain] = future.result()
+                except Exception as e:
+                    logging.error(f"Tenant {domain} failed: {e}")
+                    errors[domain] = e
+        return results, errors
+
+    def calculate_capacity(self, start: str, end: str, focus_factor=0.75, sector=None) -> tuple[dict, dict]:
+        return self.run(lambda client: client.calculate_capacity(start, end, focus_factor, sector=sector))
+
+    def sync(self, start: str, end: str) -> tuple[dict, dict]:
+        """
+        Refresh the employees and the time-off store of every tenant.
+        """
+        return self.run(lambda client: (client.sync_employees(), client.sync_time_off(start, end)))
+
+    def close(self):
+        for domain in self.domains:
+            self.remove_tenant(domain)
+        self.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
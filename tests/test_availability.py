@@ -0,0 +1,49 @@
+import unittest
+from datetime import date, timedelta
+from capacity.availability import AvailabilityMatrix
+
+
+class TestAvailabilityMatrix(unittest.TestCase):
+
+    def setUp(self):
+        # Two working weeks, 2024-12-16 (Monday) to 2024-12-27 (Friday), without Christmas
+        start = date(2024, 12, 16)
+        self.working_dates = [
+            start + timedelta(days=i) for i in range(12)
+            if (start + timedelta(days=i)).weekday() < 5 and i != 9
+        ]
+        self.records = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-17"},
+            # Overlapping request of the same employee is counted once
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-17", "end": "2024-12-18"},
+            # Covers the weekend and the holiday
+            {"employeeId": "2", "type": "timeOff", "start": "2024-12-20", "end": "2024-12-26"},
+            {"employeeId": 3, "type": "timeOff", "start": "2024-12-01", "end": "2025-01-31"},
+            {"type": "holiday", "start": "2024-12-25", "end": "2024-12-25"},
+            # Not in the requested employees
+            {"employeeId": 9, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-27"},
+        ]
+        self.matrix = AvailabilityMatrix.from_records(self.working_dates, [1, 2, 3, 4], self.records)
+
+    def test_available_days_per_employee(self):
+        self.assertEqual(self.matrix.days, 9)
+        self.assertEqual(
+            self.matrix.available_days_per_employee(), {1: 6, 2: 5, 3: 0, 4: 9}
+        )
+
+    def test_capacity(self):
+        self.assertEqual(self.matrix.capacity(hours_per_day=8), (6 + 5 + 0 + 9) * 8)
+        self.assertEqual(self.matrix.capacity(focus_factor=0.5, employee_ids=["1", 4]), (6 + 9) * 4)
+
+    def test_headcount_per_day(self):
+        self.assertEqual(self.matrix.headcount_per_day(), [2, 2, 2, 3, 2, 2, 2, 2, 3])
+        self.assertEqual(self.matrix.headcount_per_day([1]), [0, 0, 0, 1, 1, 1, 1, 1, 1])
+
+    def test_empty_range(self):
+        matrix = AvailabilityMatrix.from_records([], [1, 2], self.records)
+        self.assertEqual(matrix.capacity(), 0)
+        self.assertEqual(matrix.headcount_per_day(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.suite import compare, run_suite, save_results
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_run_and_save(self):
+        results = run_suite(["tiny"], names=["capacity", "working_days"], rounds=1, report=lambda line: None)
+        self.assertEqual(
+            sorted(results),
+            ["tiny/calculate_capacity", "tiny/calculate_capacity_local_store", "tiny/get_working_days"],
+        )
+        self.assertEqual(results["tiny/get_working_days"]["rounds"], 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            save_results(results, path)
+            save_results({"small/get_working_days": results["tiny/get_working_days"]}, path)
+            with open(path) as file:
+                self.assertEqual(len(json.load(file)["results"]), 4)
+
+    def test_search(self):
+        results = run_suite(["tiny"], names=["search"], rounds=1, report=lambda line: None)
+        self.assertEqual(list(results), ["tiny/search_employees"])
+
+    def test_compare(self):
+        timings = lambda median: {"rounds": 1, "min": median, "median": median, "mean": median}
+        base = {"results": {"a": timings(1.0), "b": timings(1.0), "c": timings(1.0), "old": timings(1.0)}}
+        new = {"results": {"a": timings(1.5), "b": timings(0.5), "c": timings(1.05)}}
+        self.assertEqual(
+            [(row["benchmark"], row["status"]) for row in compare(base, new)],
+            [("a", "slower"), ("b", "faster"), ("c", "same")],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+from capacity.business_days import BusinessCalendar, parse_weekend
+
+
+class TestBusinessCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.loader = MagicMock(side_effect=lambda year: [date(year, 12, 25), date(year, 1, 1)])
+        self.calendar = BusinessCalendar(self.loader)
+
+    def test_working_dates(self):
+        working_dates = self.calendar.working_dates(date(2024, 12, 20), date(2024, 12, 31))
+        self.assertEqual(len(working_dates), 7)
+        self.assertNotIn(date(2024, 12, 25), working_dates)
+        self.assertEqual(working_dates[0], date(2024, 12, 20))
+        self.assertEqual(working_dates[-1], date(2024, 12, 31))
+
+    def test_working_days_between(self):
+        self.assertEqual(self.calendar.working_days_between(date(2024, 12, 20), date(2024, 12, 31)), 7)
+        # Spans two years, 2025-01-01 is a holiday
+        self.assertEqual(self.calendar.working_days_between(date(2024, 12, 30), date(2025, 1, 3)), 4)
+        self.assertEqual(self.calendar.working_days_between(date(2024, 12, 21), date(2024, 12, 22)), 0)
+        self.assertEqual(self.calendar.working_days_between(date(2024, 12, 31), date(2024, 12, 1)), 0)
+
+    def test_holidays_are_loaded_once_per_year(self):
+        self.calendar.working_days_between(date(2024, 1, 1), date(2024, 6, 30))
+        self.calendar.working_dates(date(2024, 7, 1), date(2024, 12, 31))
+        self.assertTrue(self.calendar.is_working_day(date(2024, 12, 24)))
+        self.loader.assert_called_once_with(2024)
+
+        self.calendar.clear()
+        self.calendar.working_days_between(date(2024, 1, 1), date(2024, 6, 30))
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_range_holidays(self):
+        calendar = BusinessCalendar(self.loader, weekend="0000110")
+        holidays = [date(2024, 12, 25), date(2025, 1, 1)]
+        self.assertEqual(calendar.working_days_between(date(2024, 12, 22), date(2025, 1, 2), holidays), 8)
+        self.assertEqual(
+            calendar.working_dates(date(2024, 12, 22), date(2025, 1, 2), holidays),
+            calendar.working_dates(date(2024, 12, 22), date(2025, 1, 2)),
+        )
+        # Only the cached working_dates() loaded the years
+        self.assertEqual(self.loader.call_count, 2)
+        self.assertEqual(calendar.working_days_between(date(2024, 12, 20), date(2024, 12, 19), holidays), 0)
+
+    def test_weekend_mask(self):
+        # Sunday to Thursday office
+        calendar = BusinessCalendar(weekend="0000110")
+        working_dates = calendar.working_dates(date(2024, 12, 16), date(2024, 12, 22))
+        self.assertEqual([d.weekday() for d in working_dates], [0, 1, 2, 3, 6])
+        self.assertEqual(parse_weekend(("Friday", "Saturday")), frozenset({4, 5}))
+        with self.assertRaises(ValueError):
+            parse_weekend("00001")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock
+from helpers.cache import MemoCache, freeze, memoize
+
+
+class Calculator:
+    def __init__(self, cache_size=2):
+        self.cache = MemoCache(cache_size)
+        self.data_version = 0
+        self.compute = MagicMock(side_effect=lambda start, end, sector: f"{start}-{end}-{sector}")
+
+    @memoize
+    def capacity(self, start, end, sector=None):
+        return self.compute(start, end, sector)
+
+
+class TestMemoCache(unittest.TestCase):
+
+    def test_lru_eviction_and_counters(self):
+        cache = MemoCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 2, "maxsize": 2})
+
+    def test_freeze(self):
+        self.assertNotEqual(freeze(["BE"]), freeze(("BE",)))
+        self.assertEqual(freeze({"b": [1], "a": None}), freeze({"a": None, "b": [1]}))
+        hash(freeze({"teams": {"be": ("BE",), "ids": [1, 2]}}))
+
+    def test_memoize(self):
+        calc = Calculator()
+        calc.capacity("2024-12-16", "2024-12-20", sector=("BE",))
+        # Same call with positional arguments
+        calc.capacity("2024-12-16", "2024-12-20", ("BE",))
+        self.assertEqual(calc.compute.call_count, 1)
+        self.assertEqual(calc.cache.hits, 1)
+
+        calc.capacity("2024-12-16", "2024-12-20", ["BE"])
+        self.assertEqual(calc.compute.call_count, 2)
+
+    def test_memoize_data_version(self):
+        calc = Calculator()
+        calc.capacity("2024-12-16", "2024-12-20")
+        calc.data_version += 1
+        calc.capacity("2024-12-16", "2024-12-20")
+        self.assertEqual(calc.compute.call_count, 2)
+
+    def test_memoize_without_cache(self):
+        calc = Calculator()
+        calc.cache = None
+        calc.capacity("2024-12-16", "2024-12-20")
+        calc.capacity("2024-12-16", "2024-12-20")
+        self.assertEqual(calc.compute.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+from cli import build_parser, main
+from employees.models import Employee
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.calculate_capacity.return_value = 120.0
+        self.client.get_available_employees_no_perms.return_value = [
+            Employee(bamboo_id=1, f_name="John", l_name="Doe", display_name="John Doe", sector="BE")
+        ]
+        self.client.get_who_is_out_employees.return_value = [
+            {"id": 1, "type": "timeOff", "employeeId": 5, "name": "Jane Doe", "start": "2024-12-23", "end": "2024-12-24"}
+        ]
+        self.client.get_working_days.return_value = [date(2024, 12, 23), date(2024, 12, 24)]
+        self.client.sync_time_off.return_value = 4
+        self.output = tempfile.NamedTemporaryFile(suffix=".out", delete=False).name
+
+    def tearDown(self):
+        os.remove(self.output)
+
+    def run_cli(self, *argv):
+        with patch('cli.make_client', return_value=self.client):
+            self.assertEqual(main([*argv, "-o", self.output]), 0)
+        with open(self.output) as file:
+            return file.read()
+
+    def test_capacity(self):
+        output = self.run_cli("capacity", "--start", "2024-12-23", "--end", "2024-12-29", "--ids", "1,2")
+        self.assertEqual(json.loads(output)[0]["capacity"], 120.0)
+        self.client.calculate_capacity.assert_called_once_with("2024-12-23", "2024-12-29", 0.75, sector=[1, 2])
+
+    def test_available_csv(self):
+        output = self.run_cli("available", "--sector", "BE,QA", "--format", "csv")
+        self.assertEqual(output.splitlines()[1].split(",")[:4], ["1", "John", "Doe", "John Doe"])
+        self.assertEqual(self.client.get_available_employees_no_perms.call_args.kwargs, {"sector": ("BE", "QA")})
+
+    def test_out_and_working_days_ndjson(self):
+        output = self.run_cli("out", "--format", "ndjson")
+        self.assertEqual(json.loads(output)["employeeId"], 5)
+        output = self.run_cli("working-days", "--start", "2024-12-23", "--end", "2024-12-24", "--format", "ndjson")
+        self.assertEqual([json.loads(line)["date"] for line in output.splitlines()], ["2024-12-23", "2024-12-24"])
+
+    def test_sync_time_off(self):
+        output = self.run_cli("sync", "time-off", "--start", "2024-12-01")
+        self.assertEqual(json.loads(output)[0]["end"], "2025-03-01")
+        self.client.sync_time_off.assert_called_once_with("2024-12-01", "2025-03-01")
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as directory, patch('sys.stderr'):
+            self.run_cli("working-days", "--profile", directory)
+            self.assertEqual(sorted(name.split("-", 2)[2] for name in os.listdir(directory)),
+                             ["working-days.collapsed", "working-days.pstats"])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            build_parser().parse_args(["capacity", "--start", "2024-13-01"])
+
+    def test_help_does_not_import_client(self):
+        code = "import sys, cli; cli.build_parser(); print('client' in sys.modules or 'sqlmodel' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip(), "False")
+
+    def test_subcommand_imports_only_what_it_uses(self):
+        code = (
+            "import sys, cli; "
+            "cli.main(['working-days', '--start', '2024-12-23', '--end', '2024-12-27', '--total', "
+            "'--token', 't', '--domain', 'd', '--local-store']); "
+            "print(sorted(m for m in ('multiprocessing', 'mmap', 'cProfile', 'tracemalloc') if m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip().splitlines()[-1], "[]", output.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 from datetime import date
 from client import BambooTimeOff
+from employees.models import Employee
 
 
 class TestBambooTimeOff(unittest.TestCase):
@@ -109,15 +110,13 @@ class TestBambooTimeOff(unittest.TestCase):
 
     @patch('client.requests.Session.get')
     @patch('client.BambooTimeOff.get_employees_from_bamboo')
-    @patch('client.BambooTimeOff.get_time_off')
-    def test_get_available_employees(self, mock_get_time_off, mock_get_employees, mock_get):
+    @patch('client.BambooTimeOff.iter_time_off')
+    def test_get_available_employees(self, mock_iter_time_off, mock_get_employees, mock_get):
         mock_get_employees.return_value = [
             {"id": 1, "name": "Stefanos Tsaklidis"},
             {"id": 2, "name": "Jane Doe"}
         ]
-        mock_get_time_off.return_value = [
-            {"employeeId": 1, "status": {"id": "approved"}}
-        ]
+        mock_iter_time_off.return_value = iter([(1, "approved"), (2, "denied")])
 
         available_employees = self.bamboo.get_available_employees(
             '2024-01-01', '2024-01-31'
@@ -160,6 +159,8 @@ class TestBambooTimeOff(unittest.TestCase):
 
         working_days = self.bamboo.get_working_days('2024-12-20', '2024-12-31')
         self.assertEqual(len(working_days), 7)
+        # Only the range is fetched, not the whole year
+        self.assertIn("start=2024-12-20", mock_get.call_args.args[0])
 
     @patch('client.requests.Session.get')
     @patch('client.BambooTimeOff.get_who_is_out_employees')
@@ -192,9 +193,8 @@ class TestBambooTimeOff(unittest.TestCase):
             {"id": 2, "displayName": "Jane Doe"}
         ]
         mock_response = MagicMock()
-        mock_response.json.return_value = [
-            {"id": 1, "displayName": "Stefanos Tsaklidis"},
-            {"id": 2, "displayName": "Jane Doe"}
+        mock_response.iter_content.return_value = [
+            b'[{"id": 7, "employeeId": 1, "status": {"id": "denied"}}]'
         ]
         mock_get.return_value = mock_response
 
@@ -205,6 +205,247 @@ class TestBambooTimeOff(unittest.TestCase):
         self.assertIn(1, available_employee_ids)
         self.assertIn(2, available_employee_ids)
 
+    @patch('client.requests.Session.get')
+    @patch('client.TimeOffActions.is_range_synced')
+    @patch('client.TimeOffActions.get_records')
+    def test_get_who_is_out_employees_from_local_store(self, mock_get_records, mock_synced, mock_get):
+        record = MagicMock(
+            bamboo_id=1, kind="timeOff", employee_id=5, start_date=date(2024, 12, 20),
+            end_date=date(2024, 12, 23)
+        )
+        mock_get_records.return_value = [record]
+        mock_synced.return_value = True
+        self.bamboo.local_store = True
+
+        who_is_out = self.bamboo.get_who_is_out_employees('2024-12-20', '2024-12-31', only_ids=True)
+        self.assertEqual(who_is_out, [5])
+        mock_get.assert_not_called()
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_employees_from_bamboo')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_calculate_capacity_from_local_store(
+            self, mock_get_all, mock_get_who_is_out, mock_get_employees, mock_get
+    ):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector="QA"),
+        ]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-17"}
+        ]
+        self.bamboo.local_store = True
+
+        capacity = self.bamboo.calculate_capacity('2024-12-16', '2024-12-20', focus_factor=1)
+        self.assertEqual(capacity, (3 + 5) * 8)
+        capacity = self.bamboo.calculate_capacity('2024-12-16', '2024-12-20', focus_factor=1, sector=("BE",))
+        self.assertEqual(capacity, 3 * 8)
+        mock_get_employees.assert_not_called()
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_employees_from_bamboo')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_calculate_capacity_batch(self, mock_get_all, mock_get_who_is_out, mock_get_employees, mock_get):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector="QA"),
+        ]
+        mock_get_employees.return_value = [{"id": "1"}, {"id": "2"}]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-13", "end": "2024-12-17"},
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-27", "end": "2024-12-27"},
+        ]
+        sprints = [("2024-12-09", "2024-12-20"), ("2024-12-23", "2024-12-27")]
+        groups = {"backend": ("BE",), "qa": ("QA",), "everyone": None}
+
+        results = self.bamboo.calculate_capacity_batch(sprints, groups, focus_factor=1)
+        self.assertEqual(len(results), 6)
+        capacities = {(row["sprint_start"], row["group"]): row["capacity"] for row in results}
+        self.assertEqual(capacities[("2024-12-09", "backend")], 7 * 8)
+        self.assertEqual(capacities[("2024-12-09", "qa")], 10 * 8)
+        self.assertEqual(capacities[("2024-12-23", "qa")], 4 * 8)
+        self.assertEqual(capacities[("2024-12-23", "everyone")], 9 * 8)
+        mock_get_employees.assert_called_once()
+        # One call for the records and one for the holidays, both of the union range
+        mock_get_who_is_out.assert_any_call("2024-12-09", "2024-12-27")
+        self.assertEqual(mock_get_who_is_out.call_count, 2)
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_simulate_capacity(self, mock_get_all, mock_get_who_is_out, mock_get):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector="QA"),
+            Employee(bamboo_id=3, f_name="E", l_name="F", display_name="E F", sector="QA"),
+        ]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-17"},
+        ]
+        self.bamboo.local_store = True
+        sprints = [("2024-12-09", "2024-12-13"), ("2024-12-16", "2024-12-20")]
+
+        results = self.bamboo.simulate_capacity(sprints, trials=100, absence_rate=0, focus_factor=1,
+                                                processes=1, seed=3)
+        self.assertEqual([(row["sprint_start"], row["group"]) for row in results], [
+            ("2024-12-09", "BE"), ("2024-12-09", "QA"), ("2024-12-09", "total"),
+            ("2024-12-16", "BE"), ("2024-12-16", "QA"), ("2024-12-16", "total"),
+        ])
+        self.assertEqual(results[4]["p50"], 8 * 8)
+        self.assertEqual(results[5]["p90"], 13 * 8)
+
+        results = self.bamboo.simulate_capacity(sprints, groups={"qa": ("QA",)}, trials=500,
+                                                absence_rate=0.2, processes=1, seed=3)
+        self.assertLess(results[0]["p10"], results[0]["p90"])
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_simulate_capacity_without_sector(self, mock_get_all, mock_get_who_is_out, mock_get):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector=None),
+            Employee(bamboo_id=3, f_name="E", l_name="F", display_name="E F", sector="-"),
+        ]
+        mock_get_who_is_out.return_value = []
+        self.bamboo.local_store = True
+
+        results = self.bamboo.simulate_capacity([("2024-12-09", "2024-12-13")], trials=10, absence_rate=0,
+                                                focus_factor=1, processes=1, seed=3)
+        rows = {row["group"]: row for row in results}
+        self.assertEqual(list(rows), ["-", "BE", "total"])
+        self.assertEqual(rows["-"]["employees"], 2)
+        self.assertEqual(rows["-"]["p50"], 2 * 5 * 8)
+        self.assertEqual(rows["total"]["employees"], 3)
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_calculate_capacity_timeline(self, mock_get_all, mock_get_who_is_out, mock_get):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector="QA"),
+        ]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-17", "end": "2024-12-17"},
+        ]
+        self.bamboo.local_store = True
+
+        timeline = self.bamboo.calculate_capacity_timeline('2024-12-16', '2024-12-20', focus_factor=1)
+        self.assertEqual(len(timeline), 5)
+        self.assertEqual([day["available"] for day in timeline], [2, 1, 2, 2, 2])
+        self.assertEqual(timeline[1]["sectors"]["BE"], {"available": 0, "hours": 0})
+        self.assertEqual(timeline[1]["hours"], 8)
+        self.assertEqual(sum(day["hours"] for day in timeline), 9 * 8)
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.BambooTimeOff.get_employees_from_bamboo')
+    def test_calculate_capacity_memoized(self, mock_get_employees, mock_get_who_is_out, mock_get):
+        bamboo = BambooTimeOff(token='fake_token', company_domain='fake_domain', cache_size=8)
+        mock_get_employees.reset_mock()
+        mock_get_employees.return_value = [{"id": 1, "name": "Stefanos Tsaklidis"}]
+        mock_get_who_is_out.return_value = []
+
+        first = bamboo.calculate_capacity('2024-12-16', '2024-12-20', focus_factor=1)
+        second = bamboo.calculate_capacity('2024-12-16', '2024-12-20', 1)
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get_employees.call_count, 1)
+        # The holidays and the records of the first call share one who's out fetch
+        self.assertEqual(bamboo.cache_stats()["hits"], 2)
+
+        bamboo.bump_data_version()
+        bamboo.calculate_capacity('2024-12-16', '2024-12-20', focus_factor=1)
+        self.assertEqual(mock_get_employees.call_count, 2)
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_employees_from_bamboo')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    @patch('client.EmployeeActions.get_employee_by_id')
+    def test_calculate_capacity_by_group(
+            self, mock_get_by_id, mock_get_all, mock_get_who_is_out, mock_get_employees, mock_get
+    ):
+        employees = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="A B", sector="BE"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="C D", sector="QA"),
+            Employee(bamboo_id=3, f_name="E", l_name="F", display_name="E F", sector="BE"),
+        ]
+        mock_get_all.return_value = employees
+        mock_get_by_id.side_effect = lambda emp_id: next(e for e in employees if e.bamboo_id == int(emp_id))
+        mock_get_employees.return_value = [{"id": "1"}, {"id": "2"}, {"id": "3"}]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-17", "end": "2024-12-18"},
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-20", "end": "2024-12-20"},
+        ]
+
+        by_group = self.bamboo.calculate_capacity_by_group('2024-12-16', '2024-12-20')
+        for sector in ("BE", "QA"):
+            self.assertEqual(
+                by_group[sector],
+                self.bamboo.calculate_capacity('2024-12-16', '2024-12-20', sector=(sector,))
+            )
+        self.assertEqual(by_group["FE"], 0)
+        self.assertEqual(by_group["BE"], (3 + 5) * 8 * 0.75)
+
+    @patch('client.requests.Session.get')
+    @patch('client.BambooTimeOff.get_who_is_out_employees')
+    @patch('client.EmployeeActions.get_all_employees')
+    def test_calculate_capacity_by_manager(self, mock_get_all, mock_get_who_is_out, mock_get):
+        mock_get_all.return_value = [
+            Employee(bamboo_id=1, f_name="A", l_name="B", display_name="Lead"),
+            Employee(bamboo_id=2, f_name="C", l_name="D", display_name="Dev", supervisor="Lead"),
+            Employee(bamboo_id=3, f_name="E", l_name="F", display_name="Other"),
+        ]
+        mock_get_who_is_out.return_value = [
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-16"},
+        ]
+        self.bamboo.local_store = True
+
+        by_manager = self.bamboo.calculate_capacity_by_manager('2024-12-16', '2024-12-20', focus_factor=1)
+        self.assertEqual(by_manager, {1: {"name": "Lead", "employees": 2, "capacity": 9 * 8}})
+
+    @patch('client.requests.Session.get')
+    def test_iter_time_off(self, mock_get):
+        payload = (
+            b'[{"id": 1, "employeeId": 5, "status": {"id": "approved"}, "name": "\xce\x91"},'
+            b' {"id": 2, "employeeId": 6, "status": {"id": "requested"}}]'
+        )
+        mock_response = MagicMock()
+        mock_response.iter_content.return_value = [payload[i:i + 7] for i in range(0, len(payload), 7)]
+        mock_get.return_value = mock_response
+
+        time_off = list(self.bamboo.iter_time_off('2024-01-01', '2024-01-31'))
+        self.assertEqual(time_off, [(5, "approved"), (6, "requested")])
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        mock_response.close.assert_called_once()
+
+    @patch('client.requests.Session.post')
+    def test_get_employees_from_report(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "title": "Employees",
+            "fields": [{"id": "firstName"}, {"id": "jobTitle"}],
+            "employees": [{"id": "190", "firstName": "Stefanos", "jobTitle": "Senior BE Manager"}]
+        }
+        mock_post.return_value = mock_response
+
+        employees = self.bamboo.get_employees_from_bamboo(source="report")
+        self.assertEqual(employees[0]["firstName"], "Stefanos")
+        self.assertIn("/reports/custom?format=JSON", mock_post.call_args.args[0])
+        self.assertIn("department", mock_post.call_args.kwargs["json"]["fields"])
+        with self.assertRaises(ValueError):
+            self.bamboo.get_employees_from_bamboo(source="unknown")
+
+    def test_sync_employees_keeps_the_store_on_empty_directory(self):
+        for directory in ([], None):
+            with patch.object(self.bamboo, "get_employees_from_bamboo", return_value=directory), \
+                    patch.object(self.bamboo.emp_qs, "delete_employees_excluding_ids") as mock_delete:
+                self.assertEqual(self.bamboo.sync_employees(), 0)
+                mock_delete.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
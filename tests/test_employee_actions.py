@@ -274,6 +274,22 @@ class TestEmployeeActions(unittest.TestCase):
         count = self.actions.count_employees_by_sector_and_id("QA", [16])
         self.assertEqual(count, 1)
 
+    def test_count_employees_by_attribute(self):
+        employees_data = [
+            {"bamboo_id": 17, "f_name": "Mia", "l_name": "Hall", "display_name": "Mia Hall",
+             "department": "Server", "sector": "BE"},
+            {"bamboo_id": 18, "f_name": "Noah", "l_name": "King", "display_name": "Noah King",
+             "department": "Server", "sector": "BE"},
+            {"bamboo_id": 19, "f_name": "Olivia", "l_name": "Lee", "display_name": "Olivia Lee",
+             "department": "QA", "sector": "QA"},
+        ]
+        for data in employees_data:
+            self.actions.add_employee(data)
+        counts = self.actions.count_employees_by_attribute("department")
+        self.assertEqual(counts, {"Server": 2, "QA": 1})
+        counts = self.actions.count_employees_by_attribute("department", excluded_ids=[17, None])
+        self.assertEqual(counts, {"Server": 1, "QA": 1})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+from datetime import date, timedelta
+from capacity.interval_index import AbsenceIndex, IntervalTree
+
+
+class TestIntervalTree(unittest.TestCase):
+
+    def test_matches_linear_scan(self):
+        rnd = random.Random(7)
+        intervals = []
+        for value in range(300):
+            start = rnd.randint(0, 200)
+            intervals.append((start, start + rnd.randint(0, 15), value))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rnd.randint(-10, 220)
+            end = start + rnd.randint(0, 10)
+            expected = sorted(value for s, e, value in intervals if s <= end and e >= start)
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(IntervalTree([]).overlapping(0, 10), [])
+
+
+class TestAbsenceIndex(unittest.TestCase):
+
+    def setUp(self):
+        # 2024-12-16 (Monday) to 2024-12-27 (Friday), without Christmas
+        start = date(2024, 12, 16)
+        self.working_dates = [
+            start + timedelta(days=i) for i in range(12)
+            if (start + timedelta(days=i)).weekday() < 5 and i != 9
+        ]
+        records = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-17"},
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-18", "end": "2024-12-18"},
+            # Out on every working day between 2024-12-20 and 2024-12-26
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-20", "end": "2024-12-24"},
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-26", "end": "2024-12-26"},
+            {"employeeId": 3, "type": "timeOff", "start": "2024-12-27", "end": "2025-01-03"},
+            {"type": "holiday", "start": "2024-12-25", "end": "2024-12-25"},
+        ]
+        self.index = AbsenceIndex(self.working_dates, [1, 2, 3, 4], records)
+
+    def test_out_on(self):
+        self.assertEqual(self.index.out_on("2024-12-17"), {1})
+        self.assertEqual(self.index.out_on(date(2024, 12, 21)), {2})
+        self.assertEqual(self.index.available_on("2024-12-27"), {1, 2, 4})
+
+    def test_out_between(self):
+        self.assertEqual(self.index.out_between("2024-12-18", "2024-12-20"), {1, 2})
+        self.assertEqual(self.index.available_every_day("2024-12-16", "2024-12-27"), {4})
+
+    def test_available_any_day(self):
+        self.assertEqual(self.index.out_working_days(2, "2024-12-16", "2024-12-27"), 4)
+        self.assertEqual(self.index.available_any_day("2024-12-20", "2024-12-26"), {1, 3, 4})
+        self.assertEqual(self.index.available_any_day("2024-12-16", "2024-12-18"), {2, 3, 4})
+        self.assertEqual(self.index.available_any_day("2024-12-21", "2024-12-22"), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from datetime import date
+from capacity.availability import AvailabilityMatrix
+from capacity.live import LiveCapacity
+
+
+class TestLiveCapacity(unittest.TestCase):
+
+    def setUp(self):
+        # 2024-12-16 (Monday) to 2024-12-27 (Friday), without Christmas
+        self.working_dates = [
+            date(2024, 12, day) for day in (16, 17, 18, 19, 20, 23, 24, 26, 27)
+        ]
+        self.records = [
+            {"id": 1, "employeeId": 1, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-17"},
+            {"id": 2, "employeeId": 1, "type": "timeOff", "start": "2024-12-17", "end": "2024-12-18"},
+            {"id": 3, "employeeId": 2, "type": "timeOff", "start": "2024-12-20", "end": "2024-12-26"},
+            {"id": 4, "employeeId": 5, "type": "timeOff", "start": "2024-12-16", "end": "2024-12-16"},
+            {"id": 10, "type": "holiday", "start": "2024-12-25", "end": "2024-12-25"},
+        ]
+        self.live = LiveCapacity.from_records(self.working_dates, [1, 2, 3], self.records, focus_factor=1)
+
+    def assert_matches_full_recalculation(self):
+        matrix = AvailabilityMatrix.from_records(
+            self.working_dates, sorted(self.live.employees),
+            list(self.applied.values())
+        )
+        self.assertEqual(self.live.capacity, matrix.capacity())
+        self.assertEqual(self.live.headcount_per_day(), matrix.headcount_per_day())
+
+    def test_baseline(self):
+        self.assertEqual(self.live.total_available_days, 3 * 9 - 3 - 4)
+        self.assertEqual(self.live.capacity, (3 * 9 - 3 - 4) * 8)
+
+    def test_time_off_events(self):
+        self.applied = {record.get("id"): record for record in self.records}
+        new_record = {"id": 6, "employeeId": 3, "type": "timeOff", "start": "2024-12-27", "end": "2024-12-30"}
+        self.assertTrue(self.live.add_time_off(new_record))
+        self.assertFalse(self.live.add_time_off(new_record))
+        self.applied[6] = new_record
+        self.assert_matches_full_recalculation()
+
+        # Employee 1 is still out on 2024-12-17 because of request 2
+        self.assertTrue(self.live.remove_time_off({"id": 1}))
+        del self.applied[1]
+        self.assertEqual(self.live.headcount_per_day()[:3], [3, 2, 2])
+        self.assert_matches_full_recalculation()
+        self.assertFalse(self.live.remove_time_off({"id": 1}))
+
+    def test_employee_events(self):
+        self.applied = {record.get("id"): record for record in self.records}
+        # Employee 5 joins with an already known day off
+        self.assertTrue(self.live.add_employee(5))
+        self.assertEqual(self.live.headcount_per_day()[0], 2)
+        self.assert_matches_full_recalculation()
+
+        self.assertTrue(self.live.remove_employee(1))
+        self.assertFalse(self.live.remove_employee(1))
+        self.assert_matches_full_recalculation()
+
+
+if __name__ == '__main__':
+    unittest.main()
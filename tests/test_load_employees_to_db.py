@@ -94,6 +94,27 @@ class TestLoadEmployeesToDB(unittest.TestCase):
                 sector = result.fetchone()[0]
                 self.assertEqual(sector, case["expected_sector"])
 
+    def test_directory_fields_are_stored(self):
+        all_employees = [
+            {
+                "id": 145,
+                "displayName": "Bob Ross",
+                "firstName": "Bob",
+                "lastName": "Ross",
+                "jobTitle": "QA Automation Engineer",
+                "department": "QA",
+                "location": "Athens, Greece",
+                "division": "Athens",
+                "supervisor": "John Doe",
+            }
+        ]
+        parse_employees_and_save_to_db(all_employees, engine=self.engine)
+        with Session(self.engine) as session:
+            result = session.execute(
+                text("SELECT department, division, location, supervisor FROM employees WHERE bamboo_id = 145")
+            )
+            self.assertEqual(tuple(result.fetchone()), ("QA", "Athens", "Athens, Greece", "John Doe"))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 import unittest
-from db.manager import DatabaseManager
+from db.manager import DatabaseManager, upgrade_schema
+from employees.models import Employee  # noqa: F401 registers the table
+from sqlalchemy import inspect, text
 from settings.vars import db_name
 from sqlmodel import SQLModel, create_engine, Session
 
@@ -19,6 +21,19 @@ class TestDatabaseManager(unittest.TestCase):
         session = DatabaseManager.get_session()
         self.assertIsInstance(session, Session)
 
+    def test_upgrade_schema(self):
+        engine = create_engine('sqlite://')
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE employees (bamboo_id INTEGER PRIMARY KEY, f_name VARCHAR, "
+                "l_name VARCHAR, display_name VARCHAR)"
+            ))
+        upgrade_schema(engine)
+        columns = {column["name"] for column in inspect(engine).get_columns("employees")}
+        self.assertTrue({"sector", "department", "division", "location", "supervisor"} <= columns)
+        indexes = {index["name"] for index in inspect(engine).get_indexes("employees")}
+        self.assertIn("ix_employees_department", indexes)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
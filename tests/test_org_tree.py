@@ -0,0 +1,47 @@
+import unittest
+from employees.models import Employee
+from employees.org_tree import OrgTree
+
+
+def employee(bamboo_id, name, supervisor=None):
+    return Employee(
+        bamboo_id=bamboo_id, f_name=name, l_name="", display_name=name, supervisor=supervisor
+    )
+
+
+class TestOrgTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = OrgTree([
+            employee(1, "CEO"),
+            employee(2, "CTO", "CEO"),
+            employee(3, "Lead", "CTO"),
+            employee(4, "Dev A", "Lead"),
+            employee(5, "Dev B", "Lead"),
+            employee(6, "CFO", "CEO"),
+            employee(7, "Contractor", "Unknown Manager"),
+        ])
+
+    def test_managers(self):
+        self.assertEqual(sorted(self.tree.managers()), [1, 2, 3])
+
+    def test_subtree(self):
+        self.assertEqual(sorted(self.tree.subtree(2)), [2, 3, 4, 5])
+        self.assertEqual(sorted(self.tree.subtree(1)), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.tree.subtree(7), [7])
+
+    def test_rollup(self):
+        totals = self.tree.rollup({emp_id: 1 for emp_id in range(1, 8)})
+        self.assertEqual(totals[1], 6)
+        self.assertEqual(totals[3], 3)
+        self.assertEqual(totals[6], 1)
+
+    def test_supervisor_cycle(self):
+        tree = OrgTree([employee(1, "A", "B"), employee(2, "B", "A")])
+        self.assertEqual(len(tree.order), 2)
+        totals = tree.rollup({1: 1, 2: 1})
+        self.assertEqual(max(totals.values()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import threading
+import unittest
+from datetime import date
+from unittest.mock import ANY, MagicMock, patch
+import requests
+from client import BambooTimeOff
+from helpers.prefetch import PrefetchScheduler, SpeculativeFetcher
+
+RECORDS = [
+    {"id": 1, "type": "timeOff", "employeeId": 5, "start": "2024-12-20", "end": "2024-12-23"},
+    {"id": 2, "type": "timeOff", "employeeId": 6, "start": "2024-12-27", "end": "2024-12-31"},
+    {"id": 10, "type": "holiday", "name": "Christmas Day", "start": "2024-12-25", "end": "2024-12-25"},
+]
+
+
+def fetch_who_is_out(start, end, session=None):
+    return [record for record in RECORDS if record["start"] <= end and record["end"] >= start]
+
+
+class TestPrefetchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.client = MagicMock()
+        self.client.directory_source = "directory"
+        self.client.session = requests.Session()
+        self.client._fetch_employees.return_value = [{"id": "5"}, {"id": "6"}]
+        self.client._fetch_who_is_out.side_effect = fetch_who_is_out
+        self.scheduler = PrefetchScheduler(self.client, window_days=14, interval=60, chunk_days=7,
+                                           clock=lambda: self.now)
+
+    def test_refresh_fetches_window_in_chunks(self):
+        self.assertTrue(self.scheduler.refresh(today=date(2024, 12, 19)))
+        self.client._fetch_who_is_out.assert_any_call("2024-12-19", "2024-12-25", session=ANY)
+        self.client._fetch_who_is_out.assert_any_call("2024-12-26", "2025-01-01", session=ANY)
+        self.client.bump_data_version.assert_called_once()
+        # The workers do not share the client's session
+        sessions = {call.kwargs["session"] for call in self.client._fetch_who_is_out.call_args_list}
+        self.assertNotIn(self.client.session, sessions)
+        adapter = self.client.session.get_adapter("https://api.bamboohr.com")
+        self.assertTrue(all(session.get_adapter("https://api.bamboohr.com") is adapter for session in sessions))
+
+        # Unchanged data keeps the memoized results
+        self.assertFalse(self.scheduler.refresh(today=date(2024, 12, 19)))
+        self.client.bump_data_version.assert_called_once()
+
+    def test_serves_ranges_inside_window(self):
+        self.assertIsNone(self.scheduler.get_who_is_out("2024-12-23", "2024-12-29"))
+        self.scheduler.refresh(today=date(2024, 12, 19))
+
+        records = self.scheduler.get_who_is_out("2024-12-23", "2024-12-29")
+        self.assertEqual([record["id"] for record in records], [1, 10, 2])
+        self.assertEqual(self.scheduler.get_who_is_out("2024-12-24", "2024-12-26"), [RECORDS[2]])
+        self.assertIsNone(self.scheduler.get_who_is_out("2024-12-18", "2024-12-20"))
+        self.assertIsNone(self.scheduler.get_who_is_out("2024-12-30", "2025-01-03"))
+        self.assertEqual(self.scheduler.get_employees(), [{"id": "5"}, {"id": "6"}])
+        self.assertEqual((self.scheduler.hits, self.scheduler.misses), (2, 3))
+
+        # Stale data is not served
+        self.now += 121
+        self.assertIsNone(self.scheduler.get_who_is_out("2024-12-23", "2024-12-29"))
+        self.assertIsNone(self.scheduler.get_employees())
+
+    def test_next_delay_jitter(self):
+        delays = [self.scheduler.next_delay() for _ in range(100)]
+        self.assertTrue(all(54 <= delay <= 66 for delay in delays))
+
+    def test_background_thread(self):
+        self.scheduler.start()
+        self.scheduler.stop(timeout=5)
+        self.client._fetch_employees.assert_called()
+
+
+class TestClientPrefetch(unittest.TestCase):
+
+    @patch('client.BambooTimeOff._fetch_employees', return_value=[{"id": "5"}, {"id": "6"}])
+    @patch('client.BambooTimeOff._fetch_who_is_out', side_effect=fetch_who_is_out)
+    def test_foreground_calls_use_prefetched_window(self, mock_fetch, mock_employees):
+        bamboo = BambooTimeOff(token='fake_token', company_domain='fake_domain', cache_size=64)
+        bamboo.prefetch = PrefetchScheduler(bamboo, window_days=30)
+        bamboo.prefetch.refresh(today=date(2024, 12, 16))
+        mock_fetch.reset_mock()
+        mock_employees.reset_mock()
+
+        self.assertEqual(bamboo.get_who_is_out_employees("2024-12-23", "2024-12-27", only_ids=True), [5, 6, None])
+        # 3 working days for 2 employees minus one out day of employee 5 (Christmas is a holiday)
+        self.assertEqual(bamboo.calculate_capacity("2024-12-23", "2024-12-26", focus_factor=1), 40.0)
+        mock_fetch.assert_not_called()
+        mock_employees.assert_not_called()
+
+        # Outside the window the records are fetched
+        bamboo.get_who_is_out_employees("2024-11-01", "2024-11-05")
+        mock_fetch.assert_called_once_with("2024-11-01", "2024-11-05")
+
+
+class TestSpeculativeFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.fetcher = SpeculativeFetcher(max_age=60, clock=lambda: self.now)
+        self.calls = []
+
+    def tearDown(self):
+        self.fetcher.shutdown()
+
+    def fetch(self, start, end, sector=None):
+        self.calls.append((start, end, sector))
+        return [start, end, sector]
+
+    def test_get_uses_started_call(self):
+        self.fetcher.start(self.fetch, "2024-12-23", "2024-12-29", sector=("BE",))
+        self.fetcher.start(self.fetch, "2024-12-23", "2024-12-29", sector=("BE",))
+        self.assertEqual(self.fetcher.get(self.fetch, "2024-12-23", "2024-12-29", sector=("BE",)),
+                         ["2024-12-23", "2024-12-29", ("BE",)])
+        self.assertEqual(len(self.calls), 1)
+
+        # Consumed, the next get calls again
+        self.fetcher.get(self.fetch, "2024-12-23", "2024-12-29", sector=("BE",))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_other_arguments_and_stale_results_are_fetched(self):
+        self.fetcher.start(self.fetch, "2024-12-23", "2024-12-23")
+        self.fetcher.get(self.fetch, "2024-12-24", "2024-12-24")
+        self.now = 61
+        self.fetcher.get(self.fetch, "2024-12-23", "2024-12-23")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_failed_call_is_retried(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(threading.current_thread().name)
+            if len(attempts) == 1:
+                raise ConnectionError("timeout")
+            return "ok"
+
+        self.fetcher.start(flaky)
+        self.assertEqual(self.fetcher.get(flaky), "ok")
+        self.assertTrue(attempts[0].startswith("speculative-fetch"))
+        self.assertEqual(attempts[1], threading.current_thread().name)
+
+    @patch('requests.Session.get', autospec=True)
+    def test_workers_use_their_own_session(self, mock_get):
+        mock_get.return_value.json.return_value = []
+        bamboo = BambooTimeOff(token='fake_token', company_domain='fake_domain')
+        fetcher = SpeculativeFetcher(bamboo)
+        self.addCleanup(fetcher.shutdown)
+
+        fetcher.start(bamboo.get_who_is_out_employees, "2024-12-23", "2024-12-23")
+        self.assertEqual(fetcher.get(bamboo.get_who_is_out_employees, "2024-12-23", "2024-12-23"), [])
+        worker_session = mock_get.call_args.args[0]
+        self.assertIsNot(worker_session, bamboo.session)
+        self.assertIs(worker_session.get_adapter("https://api.bamboohr.com"),
+                      bamboo.session.get_adapter("https://api.bamboohr.com"))
+
+        # The main thread keeps the client session
+        bamboo.get_who_is_out_employees("2024-12-24", "2024-12-24")
+        self.assertIs(mock_get.call_args.args[0], bamboo.session)
+
+
+if __name__ == '__main__':
+    unittest.main()
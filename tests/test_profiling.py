@@ -0,0 +1,62 @@
+import contextlib
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from client import BambooTimeOff
+from helpers.profiling import PROFILE_ENV, PROFILE_MEMORY_ENV, Profiler, profile_from_env
+
+
+def leaf(n):
+    return sum(range(n))
+
+
+def branch():
+    return [leaf(20_000) for _ in range(50)]
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_writes_pstats_and_collapsed_stacks(self):
+        with Profiler("capacity run", directory=self.directory.name) as profiler:
+            branch()
+        self.assertEqual([path.suffix for path in profiler.paths], [".pstats", ".collapsed"])
+        self.assertTrue(profiler.paths[0].name.endswith("-capacity_run.pstats"))
+
+        with open(profiler.paths[1]) as file:
+            stacks = dict(line.rsplit(" ", 1) for line in file.read().splitlines())
+        leaf_stacks = [stack for stack in stacks if stack.split(";")[-1].startswith("leaf (")]
+        self.assertTrue(leaf_stacks)
+        self.assertIn("branch (test_profiling.py", leaf_stacks[0])
+
+    def test_memory_snapshot(self):
+        with Profiler("alloc", directory=self.directory.name, memory=True, top=5) as profiler:
+            data = [bytearray(1024) for _ in range(1000)]
+        self.assertEqual(len(data), 1000)
+        self.assertEqual([path.name.split(".", 1)[1] for path in profiler.paths],
+                         ["pstats", "collapsed", "tracemalloc", "alloc.txt"])
+        with open(profiler.paths[3]) as file:
+            self.assertTrue(0 < len(file.read().splitlines()) <= 5)
+
+    def test_env_switch(self):
+        with patch.dict(os.environ, {PROFILE_ENV: ""}):
+            self.assertIsInstance(profile_from_env("noop"), contextlib.nullcontext)
+        with patch.dict(os.environ, {PROFILE_ENV: self.directory.name, PROFILE_MEMORY_ENV: "1"}):
+            profiler = profile_from_env("env")
+            self.assertEqual((str(profiler.directory), profiler.memory), (self.directory.name, True))
+
+            bamboo = BambooTimeOff(token='fake_token', company_domain='fake_domain')
+            with bamboo.profile("working-days", memory=False) as profiler:
+                bamboo.calendar.weekend
+            self.assertEqual(str(profiler.directory), self.directory.name)
+            self.assertEqual(len(profiler.paths), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
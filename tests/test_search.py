@@ -0,0 +1,127 @@
+import unittest
+from sqlalchemy import delete, text
+from sqlmodel import Session, SQLModel, create_engine
+from employees.models import Employee, EmployeeActions
+from employees.search import EmployeeSearchIndex, normalize
+from settings.vars import db_test_name
+
+
+def employee(bamboo_id, f_name, l_name, job_title=None):
+    return Employee(bamboo_id=bamboo_id, f_name=f_name, l_name=l_name,
+                    display_name=f"{f_name} {l_name}", job_title=job_title)
+
+
+EMPLOYEES = [
+    employee(1, "Stefanos", "Tsaklidis", "Backend Developer"),
+    employee(2, "Stella", "Papadopoulou", "QA Automation Engineer"),
+    employee(3, "John", "Doe", "Frontend Developer"),
+    employee(4, "Jane", "Stevens", "Product Owner"),
+    employee(5, "Στέφανος", "Παπαδάκης", "Designer"),
+]
+
+
+class TestEmployeeSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = EmployeeSearchIndex(EMPLOYEES)
+
+    def ids(self, query, **kwargs):
+        return [emp.bamboo_id for emp, _ in self.index.search(query, **kwargs)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Στέφανος Τσακλίδης"), ["στεφανος", "τσακλιδης"])
+        self.assertEqual(normalize("QA/Automation-Engineer"), ["qa", "automation", "engineer"])
+        self.assertEqual(normalize(None), [])
+
+    def test_exact_and_prefix(self):
+        self.assertEqual(self.ids("john"), [3])
+        # Prefix matches on the names rank above the job title ones
+        self.assertEqual(self.ids("ste"), [1, 2, 4])
+        self.assertEqual(self.ids("dev"), [1, 3])
+        self.assertEqual(self.ids("στεφ"), [5])
+
+    def test_all_words_rank_first(self):
+        self.assertEqual(self.ids("stef tsak")[0], 1)
+        self.assertEqual(self.ids("developer front")[0], 3)
+
+    def test_fuzzy(self):
+        self.assertEqual(self.ids("tsaklides"), [1])
+        self.assertEqual(self.ids("papadopulou"), [2])
+        self.assertEqual(self.ids("xyzw"), [])
+
+    def test_ids_and_limit(self):
+        self.assertEqual(self.ids("ste", ids=[2, 4]), [2, 4])
+        self.assertEqual(self.ids("ste", limit=1), [1])
+        self.assertEqual(self.ids(""), [])
+
+    def test_upsert_and_remove(self):
+        self.index.upsert(employee(3, "John", "Smith", "Frontend Developer"))
+        self.assertEqual(self.ids("doe"), [])
+        self.assertEqual(self.ids("smith"), [3])
+        self.index.remove(1)
+        self.assertEqual(self.ids("tsaklidis"), [])
+        self.assertEqual(len(self.index), 4)
+
+    def test_large_index(self):
+        # The timings are measured by the "search_employees" benchmark
+        first_names = ["Stefanos", "Maria", "Nikos", "Eleni", "Giorgos", "Anna", "Kostas", "Sofia"]
+        titles = ["Backend Developer", "QA Engineer", "Designer", "Product Owner", "Data Analyst"]
+        index = EmployeeSearchIndex(
+            employee(i, first_names[i % 8], f"Surname{i}", titles[i % 5]) for i in range(20000)
+        )
+        # Exact, short prefixes, many words and typos
+        for query, first in [("surname1234", 1234), ("s", None), ("sur", None), ("maria surnam", None),
+                             ("surnme1234", 1234), ("stefnaos", 0), ("develper", 0)]:
+            results = index.search(query, limit=10)
+            self.assertEqual(len(results), 10, query)
+            if first is not None:
+                self.assertEqual(results[0][0].bamboo_id, first, query)
+
+
+class TestEmployeeSearchSync(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(f'sqlite:///../{db_test_name}')
+        SQLModel.metadata.create_all(cls.engine)
+        cls.actions = EmployeeActions(cls.engine)
+
+    def setUp(self):
+        with Session(self.engine) as session:
+            session.execute(text("DELETE FROM employees"))
+            session.commit()
+        for emp in EMPLOYEES[:3]:
+            self.actions.add_employee(emp.model_dump())
+        self.index = EmployeeSearchIndex.from_db(self.engine)
+
+    def ids(self, query):
+        return [emp.bamboo_id for emp, _ in self.index.search(query)]
+
+    def test_follows_commits(self):
+        self.actions.add_employee(EMPLOYEES[3].model_dump())
+        self.assertEqual(self.ids("stevens"), [4])
+
+        self.actions.update_employee(3, {"l_name": "Smith", "display_name": "John Smith"})
+        self.assertEqual(self.ids("smith"), [3])
+        self.assertEqual(self.ids("doe"), [])
+
+        self.actions.delete_employee(1)
+        self.assertEqual(self.ids("tsaklidis"), [])
+
+    def test_rollback_is_ignored(self):
+        with Session(self.engine) as session:
+            session.add(employee(4, "Jane", "Stevens", "Product Owner"))
+            session.flush()
+            session.rollback()
+        self.assertNotIn(4, self.ids("stevens"))
+
+    def test_bulk_statement_rebuilds(self):
+        with Session(self.engine) as session:
+            session.execute(delete(Employee).where(Employee.bamboo_id == 2))
+            session.commit()
+        self.assertEqual(self.ids("stella"), [])
+        self.assertEqual(len(self.index), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+from employees.models import EmployeeActions
+from employees.sectors import (
+    DEFAULT_SECTOR_RULES, SectorClassifier, reclassify_employees, save_sector_rules
+)
+from settings.vars import db_test_name
+
+
+class TestSectorClassifier(unittest.TestCase):
+
+    def test_default_rules(self):
+        classifier = SectorClassifier()
+        self.assertEqual(classifier.classify("Senior Backend Developer"), "BE")
+        self.assertEqual(classifier.classify("Java Developer"), "SMG")
+        self.assertEqual(classifier.classify("QA DevOps"), "QA")
+        self.assertEqual(classifier.classify("DevOps QA"), "QA")
+        self.assertEqual(classifier.classify("DevOps Engineer"), "DVPS")
+        self.assertEqual(classifier.classify("Unknown Title"), "-")
+        self.assertEqual(classifier.classify(None), "-")
+        self.assertEqual(classifier.sectors, ("QA", "DVPS", "SMG", "BE", "FE", "-"))
+
+    def test_explicit_priority(self):
+        classifier = SectorClassifier([("DevOps", "DVPS")] + list(DEFAULT_SECTOR_RULES))
+        self.assertEqual(classifier.classify("QA DevOps"), "DVPS")
+        self.assertEqual(classifier.classify("QA Engineer"), "QA")
+
+    def test_overlapping_patterns(self):
+        classifier = SectorClassifier([("Lead QA", "QAL"), ("QA", "QA"), ("Team Lead", "TL")])
+        self.assertEqual(classifier.classify("Team Lead QA"), "QAL")
+        self.assertEqual(classifier.classify("Team Lead"), "TL")
+
+    def test_regex_characters_are_literal(self):
+        classifier = SectorClassifier([("C++", "CPP"), (".NET", "NET")])
+        self.assertEqual(classifier.classify("C++ Engineer"), "CPP")
+        self.assertEqual(classifier.classify("ANET"), "-")
+
+
+class TestReclassifyEmployees(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(f'sqlite:///../{db_test_name}')
+        SQLModel.metadata.create_all(cls.engine)
+        cls.actions = EmployeeActions(cls.engine)
+
+    def setUp(self):
+        with Session(self.engine) as session:
+            session.execute(text("DELETE FROM employees"))
+            session.execute(text("DELETE FROM sector_rules"))
+            session.commit()
+
+    def tearDown(self):
+        with Session(self.engine) as session:
+            session.execute(text("DELETE FROM sector_rules"))
+            session.commit()
+
+    def test_reclassify_employees(self):
+        for bamboo_id, job_title in ((1, "QA DevOps"), (2, "Backend Developer"), (3, "Designer")):
+            self.actions.add_employee({
+                "bamboo_id": bamboo_id, "f_name": "A", "l_name": "B", "display_name": "A B",
+                "job_title": job_title, "sector": SectorClassifier().classify(job_title),
+            })
+        self.assertEqual(SectorClassifier.from_db(self.engine).rules, list(DEFAULT_SECTOR_RULES))
+
+        save_sector_rules(self.engine, [("DevOps", "DVPS"), ("Designer", "UX")] + list(DEFAULT_SECTOR_RULES))
+        self.assertEqual(reclassify_employees(self.engine), 2)
+        sectors = {emp.bamboo_id: emp.sector for emp in self.actions.get_all_employees()}
+        self.assertEqual(sectors, {1: "DVPS", 2: "BE", 3: "UX"})
+        self.assertEqual(reclassify_employees(self.engine), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
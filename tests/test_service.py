@@ -0,0 +1,92 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import MagicMock
+from urllib.request import Request, urlopen
+
+import requests
+
+from employees.models import Employee
+from service.server import CapacityService
+
+
+class TestCapacityService(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.calculate_capacity.return_value = 120.0
+        self.client.get_available_employees_no_perms.return_value = [
+            Employee(bamboo_id=1, f_name="John", l_name="Doe", display_name="John Doe", sector="BE")
+        ]
+        self.client.get_who_is_out_employees.return_value = [{"id": 1, "employeeId": 5}]
+        self.client.get_working_days.return_value = [date(2024, 12, 23), date(2024, 12, 24)]
+        self.client.bump_data_version.return_value = 1
+        self.service = CapacityService(self.client)
+
+    def test_capacity(self):
+        status, payload = self.service.handle("GET", "/capacity?start=2024-12-23&end=2024-12-29&sector=BE,QA")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["capacity"], 120.0)
+        self.client.calculate_capacity.assert_called_once_with("2024-12-23", "2024-12-29", 0.75, sector=("BE", "QA"))
+
+    def test_available_out_and_working_days(self):
+        _, payload = self.service.handle("GET", "/available?start=2024-12-23&end=2024-12-29")
+        self.assertEqual(payload["employees"][0]["display_name"], "John Doe")
+        _, payload = self.service.handle("GET", "/out?start=2024-12-23&end=2024-12-29")
+        self.assertEqual(payload["records"], [{"id": 1, "employeeId": 5}])
+        _, payload = self.service.handle("GET", "/working-days/?start=2024-12-23&end=2024-12-29")
+        self.assertEqual(payload, {"total": 2, "dates": ["2024-12-23", "2024-12-24"]})
+
+    def test_errors(self):
+        self.assertEqual(self.service.handle("GET", "/capacity?start=2024-12-23")[0], 400)
+        self.assertEqual(self.service.handle("GET", "/out?start=2024-13-01&end=2024-12-29")[0], 400)
+        self.assertEqual(self.service.handle("GET", "/refresh")[0], 404)
+        self.client.get_who_is_out_employees.side_effect = requests.ConnectionError("timeout")
+        self.assertEqual(self.service.handle("GET", "/out?start=2024-12-23&end=2024-12-29")[0], 502)
+        self.client.get_who_is_out_employees.side_effect = KeyError("employeeId")
+        with self.assertLogs(level="ERROR"):
+            status, payload = self.service.handle("GET", "/out?start=2024-12-23&end=2024-12-29")
+        self.assertEqual((status, payload), (500, {"error": "Internal error"}))
+
+    def test_requests_are_not_serialized(self):
+        # Both requests have to be answering at the same time to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        sessions = []
+        self.client.use_session.side_effect = lambda session: sessions.append(session) or MagicMock()
+
+        def capacity(*args, **kwargs):
+            barrier.wait()
+            return 120.0
+
+        self.client.calculate_capacity.side_effect = capacity
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(
+                lambda _: self.service.handle("GET", "/capacity?start=2024-12-23&end=2024-12-29"), range(2)))
+        self.assertEqual([status for status, _ in results], [200, 200])
+        self.assertIsNot(sessions[0], sessions[1])
+
+    def test_concurrent_requests(self):
+        server = self.service.serve(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        def fetch(_):
+            with urlopen(f"{base_url}/capacity?start=2024-12-23&end=2024-12-29") as rsp:
+                return json.load(rsp)["capacity"]
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                capacities = list(executor.map(fetch, range(32)))
+            with urlopen(Request(f"{base_url}/refresh", method="POST")) as rsp:
+                refreshed = json.load(rsp)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(capacities, [120.0] * 32)
+        self.assertEqual(refreshed, {"data_version": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import date, timedelta
+from capacity.availability import AvailabilityMatrix
+from capacity.simulation import percentile, simulate_capacity
+
+START = date(2025, 1, 6)
+WORKING_DATES = [START + timedelta(days=i) for i in range(14) if (START + timedelta(days=i)).weekday() < 5]
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.availability = AvailabilityMatrix.from_records(WORKING_DATES, range(1, 51), [
+            {"employeeId": 1, "type": "timeOff", "start": "2025-01-06", "end": "2025-01-10"},
+            {"employeeId": 2, "type": "timeOff", "start": "2025-01-13", "end": "2025-01-13"},
+        ])
+        self.groups = {"be": list(range(1, 21)), "qa": list(range(21, 51))}
+        self.windows = [
+            self.availability.range_mask(START.toordinal(), (START + timedelta(days=4)).toordinal()),
+            self.availability.range_mask((START + timedelta(days=7)).toordinal(), (START + timedelta(days=11)).toordinal()),
+        ]
+
+    def test_without_uncertainty_matches_the_capacity(self):
+        results = simulate_capacity(self.availability, self.groups, self.windows, trials=50, absence_rate=0,
+                                    focus_factor=0.75, processes=1, seed=1)
+        first_sprint = {row["group"]: row for row in results[0]}
+        self.assertEqual(list(first_sprint), ["be", "qa", "total"])
+        self.assertEqual(first_sprint["be"]["p10"], (20 * 5 - 5) * 8 * 0.75)
+        self.assertEqual(first_sprint["qa"]["p90"], 30 * 5 * 8 * 0.75)
+        self.assertEqual(first_sprint["total"]["mean"], (50 * 5 - 5) * 8 * 0.75)
+        self.assertEqual(results[1][2]["p50"], (50 * 5 - 1) * 8 * 0.75)
+
+    def test_unplanned_absences(self):
+        results = simulate_capacity(self.availability, self.groups, self.windows, trials=2000, absence_rate=0.1,
+                                    mean_absence_days=1, focus_factor=1, processes=1, seed=7)
+        total = results[0][2]
+        planned = (50 * 5 - 5) * 8
+        self.assertLess(total["p10"], total["p50"])
+        self.assertLess(total["p50"], total["p90"])
+        self.assertLessEqual(total["p90"], planned)
+        # About 10% of the available days are lost, a little less because spells can overlap
+        self.assertAlmostEqual(total["mean"] / planned, 0.9, delta=0.02)
+
+    def test_reproducible_across_processes(self):
+        kwargs = dict(trials=1200, absence_rate=0.05, processes=1, seed=42)
+        single = simulate_capacity(self.availability, self.groups, self.windows, **kwargs)
+        kwargs["processes"] = 2
+        self.assertEqual(simulate_capacity(self.availability, self.groups, self.windows, **kwargs), single)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.5)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 100), 4.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest.mock import patch
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+from client import BambooTimeOff
+from db.manager import create_db_engine
+from db.snapshot import HEADER, MAGIC, Snapshot, SnapshotEmployeeActions, SnapshotTimeOffActions, export_snapshot
+from employees.load_employees_to_db import parse_employees_and_save_to_db
+from employees.models import EmployeeActions
+from time_off.load_time_off_to_db import parse_time_off_and_save_to_db
+from time_off.models import TimeOffActions
+from settings.vars import db_test_name
+
+EMPLOYEES = [
+    {"id": "1", "firstName": "John", "lastName": "Doe", "displayName": "John Doe", "jobTitle": "Backend Developer",
+     "department": "Server"},
+    {"id": "2", "firstName": "Jane", "lastName": "Doe", "displayName": "Jane Doe", "jobTitle": "QA Engineer",
+     "department": "QA"},
+    {"id": "3", "firstName": "Bob", "lastName": "Ross", "displayName": "Bob Ross", "jobTitle": "Designer"},
+]
+WHOS_OUT = [
+    {"id": 1, "type": "timeOff", "employeeId": 1, "name": "John Doe", "start": "2024-12-20", "end": "2024-12-23"},
+    {"id": 2, "type": "timeOff", "employeeId": 2, "name": "Jane Doe", "start": "2024-12-27", "end": "2024-12-31"},
+    {"id": 10, "type": "holiday", "name": "Christmas Day", "start": "2024-12-25", "end": "2024-12-25"},
+]
+
+
+class TestSnapshot(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(f'sqlite:///../{db_test_name}')
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        with Session(self.engine) as session:
+            for table in ("employees", "time_off", "time_off_sync"):
+                session.execute(text(f"DELETE FROM {table}"))
+            session.commit()
+        parse_employees_and_save_to_db(EMPLOYEES, engine=self.engine)
+        parse_time_off_and_save_to_db(WHOS_OUT, "2024-12-16", "2024-12-31", engine=self.engine)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "store.snapshot")
+        self.assertEqual(export_snapshot(self.path, self.engine), {"employees": 3, "time_off": 3, "time_off_sync": 1})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_readers_match_database(self):
+        snapshot = Snapshot(self.path)
+        employees, db_employees = SnapshotEmployeeActions(snapshot, self.engine), EmployeeActions(self.engine)
+        self.assertEqual(
+            [emp.model_dump() for emp in employees.get_employees_excluding_ids([2])],
+            [emp.model_dump() for emp in db_employees.get_employees_excluding_ids([2])],
+        )
+        self.assertEqual(employees.get_employee_by_id("3").display_name, "Bob Ross")
+        self.assertEqual(employees.count_employees_by_attribute("department"),
+                         db_employees.count_employees_by_attribute("department"))
+
+        time_off, db_time_off = SnapshotTimeOffActions(snapshot, self.engine), TimeOffActions(self.engine)
+        for start, end in ((date(2024, 12, 23), date(2024, 12, 26)), (date(2024, 12, 1), date(2024, 12, 31))):
+            self.assertEqual([record.model_dump() for record in time_off.get_records(start, end)],
+                             [record.model_dump() for record in db_time_off.get_records(start, end)])
+            self.assertEqual(time_off.get_out_employee_ids(start, end), db_time_off.get_out_employee_ids(start, end))
+            self.assertEqual(time_off.get_holiday_dates(start, end), db_time_off.get_holiday_dates(start, end))
+        self.assertTrue(time_off.is_range_synced(date(2024, 12, 20), date(2024, 12, 31)))
+        self.assertFalse(time_off.is_range_synced(date(2024, 12, 1), date(2024, 12, 20)))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "r+b") as file:
+            file.write(HEADER.pack(MAGIC, 99, 0, 0))
+        with self.assertRaisesRegex(ValueError, "version"):
+            Snapshot(self.path)
+        with open(self.path, "wb") as file:
+            file.write(b"not a snapshot at all")
+        with self.assertRaises((ValueError, struct.error)):
+            Snapshot(self.path)
+
+    def test_client_answers_before_restore(self):
+        engine = create_db_engine(os.path.join(self.directory.name, "worker.db"))
+        bamboo = BambooTimeOff(token='fake_token', company_domain='fake_domain', local_store=True, engine=engine)
+        restore = Snapshot.restore
+        restoring = threading.Event()
+        snapshots = []
+
+        def blocked_restore(snapshot, engine):
+            snapshots.append(snapshot)
+            restoring.wait(5)
+            return restore(snapshot, engine)
+
+        with patch('db.snapshot.Snapshot.restore', blocked_restore):
+            thread = bamboo.load_snapshot(self.path, sync_days=0)
+            available = bamboo.get_available_employees_no_perms("2024-12-23", "2024-12-23")
+            self.assertEqual(sorted(emp.bamboo_id for emp in available), [2, 3])
+            # 4 working days (Christmas is a holiday) for 3 employees, John and Jane out one day each
+            self.assertEqual(bamboo.calculate_capacity("2024-12-23", "2024-12-27", focus_factor=1), 80.0)
+            restoring.set()
+            thread.join(5)
+
+        self.assertTrue(snapshots[0].closed)
+        self.assertIsInstance(bamboo.emp_qs, EmployeeActions)
+        self.assertEqual(bamboo.emp_qs.count_all_available_employees(), 3)
+        self.assertEqual(bamboo.time_off_qs.count_all_records(), 3)
+        self.assertEqual(bamboo.calculate_capacity("2024-12-23", "2024-12-27", focus_factor=1), 80.0)
+
+    def test_restore_keeps_stored_rows(self):
+        snapshot = Snapshot(self.path)
+        self.addCleanup(snapshot.close)
+        # The database moved on since the export
+        EmployeeActions(self.engine).update_employee(3, {"job_title": "Frontend Developer"})
+        self.assertEqual(snapshot.restore(self.engine), {"employees": 0, "time_off": 0, "time_off_sync": 0})
+        self.assertEqual(EmployeeActions(self.engine).get_employee(3).job_title, "Frontend Developer")
+        with Session(self.engine) as session:
+            self.assertEqual(session.execute(text("SELECT count(*) FROM time_off_sync")).scalar(), 1)
+
+        engine = create_db_engine(os.path.join(self.directory.name, "empty.db"))
+        self.assertEqual(snapshot.restore(engine), {"employees": 3, "time_off": 3, "time_off_sync": 1})
+
+    def test_closed_snapshot_reads_the_database(self):
+        snapshot = Snapshot(self.path)
+        time_off = SnapshotTimeOffActions(snapshot, self.engine)
+        snapshot.close()
+        snapshot.close()
+        self.assertTrue(snapshot.closed)
+        self.assertEqual(time_off.count_all_records(), 3)
+        self.assertEqual(time_off.get_out_employee_ids(date(2024, 12, 22), date(2024, 12, 28)), [1, 2])
+        self.assertEqual(time_off.get_holiday_dates(date(2024, 12, 1), date(2024, 12, 31)), [date(2024, 12, 25)])
+        self.assertTrue(time_off.is_range_synced(date(2024, 12, 20), date(2024, 12, 31)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import json
+import unittest
+from helpers.stream import iter_json_array
+
+
+class TestIterJsonArray(unittest.TestCase):
+
+    def chunked(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_items_split_across_chunks(self):
+        items = [{"id": i, "employeeId": 100 + i, "status": {"id": "approved"}} for i in range(20)]
+        payload = json.dumps(items).encode("utf-8")
+        for size in (1, 3, 17, len(payload)):
+            self.assertEqual(list(iter_json_array(self.chunked(payload, size))), items)
+
+    def test_scalars_and_unicode(self):
+        payload = '[123, "Στέφανος", true, null, 4.5]'.encode("utf-8")
+        self.assertEqual(
+            list(iter_json_array(self.chunked(payload, 2))), [123, "Στέφανος", True, None, 4.5]
+        )
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(["  [ ", " ]"])), [])
+
+    def test_invalid_payloads(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"employees": []}']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[{"id": 1}, ']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
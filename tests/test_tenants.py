@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from datetime import date
+from benchmarks.fake_bamboo import FakeBambooServer, generate_tenant
+from client import BambooTimeOff
+from tenants import TenantManager
+
+
+class TestTenantManager(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.servers = {
+            "acme": FakeBambooServer(generate_tenant(employees=10, time_off_records=50, start=date(2024, 12, 1),
+                                                     days=31, seed=1)),
+            "globex": FakeBambooServer(generate_tenant(employees=25, time_off_records=50, start=date(2024, 12, 1),
+                                                       days=31, seed=2)),
+        }
+        for server in self.servers.values():
+            server.start()
+        self.manager = TenantManager(db_dir=self.directory.name, pool_size=2, max_workers=2)
+        for domain, server in self.servers.items():
+            self.manager.add_tenant(domain, f"{domain}_key", base_url=server.base_url)
+
+    def tearDown(self):
+        self.manager.close()
+        for server in self.servers.values():
+            server.stop()
+        self.directory.cleanup()
+
+    def test_isolated_stores_and_shared_pool(self):
+        acme, globex = self.manager.get("acme"), self.manager.get("globex")
+        self.assertEqual(acme.emp_qs.count_all_available_employees(), 10)
+        self.assertEqual(globex.emp_qs.count_all_available_employees(), 25)
+        self.assertNotEqual(acme.session, globex.session)
+        self.assertIs(acme.session.get_adapter(acme.base_url), globex.session.get_adapter(globex.base_url))
+        with self.assertRaises(ValueError):
+            self.manager.add_tenant("acme", "other_key")
+
+    def test_concurrent_report(self):
+        results, errors = self.manager.calculate_capacity("2024-12-16", "2024-12-20", focus_factor=1)
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(results), ["acme", "globex"])
+        for domain, client in self.manager.clients.items():
+            self.assertEqual(results[domain], client.calculate_capacity("2024-12-16", "2024-12-20", focus_factor=1))
+        self.assertLessEqual(results["acme"], 10 * 5 * 8)
+        self.assertGreater(results["globex"], results["acme"])
+
+    def test_failed_tenant(self):
+        self.servers["globex"].stop()
+        results, errors = self.manager.sync("2024-12-01", "2024-12-31")
+        self.assertEqual(list(results), ["acme"])
+        self.assertEqual(list(errors), ["globex"])
+        self.assertGreater(self.manager.get("acme").time_off_qs.count_all_records(), 0)
+        self.servers["globex"] = FakeBambooServer(generate_tenant(employees=1))
+        self.servers["globex"].start()
+
+    def test_company_domain_takes_precedence(self):
+        bamboo = BambooTimeOff(token='fake_token', company_domain='other_domain', local_store=True)
+        self.assertIn("/other_domain/", bamboo.base_url)
+
+
+if __name__ == '__main__':
+    unittest.main()
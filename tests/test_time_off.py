@@ -0,0 +1,79 @@
+import unittest
+from datetime import date
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+from time_off.load_time_off_to_db import parse_time_off_and_save_to_db, parse_time_off_record
+from time_off.models import TimeOffActions
+from settings.vars import db_test_name
+
+
+class TestTimeOffStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(f'sqlite:///../{db_test_name}')
+        SQLModel.metadata.create_all(cls.engine)
+        cls.actions = TimeOffActions(cls.engine)
+
+    def setUp(self):
+        # Clean the database before each test
+        with Session(self.engine) as session:
+            session.execute(text("DELETE FROM time_off"))
+            session.execute(text("DELETE FROM time_off_sync"))
+            session.commit()
+
+    def whos_out(self):
+        return [
+            {"id": 1, "type": "timeOff", "employeeId": 5, "name": "John Doe",
+             "start": "2024-12-20", "end": "2024-12-23"},
+            {"id": 2, "type": "timeOff", "employeeId": 6, "name": "Jane Doe",
+             "start": "2024-12-27", "end": "2024-12-31"},
+            {"id": 10, "type": "holiday", "name": "Christmas Day",
+             "start": "2024-12-25", "end": "2024-12-25"},
+        ]
+
+    def test_parse_time_off_record(self):
+        request = {
+            "id": 3, "employeeId": "7", "status": {"id": "denied"},
+            "type": {"id": "1", "name": "Vacation"},
+            "start": "2024-12-05", "end": "2024-12-06"
+        }
+        record = parse_time_off_record(request)
+        self.assertEqual(record.kind, "timeOff")
+        self.assertEqual(record.employee_id, 7)
+        self.assertEqual(record.status, "denied")
+        self.assertEqual(record.name, "Vacation")
+        self.assertEqual(record.end_date, date(2024, 12, 6))
+
+        holiday = parse_time_off_record(self.whos_out()[2])
+        self.assertEqual(holiday.kind, "holiday")
+        self.assertIsNone(holiday.employee_id)
+
+    def test_range_overlap_queries(self):
+        parse_time_off_and_save_to_db(self.whos_out(), "2024-12-16", "2024-12-31", engine=self.engine)
+
+        records = self.actions.get_records(date(2024, 12, 23), date(2024, 12, 26))
+        self.assertEqual([r.bamboo_id for r in records], [1, 10])
+        self.assertEqual(
+            self.actions.get_out_employee_ids(date(2024, 12, 22), date(2024, 12, 28)), [5, 6]
+        )
+        self.assertEqual(
+            self.actions.get_holiday_dates(date(2024, 12, 1), date(2024, 12, 31)), [date(2024, 12, 25)]
+        )
+
+    def test_sync_replaces_cancelled_records(self):
+        parse_time_off_and_save_to_db(self.whos_out(), "2024-12-16", "2024-12-31", engine=self.engine)
+        # Request 2 was cancelled
+        parse_time_off_and_save_to_db(self.whos_out()[:1], "2024-12-16", "2024-12-31", engine=self.engine)
+        self.assertEqual(self.actions.count_all_records(), 1)
+
+    def test_is_range_synced(self):
+        parse_time_off_and_save_to_db([], "2024-12-01", "2024-12-15", engine=self.engine)
+        parse_time_off_and_save_to_db([], "2024-12-16", "2024-12-31", engine=self.engine)
+        self.assertTrue(self.actions.is_range_synced(date(2024, 12, 10), date(2024, 12, 20)))
+        self.assertFalse(self.actions.is_range_synced(date(2024, 11, 30), date(2024, 12, 20)))
+        self.assertFalse(self.actions.is_range_synced(date(2024, 12, 20), date(2025, 1, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
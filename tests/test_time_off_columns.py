@@ -0,0 +1,39 @@
+import unittest
+from datetime import date
+from time_off.columns import HOLIDAY, TIME_OFF, TimeOffColumns, as_columns
+
+
+class TestTimeOffColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [
+            {"id": 1, "type": "timeOff", "employeeId": 5, "start": "2024-12-20", "end": "2024-12-23"},
+            {"id": 2, "type": "timeOff", "employeeId": "6", "start": "2024-12-20", "end": "2024-12-20"},
+            {"id": 10, "type": "holiday", "name": "Christmas Day", "start": "2024-12-25", "end": "2024-12-25"},
+            {"type": "holiday", "start": "2024-12-26"},
+        ]
+        self.columns = TimeOffColumns.from_records(self.records)
+
+    def test_columns(self):
+        self.assertEqual(len(self.columns), 4)
+        self.assertEqual(list(self.columns.employee_ids), [5, 6, 0, 0])
+        self.assertEqual(list(self.columns.types), [TIME_OFF, TIME_OFF, HOLIDAY, HOLIDAY])
+        self.assertEqual(self.columns.starts[0], date(2024, 12, 20).toordinal())
+        self.assertEqual(self.columns.nbytes(), 4 * (8 + 8 + self.columns.starts.itemsize * 2 + 1))
+
+    def test_consumers(self):
+        self.assertEqual(
+            list(self.columns.absences()),
+            [(1, 5, date(2024, 12, 20).toordinal(), date(2024, 12, 23).toordinal()),
+             (2, 6, date(2024, 12, 20).toordinal(), date(2024, 12, 20).toordinal())]
+        )
+        self.assertEqual(self.columns.out_employee_ids(), [5, 6])
+        self.assertEqual(self.columns.holiday_dates(), [date(2024, 12, 25), date(2024, 12, 26)])
+
+    def test_as_columns(self):
+        self.assertIs(as_columns(self.columns), self.columns)
+        self.assertEqual(len(as_columns(self.records)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from datetime import date
+from capacity.timeline import merge_absences, out_count_timeline
+
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self):
+        # 2024-12-16 (Monday) to 2024-12-20 (Friday)
+        self.working_dates = [date(2024, 12, day) for day in range(16, 21)]
+        self.records = [
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-14", "end": "2024-12-17"},
+            {"employeeId": 1, "type": "timeOff", "start": "2024-12-17", "end": "2024-12-18"},
+            {"employeeId": 2, "type": "timeOff", "start": "2024-12-20", "end": "2024-12-24"},
+            {"employeeId": 3, "type": "timeOff", "start": "2024-12-18", "end": "2024-12-18"},
+            {"type": "holiday", "start": "2024-12-25", "end": "2024-12-25"},
+        ]
+
+    def test_merge_absences(self):
+        merged = merge_absences(self.records, {1, 2})
+        self.assertEqual(merged[1], [(date(2024, 12, 14).toordinal(), date(2024, 12, 18).toordinal())])
+        self.assertEqual(len(merged[2]), 1)
+        self.assertNotIn(3, merged)
+
+    def test_out_count_timeline(self):
+        timeline = out_count_timeline(self.working_dates, {1: "BE", 2: "BE", 3: "QA", 4: "QA"}, self.records)
+        self.assertEqual(timeline["BE"], [1, 1, 1, 0, 1])
+        self.assertEqual(timeline["QA"], [0, 0, 1, 0, 0])
+
+    def test_out_count_timeline_without_working_dates(self):
+        self.assertEqual(out_count_timeline([], {1: "BE"}, self.records), {"BE": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
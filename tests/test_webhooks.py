@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+import unittest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+from employees.models import EmployeeActions
+from time_off.models import TimeOffActions
+from webhooks.receiver import WebhookReceiver
+from webhooks.replay import replay, signed_headers
+from settings.vars import db_test_name
+
+SECRET = "test-secret"
+
+
+class TestWebhookReceiver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(f'sqlite:///../{db_test_name}')
+        SQLModel.metadata.create_all(cls.engine)
+        cls.employees = EmployeeActions(cls.engine)
+        cls.time_off = TimeOffActions(cls.engine)
+
+    def setUp(self):
+        with Session(self.engine) as session:
+            session.execute(text("DELETE FROM employees"))
+            session.execute(text("DELETE FROM time_off"))
+            session.commit()
+        self.changes = []
+        self.receiver = WebhookReceiver(SECRET, engine=self.engine, on_change=lambda: self.changes.append(1))
+
+    def post(self, payload, secret=SECRET, timestamp=None):
+        body = json.dumps(payload).encode("utf-8")
+        return self.receiver.handle(body, signed_headers(body, secret, timestamp))
+
+    def test_rejects_invalid_signature(self):
+        status, _ = self.post({"employees": []}, secret="other")
+        self.assertEqual(status, 401)
+        status, _ = self.post({"employees": []}, timestamp=time.time() - 3600)
+        self.assertEqual(status, 401)
+        self.assertEqual(self.receiver.handle(b"{}", {})[0], 401)
+
+    def test_employee_lifecycle(self):
+        status, payload = self.post({"employees": [{
+            "id": "7", "action": "Created",
+            "fields": {"firstName": "John", "lastName": "Doe", "jobTitle": "Backend Developer"},
+        }]})
+        self.assertEqual((status, payload), (200, {"applied": 1, "skipped": 0}))
+        self.assertEqual(self.employees.get_employee(7).sector, "BE")
+
+        self.post({"employees": [{
+            "id": "7", "action": "Updated", "changedFields": ["jobTitle"],
+            "fields": {"firstName": "John", "jobTitle": "QA Engineer"},
+        }]})
+        employee = self.employees.get_employee(7)
+        self.assertEqual((employee.job_title, employee.sector, employee.f_name), ("QA Engineer", "QA", "John"))
+
+        self.post({"employees": [{"id": "7", "action": "Deleted"}]})
+        self.assertIsNone(self.employees.get_employee(7))
+        self.assertEqual(len(self.changes), 3)
+
+    def test_time_off_lifecycle(self):
+        request = {"id": 3, "employeeId": "5", "status": {"status": "approved"},
+                   "type": {"id": "1", "name": "Vacation"}, "start": "2024-12-05", "end": "2024-12-06"}
+        self.post({"timeOff": [{"action": "Created", "request": request}]})
+        self.assertEqual(self.time_off.count_all_records(), 1)
+
+        request["status"] = {"status": "canceled"}
+        self.post({"timeOff": [{"action": "Updated", "request": request}]})
+        self.assertEqual(self.time_off.get_records(request["start"], request["end"]), [])
+
+        status, payload = self.post({"timeOff": [{"action": "Deleted", "request": {"id": 3}}]})
+        self.assertEqual(payload, {"applied": 1, "skipped": 0})
+        self.assertEqual(self.time_off.count_all_records(), 0)
+
+    def test_invalid_event(self):
+        self.assertEqual(self.post({"timeOff": [{"action": "Created", "request": {"id": 1}}]})[0], 400)
+        self.assertEqual(self.changes, [])
+
+    def test_invalid_event_rolls_back_the_batch(self):
+        request = {"id": 3, "employeeId": "5", "status": {"status": "approved"},
+                   "start": "2024-12-05", "end": "2024-12-06"}
+        status, _ = self.post({
+            "employees": [{"id": "7", "action": "Created", "fields": {"firstName": "John", "lastName": "Doe"}}],
+            "timeOff": [{"action": "Created", "request": request}, {"action": "Created", "request": {"id": 4}}],
+        })
+        self.assertEqual(status, 400)
+        self.assertIsNone(self.employees.get_employee(7))
+        self.assertEqual(self.time_off.count_all_records(), 0)
+        self.assertEqual(self.changes, [])
+
+    def test_skips_events_without_a_valid_row(self):
+        status, payload = self.post({"employees": [
+            {"id": "77", "action": "Updated", "fields": {"jobTitle": "QA"}},
+            {"id": "78", "action": "Created", "fields": {"jobTitle": "QA"}},
+            {"id": "79", "action": "Deleted"},
+        ]})
+        self.assertEqual((status, payload), (200, {"applied": 0, "skipped": 3}))
+        self.assertEqual(self.employees.count_all_available_employees(), 0)
+        self.assertEqual(self.changes, [])
+
+    def test_created_merges_the_sent_fields(self):
+        self.post({"employees": [{"id": "7", "action": "Created", "fields": {
+            "firstName": "John", "lastName": "Doe", "jobTitle": "Backend Developer", "department": "Server",
+        }}]})
+        self.post({"employees": [{"id": "7", "action": "Created", "fields": {"firstName": "Johnny"}}]})
+        employee = self.employees.get_employee(7)
+        self.assertEqual(
+            (employee.f_name, employee.l_name, employee.department, employee.sector),
+            ("Johnny", "Doe", "Server", "BE"),
+        )
+
+    def test_replay_against_server(self):
+        server = self.receiver.serve(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            statuses = replay(f"http://127.0.0.1:{server.server_port}", [
+                {"employees": [{"id": "1", "action": "Created", "fields": {"firstName": "Ann", "lastName": "Lee", "jobTitle": "Frontend Dev"}}]},
+                {"employees": [{"id": "2", "action": "Created", "fields": {"firstName": "Bob", "lastName": "Ray", "jobTitle": "DevOps"}}]},
+            ], SECRET)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual(self.employees.count_all_available_employees(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
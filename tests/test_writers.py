@@ -0,0 +1,36 @@
+import io
+import json
+import unittest
+from helpers.writers import write_rows
+
+ROWS = [{"id": 1, "name": "John Doe"}, {"id": 2, "name": "Doe, Jane"}]
+
+
+class TestWriters(unittest.TestCase):
+
+    def test_json(self):
+        stream = io.StringIO()
+        self.assertEqual(write_rows(iter(ROWS), "json", stream), 2)
+        self.assertEqual(json.loads(stream.getvalue()), ROWS)
+
+        stream = io.StringIO()
+        write_rows([], "json", stream)
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+    def test_ndjson(self):
+        stream = io.StringIO()
+        write_rows(ROWS, "ndjson", stream)
+        self.assertEqual([json.loads(line) for line in stream.getvalue().splitlines()], ROWS)
+
+    def test_csv(self):
+        stream = io.StringIO()
+        write_rows(ROWS, "csv", stream, fields=["name", "id"])
+        self.assertEqual(stream.getvalue().splitlines(), ["name,id", "John Doe,1", '"Doe, Jane",2'])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            write_rows(ROWS, "xml", io.StringIO())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from array import array
+from datetime import date
+from typing import Iterable, Iterator
+
+TIME_OFF = 0
+HOLIDAY = 1
+OTHER = 2
+TYPE_CODES = {"timeOff": TIME_OFF, "holiday": HOLIDAY}
+
+
+class TimeOffColumns:
+    """
+    '/time_off/whos_out/' records parsed once into compact columns:
+    record IDs, int employee IDs (0 for holidays), start/end day ordinals and
+    a type code. Repeated date strings are parsed once.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.employee_ids = array("q")
+        self.starts = array("l")
+        self.ends = array("l")
+        self.types = array("b")
+
+    def __len__(self):
+        return len(self.types)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "TimeOffColumns":
+        columns = cls()
+        ordinals = {}
+        for record in records:
+            start = record["start"]
+            end = record.get("end") or start
+            start_ordinal = ordinals.get(start)
+            if start_ordinal is None:
+                start_ordinal = ordinals[start] = date.fromisoformat(start).toordinal()
+            end_ordinal = ordinals.get(end)
+            if end_ordinal is None:
+                end_ordinal = ordinals[end] = date.fromisoformat(end).toordinal()
+
+            columns.ids.append(int(record.get("id") or 0))
+            columns.employee_ids.append(int(record.get("employeeId") or 0))
+            columns.starts.append(start_ordinal)
+            columns.ends.append(end_ordinal)
+            columns.types.append(TYPE_CODES.get(record.get("type"), OTHER))
+        return columns
+
+    def absences(self) -> Iterator[tuple]:
+        """
+        Yield (record ID, employee ID, start ordinal, end ordinal) of the employee absences.
+        """
+        for i, emp_id in enumerate(self.employee_ids):
+            if emp_id:
+                yield self.ids[i], emp_id, self.starts[i], self.ends[i]
+
+    def out_employee_ids(self) -> list[int]:
+        return [emp_id for emp_id in self.employee_ids if emp_id]
+
+    def holiday_dates(self) -> list[date]:
+        """
+        The start date of every holiday, in the order of the records.
+        """
+        return [
+            date.fromordinal(self.starts[i]) for i, code in enumerate(self.types) if code == HOLIDAY
+        ]
+
+    def nbytes(self) -> int:
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ids, self.employee_ids, self.starts, self.ends, self.types)
+        )
+
+
+def as_columns(records) -> TimeOffColumns:
+    """
+    Accept either parsed columns or the raw '/time_off/whos_out/' records.
+    """
+    if isinstance(records, TimeOffColumns):
+        return records
+    return TimeOffColumns.from_records(records)
@@ -0,0 +1,57 @@
+import logging
+from datetime import date
+
+from sqlalchemy.exc import SQLAlchemyError
+from time_off.models import TimeOff, TimeOffActions
+
+
+def parse_time_off_record(record):
+    """
+    Convert a record of '/time_off/whos_out/' or '/time_off/requests' to a TimeOff.
+    Records of 'whos_out' are always approved, 'requests' carry their own status.
+    """
+    record_type = record.get("type")
+    if isinstance(record_type, dict):
+        # '/time_off/requests' item, "type" holds the time-off type
+        kind = "timeOff"
+        name = record_type.get("name")
+        status = record.get("status", {})
+        status = status.get("id") or status.get("status")
+    else:
+        kind = record_type or "timeOff"
+        name = record.get("name")
+        status = "approved" if kind == "timeOff" else None
+
+    employee_id = record.get("employeeId")
+    return TimeOff(
+        bamboo_id=int(record.get("id")),
+        kind=kind,
+        employee_id=int(employee_id) if employee_id else None,
+        name=name,
+        status=status,
+        start_date=date.fromisoformat(record["start"]),
+        end_date=date.fromisoformat(record["end"]),
+    )
+
+
+def parse_time_off_and_save_to_db(records, start, end, engine=None, kinds=("timeOff", "holiday")):
+    """
+    Store the time-off records fetched for [start, end], replacing what was
+    stored before for the same range.
+    """
+    if isinstance(start, str):
+        start = date.fromisoformat(start)
+    if isinstance(end, str):
+        end = date.fromisoformat(end)
+
+    time_off = []
+    for record in records:
+        try:
+            time_off.append(parse_time_off_record(record))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Invalid time-off record {record}: {e}")
+
+    try:
+        TimeOffActions(engine).replace_range(start, end, time_off, kinds=kinds)
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {e}")
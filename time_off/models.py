@@ -0,0 +1,123 @@
+from datetime import date, datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field, Session, select
+from sqlalchemy import Index, and_, delete, func, or_
+
+from db.manager import DatabaseManager
+
+
+class TimeOff(SQLModel, table=True):
+    __tablename__ = "time_off"
+    # BambooHR ids are unique per kind ("timeOff" requests and "holiday" entries)
+    bamboo_id: int = Field(primary_key=True)
+    kind: str = Field(primary_key=True)
+    employee_id: Optional[int] = Field(default=None)
+    name: Optional[str] = Field(default=None)
+    status: Optional[str] = Field(default=None)
+    start_date: date
+    end_date: date
+
+    # Range-overlap queries filter on "start_date <= end AND end_date >= start"
+    __table_args__ = (
+        Index("ix_time_off_start_end", "start_date", "end_date"),
+        Index("ix_time_off_end_start", "end_date", "start_date"),
+        Index("ix_time_off_employee_start", "employee_id", "start_date"),
+    )
+
+
+class TimeOffSync(SQLModel, table=True):
+    __tablename__ = "time_off_sync"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    start_date: date
+    end_date: date
+    synced_at: datetime
+
+
+class TimeOffActions:
+    def __init__(self, engine=None):
+        # Get the database instance
+        self.engine = engine or DatabaseManager.get_db_instance()
+
+    @staticmethod
+    def _overlaps(start, end):
+        return and_(TimeOff.start_date <= end, TimeOff.end_date >= start)
+
+    def replace_range(self, start, end, records, kinds=("timeOff", "holiday")):
+        """
+        Replace every stored record of the given kinds that overlaps the range
+        with the provided records, and remember the range as synced.
+        BambooHR returns all records overlapping the range, so anything stored
+        that is missing from the response has been cancelled or removed.
+        """
+        with Session(self.engine) as session:
+            session.execute(
+                delete(TimeOff).where(self._overlaps(start, end)).where(TimeOff.kind.in_(kinds))
+            )
+            for record in records:
+                session.merge(record)
+            session.add(TimeOffSync(start_date=start, end_date=end, synced_at=datetime.now()))
+            session.commit()
+
+    def upsert_records(self, records):
+        with Session(self.engine) as session:
+            for record in records:
+                session.merge(record)
+            session.commit()
+
+    def delete_record(self, bamboo_id, kind="timeOff"):
+        with Session(self.engine) as session:
+            result = session.execute(
+                delete(TimeOff).where(TimeOff.bamboo_id == bamboo_id, TimeOff.kind == kind)
+            )
+            session.commit()
+            return result.rowcount > 0
+
+    def get_records(self, start, end, kind=None, status="approved"):
+        with Session(self.engine) as session:
+            statement = select(TimeOff).where(self._overlaps(start, end))
+            if kind is not None:
+                statement = statement.where(TimeOff.kind == kind)
+            if status is not None:
+                statement = statement.where(or_(TimeOff.status == status, TimeOff.status.is_(None)))
+            statement = statement.order_by(TimeOff.start_date, TimeOff.bamboo_id)
+            return session.exec(statement).all()
+
+    def get_out_employee_ids(self, start, end):
+        with Session(self.engine) as session:
+            statement = select(TimeOff.employee_id).where(
+                self._overlaps(start, end),
+                TimeOff.kind == "timeOff",
+                TimeOff.status == "approved",
+            ).distinct()
+            return session.exec(statement).all()
+
+    def get_holiday_dates(self, start, end):
+        with Session(self.engine) as session:
+            statement = select(TimeOff.start_date).where(
+                self._overlaps(start, end), TimeOff.kind == "holiday"
+            ).order_by(TimeOff.start_date)
+            return session.exec(statement).all()
+
+    def is_range_synced(self, start, end):
+        """
+        Check whether the union of the synced ranges covers [start, end].
+        """
+        with Session(self.engine) as session:
+            statement = select(TimeOffSync.start_date, TimeOffSync.end_date).where(
+                TimeOffSync.start_date <= end, TimeOffSync.end_date >= start
+            ).order_by(TimeOffSync.start_date)
+            covered_until = None
+            for sync_start, sync_end in session.exec(statement).all():
+                if covered_until is None:
+                    if sync_start > start:
+                        return False
+                elif sync_start.toordinal() > covered_until.toordinal() + 1:
+                    return False
+                covered_until = sync_end if covered_until is None else max(covered_until, sync_end)
+                if covered_until >= end:
+                    return True
+            return False
+
+    def count_all_records(self):
+        with Session(self.engine) as session:
+            return session.exec(select(func.count(TimeOff.bamboo_id))).one()
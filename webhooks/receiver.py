@@ -0,0 +1,185 @@
+"""
+Receiver for BambooHR webhooks that applies employee and time-off changes
+to the local employees table and time-off store, so reads stay fresh
+without polling.
+
+Employee events use the BambooHR webhook payload:
+    {"employees": [{"id": "123", "action": "Updated", "changedFields": ["jobTitle"],
+                    "fields": {"jobTitle": "QA Engineer"}}]}
+Time-off events carry '/time_off/requests' (or whos_out) records:
+    {"timeOff": [{"action": "Created", "request": {"id": 1, "employeeId": 5, ...}}]}
+
+Every request must be signed like BambooHR does: "X-BambooHR-Signature" is the
+hex HMAC-SHA256 of the body followed by the "X-BambooHR-Timestamp" header.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from employees.load_employees_to_db import DIRECTORY_FIELDS
+from employees.models import Employee, EmployeeActions
+from employees.sectors import SectorClassifier
+from time_off.load_time_off_to_db import parse_time_off_record
+from time_off.models import TimeOff, TimeOffActions
+
+SIGNATURE_HEADER = "X-BambooHR-Signature"
+TIMESTAMP_HEADER = "X-BambooHR-Timestamp"
+
+
+def sign(body: bytes, secret: str, timestamp: str) -> str:
+    return hmac.new(secret.encode("utf-8"), body + timestamp.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class WebhookReceiver:
+    def __init__(self, secret: str, engine=None, on_change: Optional[Callable[[], None]] = None,
+                 max_age=300):
+        self.secret = secret
+        # Seconds a signed request is accepted for, against replay attacks
+        self.max_age = max_age
+        # Called after changes are applied, e.g. BambooTimeOff.bump_data_version
+        self.on_change = on_change
+        self.emp_qs = EmployeeActions(engine)
+        self.time_off_qs = TimeOffActions(engine)
+        self.engine = self.emp_qs.engine
+
+    def verify(self, body: bytes, headers) -> bool:
+        signature = headers.get(SIGNATURE_HEADER)
+        timestamp = headers.get(TIMESTAMP_HEADER)
+        if not signature or not timestamp:
+            return False
+        try:
+            if abs(time.time() - float(timestamp)) > self.max_age:
+                return False
+        except ValueError:
+            return False
+        return hmac.compare_digest(sign(body, self.secret, timestamp), signature)
+
+    def handle(self, body: bytes, headers) -> tuple[int, dict]:
+        """
+        Verify and apply one webhook request. Returns the HTTP status and response payload.
+        """
+        if not self.verify(body, headers):
+            return 401, {"error": "Invalid signature"}
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, {"error": "Invalid JSON"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Invalid payload"}
+
+        # The whole batch is committed at once, an invalid event rolls back the earlier ones
+        applied = skipped = 0
+        try:
+            with Session(self.engine) as session:
+                for event in payload.get("employees", []):
+                    if self.apply_employee_event(session, event):
+                        applied += 1
+                    else:
+                        skipped += 1
+                for event in payload.get("timeOff", []):
+                    if self.apply_time_off_event(session, event):
+                        applied += 1
+                    else:
+                        skipped += 1
+                session.commit()
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Invalid webhook event: {e}")
+            return 400, {"error": "Invalid event"}
+        except SQLAlchemyError as e:
+            logging.error(f"Database error: {e}")
+            return 500, {"error": "Database error"}
+
+        if applied and self.on_change is not None:
+            self.on_change()
+        return 200, {"applied": applied, "skipped": skipped}
+
+    def apply_employee_event(self, session: Session, event: dict) -> bool:
+        """
+        Apply one employee event in the session. Returns False when nothing
+        changed or the event can not build a valid row, e.g. an update of an
+        unknown employee without the names.
+        """
+        bamboo_id = int(event["id"])
+        action = event.get("action")
+        fields = event.get("fields") or {}
+        employee = session.get(Employee, bamboo_id)
+
+        if action == "Deleted":
+            if employee is None:
+                return False
+            session.delete(employee)
+            return True
+
+        # Only the sent fields are merged, the others keep their stored values
+        changed = list(fields) if action == "Created" else event.get("changedFields") or list(fields)
+        update_data = {
+            DIRECTORY_FIELDS[key]: fields.get(key) for key in changed if key in DIRECTORY_FIELDS
+        }
+        if employee is None:
+            if not update_data.get("f_name") or not update_data.get("l_name"):
+                logging.warning(f"Skipped the {action} event of the unknown employee {bamboo_id}: no first and last name")
+                return False
+            # Webhooks only carry the monitored fields, the directory always has a display name
+            if not update_data.get("display_name"):
+                update_data["display_name"] = f"{update_data['f_name']} {update_data['l_name']}"
+            employee = Employee(bamboo_id=bamboo_id, **update_data)
+            session.add(employee)
+        elif not update_data:
+            return False
+        else:
+            for key, value in update_data.items():
+                setattr(employee, key, value)
+        if "job_title" in update_data or employee.sector is None:
+            employee.sector = SectorClassifier.from_db(self.engine).classify(employee.job_title)
+        return True
+
+    def apply_time_off_event(self, session: Session, event: dict) -> bool:
+        record = event["request"]
+        if event.get("action") == "Deleted":
+            kind = record.get("type") if record.get("type") == "holiday" else "timeOff"
+            result = session.execute(
+                delete(TimeOff).where(TimeOff.bamboo_id == int(record["id"]), TimeOff.kind == kind)
+            )
+            return result.rowcount > 0
+        session.merge(parse_time_off_record(record))
+        return True
+
+    def serve(self, host="127.0.0.1", port=8085) -> ThreadingHTTPServer:
+        """
+        Create the HTTP server, call serve_forever() on it to start receiving.
+        """
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logging.info(f"Webhook {self.address_string()} - {format % args}")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload = receiver.handle(body, self.headers)
+                response = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+if __name__ == "__main__":
+    import os
+
+    server = WebhookReceiver(os.environ["BAMBOO_WEBHOOK_SECRET"]).serve(
+        port=int(os.environ.get("BAMBOO_WEBHOOK_PORT", 8085))
+    )
+    print(f"Receiving webhooks on port {server.server_port}")
+    server.serve_forever()
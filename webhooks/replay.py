@@ -0,0 +1,55 @@
+"""
+Replay recorded webhook events against a receiver, signing every request
+with the shared secret like BambooHR does. Used by the tests and to
+exercise a running receiver locally:
+
+    PYTHONPATH=. python webhooks/replay.py http://127.0.0.1:8085 events.ndjson
+"""
+import json
+import sys
+import time
+from typing import Iterable
+
+import requests
+
+from webhooks.receiver import SIGNATURE_HEADER, TIMESTAMP_HEADER, sign
+
+
+def signed_headers(body: bytes, secret: str, timestamp=None) -> dict:
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    return {
+        "Content-Type": "application/json",
+        TIMESTAMP_HEADER: timestamp,
+        SIGNATURE_HEADER: sign(body, secret, timestamp),
+    }
+
+
+def replay(url: str, events: Iterable[dict], secret: str, session=None) -> list[int]:
+    """
+    POST every event in order and return the response status codes.
+    """
+    session = session or requests.Session()
+    statuses = []
+    for event in events:
+        body = json.dumps(event).encode("utf-8")
+        response = session.post(url, data=body, headers=signed_headers(body, secret), timeout=10)
+        statuses.append(response.status_code)
+    return statuses
+
+
+def read_events(path: str) -> list[dict]:
+    """
+    Events from a JSON list or a file with one JSON event per line.
+    """
+    with open(path) as file:
+        content = file.read().strip()
+    if content.startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+if __name__ == "__main__":
+    import os
+
+    target, events_file = sys.argv[1], sys.argv[2]
+    print(replay(target, read_events(events_file), os.environ["BAMBOO_WEBHOOK_SECRET"]))